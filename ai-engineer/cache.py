@@ -0,0 +1,142 @@
+"""
+Кэши в памяти процесса.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class LRUCache:
+    """
+    Кэш ограниченного размера с вытеснением давно не использованных записей.
+    """
+    
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Значение по ключу; найденная запись становится самой свежей"""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Сохраняет значение, вытесняя самые старые записи при переполнении"""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Значение из кэша или результат build(), сохраненный в кэш"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = build()
+            self.set(key, value)
+        return value
+    
+    def clear(self) -> None:
+        self._data.clear()
+    
+    def stats(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+class TTLCache(LRUCache):
+    """
+    LRU-кэш, записи которого устаревают через ttl секунд после сохранения.
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        super().__init__(maxsize=maxsize)
+        self.ttl = ttl
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._data[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        super().set(key, (time.monotonic() + self.ttl, value))
+    
+    def stats(self) -> dict:
+        return {**super().stats(), "ttl": self.ttl}
+
+
+class AsyncResultCache:
+    """
+    TTL-кэш результатов корутин с объединением одновременных запросов (single-flight).
+    
+    Пока результат для ключа вычисляется, остальные запросы с тем же ключом
+    ждут его, а не запускают вычисление повторно. Вычисление выполняется в
+    отдельной задаче, поэтому отмена одного из ожидающих запросов его не прерывает.
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight: Dict[Hashable, "asyncio.Future"] = {}
+        self.coalesced = 0
+    
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] = lambda value: True
+    ) -> Any:
+        """Значение из кэша, результат уже идущего вычисления или новое вычисление compute()"""
+        value = self._cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, compute, should_cache))
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+    
+    async def _compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool]
+    ) -> Any:
+        try:
+            value = await compute()
+            if should_cache(value):
+                self._cache.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+    
+    def clear(self) -> None:
+        self._cache.clear()
+    
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+
+_MISSING = object()
@@ -0,0 +1,141 @@
+"""
+Неизменяемый снимок каталога вакансий в формате для чат-бота.
+Снимок строится один раз на версию каталога и переиспользуется всеми запросами.
+"""
+import threading
+from collections import abc
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, Mapping, Optional, Sequence, Tuple, TypeVar, Union
+
+from facets import FacetIndex
+from models import Vacancy
+from retrieval import BM25Index
+from recommender import LocalRecommender
+from skill_matcher import SkillMatcher
+
+
+T = TypeVar("T")
+# Индексы снимка, которые строятся при первом обращении
+LAZY_INDEXES = ("_search_index", "_recommender", "_skill_matcher", "_facet_index")
+
+def vacancy_to_chat_item(vacancy: Vacancy) -> Mapping:
+    """Проекция вакансии в неизменяемый словарь для промптов чат-бота"""
+    return MappingProxyType({
+        "id": vacancy.id,
+        "title": vacancy.title,
+        "description": vacancy.description,
+        "company_name": vacancy.company.name if vacancy.company else "N/A",
+        "location": vacancy.location,
+        "salary_min": vacancy.salary_min,
+        "salary_max": vacancy.salary_max,
+        "job_type": vacancy.job_type.value if vacancy.job_type else None,
+        "experience_level": vacancy.experience_level.value if vacancy.experience_level else None,
+        "required_skills": tuple(vacancy.required_skills),
+        "preferred_skills": tuple(vacancy.preferred_skills),
+    })
+
+
+class CatalogSnapshot(abc.Sequence):
+    """
+    Версионированный снимок вакансий для чат-бота.
+    
+    Ведет себя как неизменяемая последовательность словарей (срез возвращает
+    кортеж только запрошенных элементов), поэтому его можно передавать туда,
+    где раньше передавался список из get_vacancies_data_for_chat.
+    """
+    
+    def __init__(self, version: int, items: Tuple[Mapping, ...]):
+        self.version = version
+        self._items = items
+        self._positions: Dict[int, int] = {item["id"]: i for i, item in enumerate(items)}
+        self._init_indexes()
+    
+    def _init_indexes(self) -> None:
+        self._search_index: Optional[BM25Index] = None
+        self._recommender: Optional[LocalRecommender] = None
+        self._skill_matcher: Optional[SkillMatcher] = None
+        self._facet_index: Optional[FacetIndex] = None
+        self._index_locks = {name: threading.Lock() for name in LAZY_INDEXES}
+    
+    def _lazy(self, name: str, build: Callable[[], T]) -> T:
+        """
+        Ленивый индекс name. Его могут одновременно запросить фоновый прогрев
+        и обработчики запросов: индекс строит только первый, остальные ждут его результат.
+        """
+        value = getattr(self, name)
+        if value is None:
+            with self._index_locks[name]:
+                value = getattr(self, name)
+                if value is None:
+                    value = build()
+                    setattr(self, name, value)
+        return value
+    
+    @classmethod
+    def from_vacancies(cls, version: int, vacancies: Sequence[Vacancy]) -> "CatalogSnapshot":
+        return cls(version, tuple(vacancy_to_chat_item(v) for v in vacancies))
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def __iter__(self) -> Iterator[Mapping]:
+        return iter(self._items)
+    
+    def __getitem__(self, index: Union[int, slice]):
+        return self._items[index]
+    
+    def top(self, k: int) -> Tuple[Mapping, ...]:
+        """Первые k вакансий каталога"""
+        return self._items[:k]
+    
+    def slice(self, start: int, stop: Optional[int] = None) -> Tuple[Mapping, ...]:
+        """Вакансии с позиции start до stop"""
+        return self._items[start:stop]
+    
+    @property
+    def search_index(self) -> BM25Index:
+        """Индекс BM25 по снимку; строится при первом обращении"""
+        return self._lazy("_search_index", lambda: BM25Index(self._items))
+    
+    @property
+    def recommender(self) -> LocalRecommender:
+        """Локальный движок рекомендаций по снимку; строится при первом обращении"""
+        return self._lazy("_recommender", lambda: LocalRecommender(self._items))
+    
+    @property
+    def skill_matcher(self) -> SkillMatcher:
+        """Поиск навыков и названий вакансий снимка в тексте; строится при первом обращении"""
+        return self._lazy("_skill_matcher", lambda: SkillMatcher(self._items))
+    
+    @property
+    def facet_index(self) -> FacetIndex:
+        """Индексы полей для фильтров и фасетов; строятся при первом обращении"""
+        return self._lazy("_facet_index", lambda: FacetIndex.from_items(self._items))
+    
+    def facet_search(self, query: Optional[str] = None, **filters):
+        """
+        Фасетный поиск по снимку (см. FacetIndex.search): ID вакансий страницы,
+        общее число найденных и счетчики фасетов. query - текстовый запрос BM25.
+        """
+        relevance = self.search_index.score(query) if query else None
+        return self.facet_index.search(relevance=relevance, **filters)
+    
+    def search(
+        self,
+        query: str,
+        k: int,
+        experience_level: Optional[str] = None
+    ) -> Tuple[Mapping, ...]:
+        """
+        k самых релевантных запросу вакансий.
+        Если запрос ни с чем не совпал, возвращаются первые k вакансий каталога.
+        """
+        positions = self.search_index.top_k(query, k, experience_level=experience_level)
+        if not positions:
+            return self.top(k)
+        return tuple(self._items[p] for p in positions)
+    
+    def get(self, vacancy_id: int) -> Optional[Mapping]:
+        """Вакансия из снимка по ID"""
+        position = self._positions.get(vacancy_id)
+        return self._items[position] if position is not None else None
@@ -1,52 +1,306 @@
 import os
-from typing import List, Optional, Dict, Any
-from openai import OpenAI
-from models import ChatMessage, Vacancy, ChatRequest, ChatResponse
+import re
+import asyncio
+import logging
+import threading
+import time
+from contextlib import aclosing
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple, Union, Mapping, Sequence, Callable
+from models import ChatMessage, ChatRequest, ChatResponse
+from cache import LRUCache
+from history import HistoryCompactor
+from skill_matcher import SkillMatcher
+from skill_index import normalize_skill
+from metrics import FAST_BUCKETS, Counter, Gauge, Histogram
+from resilience import CircuitBreaker, ResilientCaller, RetryPolicy, is_unavailable
 import json
 
 
+logger = logging.getLogger(__name__)
+
+BASE_SYSTEM_PROMPT = """Ты - полезный AI-ассистент для веб-сайта с вакансиями и компаниями. 
+Твоя задача:
+1. Помогать пользователям подобрать подходящие вакансии на основе их навыков, опыта и предпочтений
+2. Отвечать на вопросы о вакансиях, компаниях, требованиях и условиях работы
+3. Давать рекомендации по навыкам, которые стоит подтянуть для конкретных вакансий
+
+Будь дружелюбным, профессиональным и полезным. Если пользователь спрашивает о вакансиях, 
+используй информацию о доступных вакансиях для точных рекомендаций.
+
+Отвечай на русском языке, если пользователь пишет на русском."""
+
+RECOMMENDATIONS_SYSTEM_PROMPT = """Ты помощник по подбору вакансий. Отвечай только валидным JSON.
+
+Проанализируй навыки и уровень опыта пользователя и дай структурированные рекомендации.
+Верни JSON с:
+1. Список ID подходящих вакансий (top 5)
+2. Рекомендации по навыкам для улучшения (top 3-5)
+
+Формат:
+{
+    "recommended_vacancy_ids": [1, 2, 3],
+    "skill_recommendations": ["Python", "Docker", "Kubernetes"]
+}"""
+
+
+# Явные ссылки на вакансии в ответе: "вакансия №3", "вакансии #12", "вакансию ID 7"
+VACANCY_ID_RE = re.compile(r'ваканси[яиюей]\s*(?:№|#|id:?)?\s*(\d+)', re.IGNORECASE)
+
+# Сколько навыков из ответа попадает в skill_recommendations
+MAX_SKILL_RECOMMENDATIONS = 5
+
+# Текст события error потокового чата, если ответ модели оборвался после первых токенов
+CHAT_ERROR_PREFIX = "Произошла ошибка при обработке запроса"
+
+# Ответ без модели (OpenAI недоступен): вакансии из локального поиска по каталогу
+DEGRADED_CHAT_PREFIX = "AI-ассистент сейчас недоступен, поэтому ответ подобран автоматически по каталогу вакансий."
+DEGRADED_CHAT_VACANCIES = 5
+
+
+# Метрики: этапы обработки сообщения и обращения к OpenAI по операциям (chat, chat_stream,
+# recommendations, explain)
+CHAT_STAGE_SECONDS = Histogram(
+    "chat_stage_duration_seconds",
+    "Длительность этапов обработки сообщения чата",
+    ("stage",),
+    buckets=FAST_BUCKETS + (2.5, 10.0, 30.0)
+)
+OPENAI_REQUEST_SECONDS = Histogram(
+    "openai_request_duration_seconds",
+    "Длительность запросов к OpenAI (для потока - до последнего токена)",
+    ("operation",)
+)
+OPENAI_FIRST_TOKEN_SECONDS = Histogram(
+    "openai_first_token_seconds", "Время до первого токена потокового ответа", ("operation",)
+)
+OPENAI_TOKENS = Counter(
+    "openai_tokens_total", "Токены, израсходованные в запросах к OpenAI", ("operation", "type")
+)
+OPENAI_ERRORS = Counter(
+    "openai_errors_total", "Ошибки запросов к OpenAI по типу исключения", ("operation", "error")
+)
+OPENAI_IN_FLIGHT = Gauge(
+    "openai_requests_in_flight", "Запросы к OpenAI в обработке (после семафора)", ()
+)
+
+
+def _record_usage(operation: str, usage) -> None:
+    """Учитывает токены из поля usage ответа (объект клиента или словарь)"""
+    if usage is None:
+        return
+    if isinstance(usage, dict):
+        prompt, completion = usage.get("prompt_tokens"), usage.get("completion_tokens")
+    else:
+        prompt, completion = getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+    if prompt:
+        OPENAI_TOKENS.inc(prompt, operation=operation, type="prompt")
+    if completion:
+        OPENAI_TOKENS.inc(completion, operation=operation, type="completion")
+
+
 class ChatBotService:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
         """
         Инициализация сервиса чат-бота с OpenAI
+
+        Все запросы идут через асинхронный клиент с общим пулом HTTP-соединений,
+        поэтому вызов модели не блокирует event loop. Количество одновременных
+        запросов к OpenAI ограничено семафором.
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY не установлен. Установите переменную окружения или передайте api_key")
         
-        self.client = OpenAI(api_key=self.api_key)
+        self.max_concurrency = max_concurrency or int(os.getenv("OPENAI_MAX_CONCURRENCY", "32"))
+        self._max_connections = max_connections or int(os.getenv("OPENAI_MAX_CONNECTIONS", str(self.max_concurrency)))
+        self.timeout = timeout or float(os.getenv("OPENAI_TIMEOUT", "30"))
+        # Дедлайн вызова с повторами, автомат отключения и хеджирование медленных запросов
+        hedge_quantile = os.getenv("OPENAI_HEDGE_QUANTILE")
+        self._resilience = ResilientCaller(
+            timeout=self.timeout,
+            deadline=float(os.getenv("OPENAI_DEADLINE", str(self.timeout * 1.5))),
+            retry=RetryPolicy(
+                max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "2")),
+                base_delay=float(os.getenv("OPENAI_RETRY_BASE_DELAY", "0.25")),
+                max_delay=float(os.getenv("OPENAI_RETRY_MAX_DELAY", "2"))
+            ),
+            breaker=CircuitBreaker(
+                name="openai",
+                failure_threshold=int(os.getenv("OPENAI_BREAKER_FAILURES", "5")),
+                recovery_time=float(os.getenv("OPENAI_BREAKER_RECOVERY", "30"))
+            ),
+            hedge_quantile=float(hedge_quantile) if hedge_quantile else None,
+            hedge_min_delay=float(os.getenv("OPENAI_HEDGE_MIN_DELAY", "0.5"))
+        )
+        # Клиент создается при первом обращении (его может создать и фоновый прогрев)
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._prompt_cache = LRUCache(maxsize=int(os.getenv("PROMPT_CACHE_SIZE", "256")))
+        # Сколько вакансий попадает в промпт чата и рекомендаций
+        self.chat_context_size = int(os.getenv("CHAT_CONTEXT_VACANCIES", "10"))
+        self.recommendations_context_size = int(os.getenv("RECOMMENDATIONS_CONTEXT_VACANCIES", "20"))
         self.model = "gpt-4-turbo-preview"  # Можно использовать gpt-3.5-turbo для экономии
+        # История укладывается в бюджет токенов, ранние сообщения сжимаются в резюме
+        self._history = HistoryCompactor(
+            budget=int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "2000")),
+            summary_budget=int(os.getenv("CHAT_HISTORY_SUMMARY_TOKENS", "300")),
+            model=self.model
+        )
+    
+    @property
+    def breaker(self) -> CircuitBreaker:
+        """Автомат отключения запросов к OpenAI"""
+        return self._resilience.breaker
+    
+    @property
+    def client(self):
+        """
+        Клиент OpenAI с общим пулом соединений для всех запросов к API.
+        Создается при первом обращении: импорт openai заметно замедляет старт процесса.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+    
+    def _create_client(self):
+        import httpx
+        from openai import AsyncOpenAI
         
-    def _build_system_prompt(self, vacancies_data: Optional[List[Dict]] = None) -> str:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self._max_connections,
+                max_keepalive_connections=self._max_connections
+            ),
+            timeout=httpx.Timeout(self.timeout, connect=5.0)
+        )
+        # Повторы выполняет ResilientCaller (с дедлайном и автоматом отключения),
+        # встроенные повторы клиента их бы умножали
+        return AsyncOpenAI(
+            api_key=self.api_key,
+            http_client=http_client,
+            timeout=self.timeout,
+            max_retries=0
+        )
+    
+    async def aclose(self) -> None:
+        """Закрывает пул HTTP-соединений"""
+        if self._client is not None:
+            await self._client.close()
+    
+    async def _create_completion(self, operation: str, timeout: Optional[float] = None, **kwargs):
+        """
+        Вызов chat completions с ограничением параллелизма.
+        timeout - дедлайн вызова вместе с повторами (по умолчанию OPENAI_DEADLINE).
+        Длительность, токены и ошибки попыток учитываются в метриках по operation.
+        """
+        async def attempt(attempt_timeout: float):
+            async with self._semaphore:
+                with OPENAI_IN_FLIGHT.track_inprogress(), OPENAI_REQUEST_SECONDS.time(operation=operation):
+                    try:
+                        return await self.client.chat.completions.create(timeout=attempt_timeout, **kwargs)
+                    except Exception as e:
+                        OPENAI_ERRORS.inc(operation=operation, error=type(e).__name__)
+                        raise
+        
+        response = await self._resilience.call(operation, attempt, deadline=timeout)
+        _record_usage(operation, getattr(response, "usage", None))
+        return response
+        
+    def _select_vacancies(
+        self,
+        vacancies_data: Sequence[Mapping],
+        query: str,
+        k: int,
+        user_experience: Optional[str] = None
+    ) -> Sequence[Mapping]:
+        """
+        Отбирает k вакансий для промпта.
+        Для снимка каталога используется локальный поиск BM25 по запросу,
+        для обычного списка - первые k вакансий.
+        """
+        if hasattr(vacancies_data, "search") and query.strip():
+            return vacancies_data.search(query, k, experience_level=user_experience)
+        return vacancies_data[:k]
+    
+    def _build_system_prompt(
+        self,
+        vacancies_data: Optional[Sequence[Mapping]] = None,
+        query: str = "",
+        user_experience: Optional[str] = None
+    ) -> str:
         """
         Создает системный промпт для чат-бота
         """
-        base_prompt = """Ты - полезный AI-ассистент для веб-сайта с вакансиями и компаниями. 
-Твоя задача:
-1. Помогать пользователям подобрать подходящие вакансии на основе их навыков, опыта и предпочтений
-2. Отвечать на вопросы о вакансиях, компаниях, требованиях и условиях работы
-3. Давать рекомендации по навыкам, которые стоит подтянуть для конкретных вакансий
-
-Будь дружелюбным, профессиональным и полезным. Если пользователь спрашивает о вакансиях, 
-используй информацию о доступных вакансиях для точных рекомендаций.
-
-Отвечай на русском языке, если пользователь пишет на русском."""
+        if not vacancies_data:
+            return BASE_SYSTEM_PROMPT
         
-        if vacancies_data:
-            vacancies_info = "\n\nДоступные вакансии:\n"
-            for vac in vacancies_data[:10]:  # Ограничиваем для промпта
-                vacancies_info += f"- ID {vac.get('id')}: {vac.get('title')} в {vac.get('company_name', 'N/A')}. "
-                vacancies_info += f"Навыки: {', '.join(vac.get('required_skills', []))}. "
-                vacancies_info += f"Уровень: {vac.get('experience_level', 'N/A')}\n"
-            base_prompt += vacancies_info
+        # Ограничиваем для промпта самыми релевантными вакансиями
+        vacancies = self._select_vacancies(vacancies_data, query, self.chat_context_size, user_experience)
+        return self._cached_prompt(
+            "system", vacancies_data, vacancies,
+            lambda: BASE_SYSTEM_PROMPT + "\n\nДоступные вакансии:\n" + "".join(
+                f"- ID {vac.get('id')}: {vac.get('title')} в {vac.get('company_name', 'N/A')}. "
+                f"Навыки: {', '.join(vac.get('required_skills', []))}. "
+                f"Уровень: {vac.get('experience_level', 'N/A')}\n"
+                for vac in vacancies
+            )
+        )
+    
+    def _build_recommendations_prompt(
+        self,
+        vacancies_data: Sequence[Mapping],
+        query: str = "",
+        user_experience: Optional[str] = None
+    ) -> str:
+        """
+        Создает системный промпт для структурированных рекомендаций
+        """
+        vacancies = self._select_vacancies(
+            vacancies_data, query, self.recommendations_context_size, user_experience
+        )
+        return self._cached_prompt(
+            "recommendations", vacancies_data, vacancies,
+            lambda: RECOMMENDATIONS_SYSTEM_PROMPT + "\n\nДоступные вакансии:\n" + "\n".join(
+                f"ID {v['id']}: {v['title']} - Навыки: {', '.join(v.get('required_skills', []))}"
+                for v in vacancies
+            )
+        )
+    
+    def _cached_prompt(
+        self,
+        kind: str,
+        vacancies_data: Sequence[Mapping],
+        vacancies: Sequence[Mapping],
+        build: Callable[[], str]
+    ) -> str:
+        """
+        Возвращает фрагмент промпта из кэша по ключу (вид промпта, версия каталога, ID вакансий).
         
-        return base_prompt
+        Кэшируются только промпты, построенные по версионированному снимку каталога
+        (CatalogSnapshot): для произвольного списка вакансий версия неизвестна.
+        Одинаковый набор вакансий дает побайтно одинаковый промпт, что позволяет
+        провайдеру переиспользовать кэш префикса промпта.
+        """
+        version = getattr(vacancies_data, "version", None)
+        if version is None:
+            return build()
+        key = (kind, version, tuple(v.get("id") for v in vacancies))
+        return self._prompt_cache.get_or_build(key, build)
     
     def _prepare_messages(
         self, 
         user_message: str, 
         conversation_history: List[ChatMessage],
-        vacancies_data: Optional[List[Dict]] = None,
+        vacancies_data: Optional[Sequence[Mapping]] = None,
         user_skills: Optional[List[str]] = None,
         user_experience: Optional[str] = None
     ) -> List[Dict[str, str]]:
@@ -54,7 +308,11 @@ class ChatBotService:
         Подготавливает сообщения для отправки в OpenAI API
         """
         messages = [
-            {"role": "system", "content": self._build_system_prompt(vacancies_data)}
+            {"role": "system", "content": self._build_system_prompt(
+                vacancies_data,
+                query=" ".join([user_message, *(user_skills or [])]),
+                user_experience=user_experience
+            )}
         ]
         
         # Добавляем контекст о пользователе, если есть
@@ -66,8 +324,11 @@ class ChatBotService:
                 user_context += f"Уровень опыта: {user_experience}\n"
             messages.append({"role": "system", "content": user_context})
         
-        # Добавляем историю разговора
-        for msg in conversation_history[-10:]:  # Ограничиваем историю последними 10 сообщениями
+        # Добавляем историю разговора в пределах бюджета токенов
+        summary, recent_history = self._history.compact(conversation_history)
+        if summary:
+            messages.append({"role": "system", "content": summary})
+        for msg in recent_history:
             messages.append({
                 "role": msg.role,
                 "content": msg.content
@@ -78,133 +339,282 @@ class ChatBotService:
         
         return messages
     
-    def _extract_vacancy_ids(self, response_text: str) -> Optional[List[int]]:
-        """
-        Пытается извлечь ID вакансий из ответа (если бот их упомянул)
-        """
-        # Простая эвристика - можно улучшить с помощью regex или структурированного вывода
-        import re
-        ids = re.findall(r'ваканси[яи]\s*(?:№|#)?\s*(\d+)', response_text, re.IGNORECASE)
-        if ids:
-            return [int(id) for id in ids]
-        return None
+    def _skill_matcher(self, vacancies_data: Optional[Sequence[Mapping]]) -> Optional[SkillMatcher]:
+        """Словарь каталога: у снимка он кэшируется до смены версии, для списка строится заново"""
+        if not vacancies_data:
+            return None
+        if hasattr(vacancies_data, "skill_matcher"):
+            return vacancies_data.skill_matcher
+        return SkillMatcher(vacancies_data)
     
-    def _extract_skill_recommendations(self, response_text: str) -> Optional[List[str]]:
+    def _extract_mentions(
+        self,
+        response_text: str,
+        vacancies_data: Optional[Sequence[Mapping]] = None,
+        user_skills: Optional[List[str]] = None
+    ) -> Tuple[Optional[List[int]], Optional[List[str]]]:
         """
-        Пытается извлечь рекомендации по навыкам из ответа
+        Извлекает из ответа за один проход по тексту:
+        - ID вакансий: явные номера ("вакансия №3") и названия вакансий каталога
+        - навыки каталога, кроме тех, что уже есть у пользователя (не больше MAX_SKILL_RECOMMENDATIONS)
         """
-        # Можно улучшить с помощью структурированного вывода OpenAI
-        skills = []
-        skill_keywords = ["изучить", "подтянуть", "освоить", "навык", "технология"]
-        
-        lines = response_text.split('\n')
-        for line in lines:
-            if any(keyword in line.lower() for keyword in skill_keywords):
-                # Простая эвристика - можно улучшить
-                words = line.split()
-                for i, word in enumerate(words):
-                    if word.lower() in skill_keywords and i + 1 < len(words):
-                        potential_skill = words[i + 1].strip('.,!?;:')
-                        if len(potential_skill) > 2:
-                            skills.append(potential_skill)
-        
-        return skills[:5] if skills else None
+        ids = [int(vac_id) for vac_id in VACANCY_ID_RE.findall(response_text)]
+        skills: List[str] = []
+        matcher = self._skill_matcher(vacancies_data)
+        if matcher:
+            title_ids, mentioned_skills = matcher.extract(response_text)
+            ids.extend(title_ids)
+            known = {normalize_skill(s) for s in user_skills or []}
+            skills = [s for s in mentioned_skills if normalize_skill(s) not in known]
+        return list(dict.fromkeys(ids)) or None, skills[:MAX_SKILL_RECOMMENDATIONS] or None
     
     async def get_chat_response(
         self,
         request: ChatRequest,
-        vacancies_data: Optional[List[Dict]] = None
+        vacancies_data: Optional[Sequence[Mapping]] = None,
+        timeout: Optional[float] = None
     ) -> ChatResponse:
         """
         Получает ответ от чат-бота на основе запроса пользователя
         """
         try:
-            messages = self._prepare_messages(
-                user_message=request.message,
-                conversation_history=request.conversation_history or [],
-                vacancies_data=vacancies_data,
-                user_skills=request.user_skills,
-                user_experience=request.user_experience
-            )
+            with CHAT_STAGE_SECONDS.time(stage="prepare_messages"):
+                messages = self._prepare_messages(
+                    user_message=request.message,
+                    conversation_history=request.conversation_history or [],
+                    vacancies_data=vacancies_data,
+                    user_skills=request.user_skills,
+                    user_experience=request.user_experience
+                )
             
             # Вызов OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=1000
-            )
+            with CHAT_STAGE_SECONDS.time(stage="openai"):
+                response = await self._create_completion(
+                    "chat",
+                    timeout=timeout,
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=1000
+                )
             
             response_text = response.choices[0].message.content
             
-            # Извлекаем дополнительную информацию из ответа
-            suggested_vacancies = self._extract_vacancy_ids(response_text)
-            skill_recommendations = self._extract_skill_recommendations(response_text)
+            return self._build_chat_response(response_text, vacancies_data, request.user_skills)
             
-            return ChatResponse(
-                response=response_text,
-                suggested_vacancies=suggested_vacancies,
-                skill_recommendations=skill_recommendations
-            )
+        except Exception as e:
+            # Текст исключения клиенту не отдается: при любой ошибке модели - локальный ответ
+            if not is_unavailable(e):
+                logger.exception("Ошибка при получении ответа модели")
+            return self._degraded_chat_response(request, vacancies_data)
+    
+    async def stream_chat_response(
+        self,
+        request: ChatRequest,
+        vacancies_data: Optional[Sequence[Mapping]] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Tuple[str, Union[str, ChatResponse]]]:
+        """
+        Потоковый вариант get_chat_response.
+        
+        Отдает события ("token", текст) по мере генерации ответа моделью, затем
+        одно событие ("done", ChatResponse) с ID вакансий и навыками, извлеченными
+        из полного текста. При ошибке до первого токена отдается локальный ответ
+        (_degraded_chat_response) теми же событиями, после - событие ("error", CHAT_ERROR_PREFIX)
+        без текста исключения.
+        """
+        chunks: List[str] = []
+        try:
+            with CHAT_STAGE_SECONDS.time(stage="prepare_messages"):
+                messages = self._prepare_messages(
+                    user_message=request.message,
+                    conversation_history=request.conversation_history or [],
+                    vacancies_data=vacancies_data,
+                    user_skills=request.user_skills,
+                    user_experience=request.user_experience
+                )
+            
+            def open_stream(attempt_timeout: float):
+                return self.client.chat.completions.create(
+                    timeout=attempt_timeout,
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=1000,
+                    stream=True,
+                    # Последний чанк потока содержит usage (токены для метрик)
+                    extra_body={"stream_options": {"include_usage": True}}
+                )
+            
+            # Слот семафора удерживается, пока модель генерирует ответ.
+            # Повторы возможны только до начала ответа, хеджирование для потока не используется;
+            # дедлайн ограничивает и чтение ответа.
+            async with self._semaphore:
+                with OPENAI_IN_FLIGHT.track_inprogress(), OPENAI_REQUEST_SECONDS.time(operation="chat_stream"):
+                    start = time.perf_counter()
+                    stream = self._resilience.stream("chat_stream", open_stream, deadline=timeout)
+                    async with aclosing(stream):
+                        async for chunk in stream:
+                            _record_usage("chat_stream", getattr(chunk, "usage", None))
+                            if not chunk.choices:
+                                continue
+                            delta = chunk.choices[0].delta.content
+                            if delta:
+                                if not chunks:
+                                    OPENAI_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - start, operation="chat_stream")
+                                chunks.append(delta)
+                                yield "token", delta
             
         except Exception as e:
-            error_message = f"Произошла ошибка при обработке запроса: {str(e)}"
-            return ChatResponse(response=error_message)
+            OPENAI_ERRORS.inc(operation="chat_stream", error=type(e).__name__)
+            if not is_unavailable(e):
+                logger.exception("Ошибка потокового ответа модели")
+            if not chunks:
+                response = self._degraded_chat_response(request, vacancies_data)
+                yield "token", response.response
+                yield "done", response
+                return
+            yield "error", CHAT_ERROR_PREFIX
+            return
+        
+        yield "done", self._build_chat_response("".join(chunks), vacancies_data, request.user_skills)
+    
+    def _build_chat_response(
+        self,
+        response_text: str,
+        vacancies_data: Optional[Sequence[Mapping]] = None,
+        user_skills: Optional[List[str]] = None
+    ) -> ChatResponse:
+        """
+        Собирает ChatResponse, извлекая ID вакансий и навыки из текста ответа за один проход
+        """
+        with CHAT_STAGE_SECONDS.time(stage="extract_mentions"):
+            suggested_vacancies, skill_recommendations = self._extract_mentions(
+                response_text, vacancies_data, user_skills
+            )
+        
+        return ChatResponse(
+            response=response_text,
+            suggested_vacancies=suggested_vacancies,
+            skill_recommendations=skill_recommendations
+        )
+    
+    def _degraded_chat_response(
+        self,
+        request: ChatRequest,
+        vacancies_data: Optional[Sequence[Mapping]] = None
+    ) -> ChatResponse:
+        """
+        Ответ без модели: вакансии из локального поиска по запросу и навыкам пользователя
+        и недостающие навыки от локального рекомендателя
+        """
+        lines = [DEGRADED_CHAT_PREFIX]
+        vacancies: Sequence[Mapping] = []
+        if vacancies_data:
+            vacancies = self._select_vacancies(
+                vacancies_data,
+                " ".join([request.message, *(request.user_skills or [])]),
+                DEGRADED_CHAT_VACANCIES,
+                request.user_experience
+            )
+        if vacancies:
+            lines.append("Вакансии по вашему запросу:")
+            lines.extend(
+                f"- ID {vac.get('id')}: {vac.get('title')} в {vac.get('company_name', 'N/A')}. "
+                f"Навыки: {', '.join(vac.get('required_skills', []))}"
+                for vac in vacancies
+            )
+        
+        skills = None
+        recommender = getattr(vacancies_data, "recommender", None)
+        if recommender is not None and request.user_skills:
+            skills = recommender.recommend(request.user_skills, request.user_experience)["skill_recommendations"] or None
+            if skills:
+                lines.append(f"Навыки, которые стоит подтянуть: {', '.join(skills)}")
+        lines.append("Повторите вопрос чуть позже, чтобы получить развернутый ответ.")
+        
+        return ChatResponse(
+            response="\n".join(lines),
+            suggested_vacancies=[vac.get("id") for vac in vacancies] or None,
+            skill_recommendations=skills,
+            degraded=True
+        )
     
-    def get_structured_recommendations(
+    async def get_structured_recommendations(
         self,
         user_skills: List[str],
         user_experience: Optional[str],
-        vacancies_data: List[Dict]
+        vacancies_data: Sequence[Mapping],
+        timeout: Optional[float] = None
     ) -> Dict[str, Any]:
         """
-        Получает структурированные рекомендации по вакансиям и навыкам
+        Получает структурированные рекомендации по вакансиям и навыкам.
+        Ошибки модели и невалидный JSON пробрасываются вызывающему коду.
         """
-        # Создаем промпт для структурированного анализа
+        # Неизменная часть промпта (инструкция и вакансии) идет первой,
+        # данные пользователя - в отдельном сообщении после нее
         skills_str = ", ".join(user_skills) if user_skills else "не указаны"
         experience_str = user_experience or "не указан"
         
-        vacancies_summary = "\n".join([
-            f"ID {v['id']}: {v['title']} - Навыки: {', '.join(v.get('required_skills', []))}"
-            for v in vacancies_data[:20]
-        ])
+        prompt = f"""Навыки пользователя: {skills_str}
+Уровень опыта: {experience_str}"""
         
-        prompt = f"""Проанализируй следующие данные и дай структурированные рекомендации:
-
-Навыки пользователя: {skills_str}
+        response = await self._create_completion(
+            "recommendations",
+            timeout=timeout,
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self._build_recommendations_prompt(
+                    vacancies_data,
+                    query=" ".join(user_skills or []),
+                    user_experience=user_experience
+                )},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            response_format={"type": "json_object"}
+        )
+        
+        return json.loads(response.choices[0].message.content)
+    
+    async def explain_recommendations(
+        self,
+        user_skills: List[str],
+        user_experience: Optional[str],
+        vacancies: Sequence[Mapping],
+        skill_recommendations: List[str],
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Текстовый разбор уже подобранных вакансий и навыков.
+        Используется, когда ранжирование выполнено локально, а от модели нужен только комментарий.
+        Ошибки модели пробрасываются вызывающему коду.
+        """
+        skills_str = ", ".join(user_skills) if user_skills else "не указаны"
+        experience_str = user_experience or "не указан"
+        vacancies_summary = "\n".join(
+            f"ID {v['id']}: {v['title']} - Навыки: {', '.join(v.get('required_skills', []))}"
+            for v in vacancies
+        )
+        prompt = f"""Навыки пользователя: {skills_str}
 Уровень опыта: {experience_str}
 
-Доступные вакансии:
+Подобранные вакансии:
 {vacancies_summary}
 
-Верни JSON с:
-1. Список ID подходящих вакансий (top 5)
-2. Рекомендации по навыкам для улучшения (top 3-5)
+Навыки, которые стоит подтянуть: {', '.join(skill_recommendations) or 'нет'}
 
-Формат:
-{{
-    "recommended_vacancy_ids": [1, 2, 3],
-    "skill_recommendations": ["Python", "Docker", "Kubernetes"]
-}}"""
+Кратко объясни, почему эти вакансии подходят пользователю и как развивать навыки."""
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "Ты помощник по подбору вакансий. Отвечай только валидным JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                response_format={"type": "json_object"}
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            return result
-            
-        except Exception as e:
-            return {
-                "recommended_vacancy_ids": [],
-                "skill_recommendations": [],
-                "error": str(e)
-            }
-
+        response = await self._create_completion(
+            "explain",
+            timeout=timeout,
+            model=self.model,
+            messages=[
+                {"role": "system", "content": BASE_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=500
+        )
+        return {"summary": response.choices[0].message.content}
@@ -0,0 +1,667 @@
+"""
+Колоночное хранилище вакансий в массивах NumPy.
+
+Вакансия занимает несколько чисел в массивах (зарплата, компания, дата, коды
+типа занятости и уровня), байты названия и описания в общем буфере и по
+паре (ID навыка, вид) на каждый навык в CSR-массивах. Модель Vacancy создается
+только для вакансий, которые действительно возвращаются из API, а фильтры
+и ранжирование выполняются по массивам.
+"""
+import copy
+import os
+import threading
+import uuid
+from collections import abc
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from catalog import CatalogSnapshot
+from facets import FacetIndex, normalize_location
+from models import Company, ExperienceLevel, JobType, Vacancy
+from recommender import LEVEL_CODES, LocalRecommender
+from serialization import FragmentCache
+from skill_index import SkillIndex, normalize_skill
+
+
+JOB_TYPES = list(JobType)
+JOB_TYPE_CODES = {job_type.value: code for code, job_type in enumerate(JOB_TYPES)}
+LEVELS = list(ExperienceLevel)
+VACANCY_FIELDS = frozenset(Vacancy.model_fields)
+
+# Вид навыка в CSR-массиве
+REQUIRED, PREFERRED = 0, 1
+
+# Дата публикации хранится в микросекундах от эпохи, отсутствие даты - NO_DATE
+EPOCH = datetime(1970, 1, 1)
+NO_DATE = np.iinfo(np.int64).min
+
+INITIAL_CAPACITY = 1024
+
+# Компактификация: строки удаленных и замененных вакансий вычищаются из массивов, когда их
+# доля превышает COMPACT_DEAD_RATIO и их не меньше COMPACT_MIN_DEAD_ROWS
+COMPACT_DEAD_RATIO = float(os.getenv("AI_DB_COMPACT_RATIO", "0.5"))
+COMPACT_MIN_DEAD_ROWS = int(os.getenv("AI_DB_COMPACT_MIN_ROWS", "1024"))
+
+
+def _grow(array: np.ndarray, size: int, fill=0) -> np.ndarray:
+    """Массив не короче size (емкость удваивается, чтобы вставка была амортизированно O(1))"""
+    if size <= len(array):
+        return array
+    grown = np.full(max(size, 2 * len(array)), fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class _TextColumn:
+    """Строки в одном буфере UTF-8 со смещениями вместо отдельных объектов str"""
+
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = np.zeros(INITIAL_CAPACITY + 1, dtype=np.int64)
+
+    def append(self, row: int, text: str) -> None:
+        self._data += text.encode("utf-8")
+        self._offsets = _grow(self._offsets, row + 2)
+        self._offsets[row + 1] = len(self._data)
+
+    def __getitem__(self, row: int) -> str:
+        return self._data[self._offsets[row]:self._offsets[row + 1]].decode("utf-8")
+
+    def take(self, rows: np.ndarray) -> "_TextColumn":
+        """Новая колонка из строк rows (байты копируются без декодирования)"""
+        column = _TextColumn()
+        starts, ends = self._offsets[rows].tolist(), self._offsets[rows + 1].tolist()
+        column._data = bytearray(b"".join(self._data[start:end] for start, end in zip(starts, ends)))
+        column._offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(self._offsets[rows + 1] - self._offsets[rows], out=column._offsets[1:])
+        return column
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._data) + self._offsets.nbytes
+
+
+class _Vocabulary:
+    """Интернирование строк: строка -> целочисленный код"""
+
+    def __init__(self, key=lambda value: value):
+        self._key = key
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: str) -> int:
+        key = self._key(value)
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def find(self, value: str) -> Optional[int]:
+        return self.codes.get(self._key(value))
+
+
+class ColumnarSnapshot(CatalogSnapshot):
+    """
+    Снимок колоночного хранилища: элементы для чат-бота собираются из массивов
+    при обращении, локальный движок рекомендаций строится прямо из CSR-массивов.
+    """
+
+    def __init__(self, version: int, store: "ColumnarDatabase", rows: np.ndarray):
+        # Родительский __init__ не вызывается: он строит словарь позиций по всем элементам
+        self.version = version
+        self._items = _ChatItems(store, rows)
+        self._store = store
+        self.rows = rows
+        # Строки снимка упорядочены по ID, поэтому вакансия ищется бинарным поиском
+        self._ids = store._ids[rows]
+        self._init_indexes()
+
+    def get(self, vacancy_id: int) -> Optional[Mapping]:
+        position = np.searchsorted(self._ids, vacancy_id)
+        if position < len(self._ids) and self._ids[position] == vacancy_id:
+            return self._store._chat_item(self.rows[position])
+        return None
+
+    @property
+    def recommender(self) -> LocalRecommender:
+        return self._lazy("_recommender", lambda: self._store._build_recommender(self.rows))
+
+    @property
+    def facet_index(self) -> FacetIndex:
+        return self._lazy("_facet_index", lambda: self._store._build_facet_index(self.rows))
+
+
+class _ChatItems(abc.Sequence):
+    """Неизменяемая последовательность элементов снимка; элемент собирается при обращении"""
+
+    def __init__(self, store: "ColumnarDatabase", rows: np.ndarray):
+        self._store = store
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return tuple(self._store._chat_item(row) for row in self._rows[index])
+        return self._store._chat_item(self._rows[index])
+
+    def __iter__(self) -> Iterator[Mapping]:
+        for row in self._rows:
+            yield self._store._chat_item(row)
+
+
+class ColumnarDatabase:
+    """
+    Хранилище вакансий в колоночных массивах; методы совпадают с Database.
+
+    Строки только добавляются: обновление вакансии помечает старую строку
+    удаленной и добавляет новую, поэтому снимки каталога остаются неизменными
+    без копирования данных. Поиск строки по ID - бинарный поиск по отсортированным
+    ID плюс словарь недавно добавленных строк.
+
+    Когда удаленных строк становится много (compact_ratio, compact_min_dead_rows),
+    живые строки переписываются в новые массивы. Снимок читает массивы через
+    поверхностную копию хранилища (_view), поэтому снимки, созданные до
+    компактификации, продолжают работать со старыми массивами.
+    """
+
+    # Фильтры и фасеты считаются по индексам снимка каталога (FacetIndex)
+    facets_in_sql = False
+
+    def __init__(self, seed: bool = True):
+        self._lock = threading.RLock()
+        self.companies: Dict[int, Company] = {}
+        # Версия - счетчик процесса, идентификатор каталога отличает ETag разных воркеров
+        self.catalog_id = uuid.uuid4().hex
+        self.version = 0
+        self.last_modified = datetime.now(timezone.utc)
+        self._snapshot: Optional[ColumnarSnapshot] = None
+        self.vacancy_fragments = FragmentCache()
+        self.company_fragments = FragmentCache()
+
+        self._size = 0
+        self._dead = 0
+        self.compact_ratio = COMPACT_DEAD_RATIO
+        self.compact_min_dead_rows = COMPACT_MIN_DEAD_ROWS
+        self._ids = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        self._alive = np.zeros(INITIAL_CAPACITY, dtype=bool)
+        self._company_ids = np.zeros(INITIAL_CAPACITY, dtype=np.int32)
+        self._salary_min = np.full(INITIAL_CAPACITY, np.nan, dtype=np.float64)
+        self._salary_max = np.full(INITIAL_CAPACITY, np.nan, dtype=np.float64)
+        self._posted = np.full(INITIAL_CAPACITY, NO_DATE, dtype=np.int64)
+        self._job_types = np.full(INITIAL_CAPACITY, -1, dtype=np.int8)
+        self._levels = np.full(INITIAL_CAPACITY, -1, dtype=np.int8)
+        self._location_codes = np.full(INITIAL_CAPACITY, -1, dtype=np.int32)
+        self._titles = _TextColumn()
+        self._descriptions = _TextColumn()
+        self._locations = _Vocabulary()
+
+        # Навыки в CSR: навыки строки row - записи с _skill_offsets[row] по _skill_offsets[row + 1]
+        self._skills = _Vocabulary(key=normalize_skill)
+        self._skill_offsets = np.zeros(INITIAL_CAPACITY + 1, dtype=np.int64)
+        self._skill_entries = 0
+        self._skill_ids = np.zeros(INITIAL_CAPACITY * 8, dtype=np.int32)
+        self._skill_kinds = np.zeros(INITIAL_CAPACITY * 8, dtype=np.int8)
+        self._skill_rows = np.zeros(INITIAL_CAPACITY * 8, dtype=np.int32)
+        # Инвертированный индекс навык -> ID живых вакансий, обновляется при каждой записи
+        self.skill_index = SkillIndex()
+
+        # Поиск строки по ID
+        self._sorted_ids = np.zeros(0, dtype=np.int64)
+        self._sorted_rows = np.zeros(0, dtype=np.int64)
+        self._recent: Dict[int, int] = {}
+
+        if seed:
+            from database import MOCK_COMPANIES, MOCK_VACANCIES
+            self.bulk_load(MOCK_VACANCIES, MOCK_COMPANIES)
+
+    @classmethod
+    def from_ndjson(cls, vacancies_path: str, companies_path: Optional[str] = None) -> "ColumnarDatabase":
+        """Хранилище, заполненное из NDJSON-файлов (по одной вакансии/компании в строке)"""
+        storage = cls(seed=False)
+        companies = _read_ndjson(companies_path, Company) if companies_path else ()
+        storage.bulk_load(_read_ndjson(vacancies_path, Vacancy), companies)
+        return storage
+
+    # Версия каталога
+
+    def _bump_version(self) -> None:
+        self.version += 1
+        self.last_modified = datetime.now(timezone.utc)
+
+    def get_catalog_state(self) -> Tuple[int, datetime]:
+        """Версия каталога и время его последнего изменения"""
+        return self.version, self.last_modified
+
+    # Поиск строки по ID
+
+    def _row_of(self, vacancy_id: int) -> Optional[int]:
+        row = self._recent.get(vacancy_id)
+        if row is not None:
+            return row
+        position = np.searchsorted(self._sorted_ids, vacancy_id)
+        if position < len(self._sorted_ids) and self._sorted_ids[position] == vacancy_id:
+            row = int(self._sorted_rows[position])
+            if self._alive[row]:
+                return row
+        return None
+
+    def _reindex(self) -> None:
+        """Переносит недавно добавленные строки в отсортированный индекс"""
+        rows = np.flatnonzero(self._alive[:self._size])
+        order = np.argsort(self._ids[rows], kind="stable")
+        self._sorted_rows = rows[order]
+        self._sorted_ids = self._ids[self._sorted_rows]
+        self._recent = {}
+
+    def _alive_rows_by_id(self) -> np.ndarray:
+        if self._recent:
+            self._reindex()
+        # В отсортированном индексе остаются строки, удаленные после переиндексации
+        rows = self._sorted_rows
+        return rows[self._alive[rows]]
+
+    # Запись
+
+    def _append(self, vacancy: Vacancy) -> None:
+        row = self._size
+        size = row + 1
+        self._ids = _grow(self._ids, size)
+        self._alive = _grow(self._alive, size, False)
+        self._company_ids = _grow(self._company_ids, size)
+        self._salary_min = _grow(self._salary_min, size, np.nan)
+        self._salary_max = _grow(self._salary_max, size, np.nan)
+        self._posted = _grow(self._posted, size, NO_DATE)
+        self._job_types = _grow(self._job_types, size, -1)
+        self._levels = _grow(self._levels, size, -1)
+        self._location_codes = _grow(self._location_codes, size, -1)
+
+        self._ids[row] = vacancy.id
+        self._alive[row] = True
+        self._company_ids[row] = vacancy.company_id
+        self._salary_min[row] = np.nan if vacancy.salary_min is None else vacancy.salary_min
+        self._salary_max[row] = np.nan if vacancy.salary_max is None else vacancy.salary_max
+        self._posted[row] = _encode_date(vacancy.posted_date)
+        self._job_types[row] = JOB_TYPE_CODES[vacancy.job_type.value] if vacancy.job_type else -1
+        self._levels[row] = LEVEL_CODES[vacancy.experience_level.value] if vacancy.experience_level else -1
+        if vacancy.location is not None:
+            self._location_codes[row] = self._locations.code(vacancy.location)
+        self._titles.append(row, vacancy.title)
+        self._descriptions.append(row, vacancy.description)
+
+        entries = [(self._skills.code(s), REQUIRED) for s in vacancy.required_skills if normalize_skill(s)]
+        entries += [(self._skills.code(s), PREFERRED) for s in vacancy.preferred_skills if normalize_skill(s)]
+        start, end = self._skill_entries, self._skill_entries + len(entries)
+        self._skill_ids = _grow(self._skill_ids, end)
+        self._skill_kinds = _grow(self._skill_kinds, end)
+        self._skill_rows = _grow(self._skill_rows, end)
+        for i, (skill_id, kind) in enumerate(entries, start=start):
+            self._skill_ids[i] = skill_id
+            self._skill_kinds[i] = kind
+        self._skill_rows[start:end] = row
+        self._skill_entries = end
+        self._skill_offsets = _grow(self._skill_offsets, size + 1)
+        self._skill_offsets[size] = end
+        self.skill_index.add(vacancy.id, vacancy.required_skills, vacancy.preferred_skills)
+
+        self._size = size
+        self._recent[vacancy.id] = row
+        if len(self._recent) > max(1024, self._size // 16):
+            self._reindex()
+
+    def _tombstone(self, vacancy_id: int) -> bool:
+        row = self._row_of(vacancy_id)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._dead += 1
+        self._recent.pop(vacancy_id, None)
+        self.skill_index.remove(vacancy_id)
+        return True
+
+    def add_vacancy(self, vacancy: Vacancy) -> None:
+        """Добавить или обновить вакансию"""
+        with self._lock:
+            self._tombstone(vacancy.id)
+            self._append(vacancy)
+            self.vacancy_fragments.invalidate(vacancy.id)
+            self._bump_version()
+            self._maybe_compact()
+
+    def remove_vacancy(self, vacancy_id: int) -> Optional[Vacancy]:
+        """Удалить вакансию"""
+        with self._lock:
+            vacancy = self.get_vacancy_by_id(vacancy_id)
+            if vacancy is None:
+                return None
+            self._tombstone(vacancy_id)
+            self.vacancy_fragments.invalidate(vacancy_id)
+            self._bump_version()
+            self._maybe_compact()
+        return vacancy
+
+    def add_company(self, company: Company) -> None:
+        """Добавить или обновить компанию"""
+        with self._lock:
+            self.companies[company.id] = company
+            self.company_fragments.invalidate(company.id)
+            # Компания вложена в JSON вакансий
+            rows = np.flatnonzero(self._alive[:self._size] & (self._company_ids[:self._size] == company.id))
+            self.vacancy_fragments.invalidate(*self._ids[rows].tolist())
+            self._bump_version()
+
+    def bulk_load(self, vacancies: Iterable[Vacancy], companies: Iterable[Company] = (), batch_size: int = 0) -> int:
+        """
+        Массовая загрузка каталога (принимает любые итерируемые источники, в том числе генераторы).
+        Версия каталога увеличивается один раз. batch_size оставлен для совместимости с SQLiteDatabase.
+        """
+        loaded = 0
+        with self._lock:
+            for company in companies:
+                self.companies[company.id] = company
+            for vacancy in vacancies:
+                self._tombstone(vacancy.id)
+                self._append(vacancy)
+                loaded += 1
+            self._reindex()
+            self.vacancy_fragments.clear()
+            self.company_fragments.clear()
+            self._bump_version()
+            self._maybe_compact()
+        return loaded
+
+    # Компактификация
+
+    def _maybe_compact(self) -> None:
+        if self._dead >= self.compact_min_dead_rows and self._dead > self.compact_ratio * self._size:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Переписывает живые строки (в прежнем порядке) в новые массивы и отбрасывает удаленные.
+        Старые массивы не меняются: ими продолжают пользоваться уже созданные снимки.
+        Новые массивы - без запаса емкости, при следующей записи они растут как обычно.
+        Версия каталога не меняется - содержимое остается тем же.
+        """
+        with self._lock:
+            rows = np.flatnonzero(self._alive[:self._size])
+            size = len(rows)
+
+            # Записи навыков строк rows в CSR: диапазоны [starts, ends) подряд
+            starts, ends = self._skill_offsets[rows], self._skill_offsets[rows + 1]
+            lengths = ends - starts
+            entries = int(lengths.sum())
+            offsets = np.zeros(size + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            entry_rows = np.repeat(np.arange(size, dtype=np.int64), lengths)
+            source = np.arange(entries, dtype=np.int64) - offsets[entry_rows] + starts[entry_rows]
+
+            # Индексирование массивом создает новые массивы
+            self._ids = self._ids[rows]
+            self._alive = self._alive[rows]
+            self._company_ids = self._company_ids[rows]
+            self._salary_min = self._salary_min[rows]
+            self._salary_max = self._salary_max[rows]
+            self._posted = self._posted[rows]
+            self._job_types = self._job_types[rows]
+            self._levels = self._levels[rows]
+            self._location_codes = self._location_codes[rows]
+            self._titles = self._titles.take(rows)
+            self._descriptions = self._descriptions.take(rows)
+            self._skill_ids = self._skill_ids[source]
+            self._skill_kinds = self._skill_kinds[source]
+            self._skill_rows = entry_rows.astype(np.int32)
+            self._skill_offsets = offsets
+            self._skill_entries = entries
+            self._size = size
+            self._dead = 0
+            self._reindex()
+
+    # Материализация
+
+    def _vacancies(self, rows: Iterable[int]) -> List[Vacancy]:
+        """
+        Модели Vacancy для строк. Столбцы выбираются для всех строк сразу, а модели
+        создаются без повторной валидации: данные уже проверены при записи.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self._skill_offsets[rows].tolist()
+        ends = self._skill_offsets[rows + 1].tolist()
+        names = self._skills.values
+        locations = self._locations.values
+        vacancies = []
+        for row, vacancy_id, company_id, location, salary_min, salary_max, job_type, level, posted, start, end in zip(
+            rows.tolist(),
+            self._ids[rows].tolist(),
+            self._company_ids[rows].tolist(),
+            self._location_codes[rows].tolist(),
+            self._salary_min[rows].tolist(),
+            self._salary_max[rows].tolist(),
+            self._job_types[rows].tolist(),
+            self._levels[rows].tolist(),
+            self._posted[rows].tolist(),
+            starts,
+            ends,
+        ):
+            entries = self._skill_ids[start:end].tolist()
+            kinds = self._skill_kinds[start:end].tolist()
+            vacancies.append(Vacancy.model_construct(
+                _fields_set=set(VACANCY_FIELDS),
+                id=vacancy_id,
+                title=self._titles[row],
+                description=self._descriptions[row],
+                company_id=company_id,
+                company=self.companies.get(company_id),
+                location=locations[location] if location >= 0 else None,
+                salary_min=None if salary_min != salary_min else salary_min,
+                salary_max=None if salary_max != salary_max else salary_max,
+                job_type=JOB_TYPES[job_type] if job_type >= 0 else None,
+                experience_level=LEVELS[level] if level >= 0 else None,
+                required_skills=[names[s] for s, k in zip(entries, kinds) if k == REQUIRED],
+                preferred_skills=[names[s] for s, k in zip(entries, kinds) if k == PREFERRED],
+                posted_date=_decode_date(posted),
+            ))
+        return vacancies
+
+    def _vacancy(self, row: int) -> Vacancy:
+        return self._vacancies((row,))[0]
+
+    def _chat_item(self, row: int) -> Mapping:
+        """Элемент снимка для чат-бота (как vacancy_to_chat_item) прямо из массивов"""
+        vacancy = self._vacancy(int(row))
+        return MappingProxyType({
+            "id": vacancy.id,
+            "title": vacancy.title,
+            "description": vacancy.description,
+            "company_name": vacancy.company.name if vacancy.company else "N/A",
+            "location": vacancy.location,
+            "salary_min": vacancy.salary_min,
+            "salary_max": vacancy.salary_max,
+            "job_type": vacancy.job_type.value if vacancy.job_type else None,
+            "experience_level": vacancy.experience_level.value if vacancy.experience_level else None,
+            "required_skills": tuple(vacancy.required_skills),
+            "preferred_skills": tuple(vacancy.preferred_skills),
+        })
+
+    # Чтение
+
+    def get_all_vacancies(self) -> List[Vacancy]:
+        """Получить все вакансии (по возрастанию ID)"""
+        with self._lock:
+            return self._vacancies(self._alive_rows_by_id())
+
+    def get_vacancy_by_id(self, vacancy_id: int) -> Optional[Vacancy]:
+        """Получить вакансию по ID"""
+        # Под блокировкой: компактификация меняет номера строк
+        with self._lock:
+            row = self._row_of(vacancy_id)
+            return self._vacancy(row) if row is not None else None
+
+    def get_vacancies_by_ids(self, vacancy_ids: Iterable[int]) -> List[Vacancy]:
+        """Вакансии по списку ID в том же порядке (отсутствующие пропускаются)"""
+        with self._lock:
+            rows = [self._row_of(vacancy_id) for vacancy_id in vacancy_ids]
+            return self._vacancies([row for row in rows if row is not None])
+
+    def get_vacancies_by_skills(self, skills: List[str], match: str = "any", scope: str = "all") -> List[Vacancy]:
+        """
+        Получить вакансии, требующие указанные навыки
+
+        - **match**: "any" - любой из навыков, "all" - все навыки
+        - **scope**: "all", "required" или "preferred" - где искать навыки
+
+        Результат отсортирован по числу совпавших навыков.
+        """
+        with self._lock:
+            return self.get_vacancies_by_ids(self.skill_index.search(skills, match=match, scope=scope))
+
+    def facet_search(self, query: Optional[str] = None, **filters):
+        """
+        Фильтры, страница и фасеты по индексам полей снимка (FacetIndex.search),
+        построенным прямо из массивов; query - полнотекстовый поиск BM25
+        """
+        return self.get_catalog_snapshot().facet_search(query, **filters)
+
+    def get_catalog_snapshot(self) -> CatalogSnapshot:
+        """
+        Получить неизменяемый снимок вакансий в формате для чат-бота.
+        Снимок пересобирается только после изменения каталога.
+        """
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != self.version:
+                self._snapshot = ColumnarSnapshot(self.version, self._view(), self._alive_rows_by_id().copy())
+            return self._snapshot
+
+    def _view(self) -> "ColumnarDatabase":
+        """
+        Поверхностная копия хранилища для снимка: ссылки на текущие массивы, размер
+        и число записей навыков. Запись дописывает строки после них, а компактификация
+        заменяет массивы новыми, поэтому строки снимка в копии не меняются.
+        """
+        return copy.copy(self)
+
+    def _snapshot_skill_pairs(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.int64]:
+        """
+        Записи навыков строк снимка: ключи позиция * размер словаря + ID навыка
+        (в порядке CSR, с повторами) и вид записи
+        """
+        positions = np.full(self._size, -1, dtype=np.int64)
+        positions[rows] = np.arange(len(rows))
+        n = self._skill_entries
+        entry_positions = positions[self._skill_rows[:n]]
+        in_snapshot = entry_positions >= 0
+        vocabulary_size = np.int64(max(len(self._skills), 1))
+        pairs = entry_positions[in_snapshot] * vocabulary_size + self._skill_ids[:n][in_snapshot]
+        return pairs, self._skill_kinds[:n][in_snapshot], vocabulary_size
+
+    def _build_recommender(self, rows: np.ndarray) -> LocalRecommender:
+        """Движок рекомендаций по строкам снимка прямо из CSR-массивов навыков"""
+        pairs, kinds, vocabulary_size = self._snapshot_skill_pairs(rows)
+        # Навык, указанный и в обязательных, и в желательных, учитывается один раз - как обязательный
+        pairs, first = np.unique(pairs, return_index=True)
+        weights = np.where(kinds[first] == REQUIRED, 2.0, 1.0)
+        return LocalRecommender.from_arrays(
+            vacancy_ids=self._ids[rows],
+            levels=self._levels[rows],
+            skill_names=self._skills.values,
+            rows=pairs // vocabulary_size,
+            columns=pairs % vocabulary_size,
+            weights=weights,
+        )
+
+    def _build_facet_index(self, rows: np.ndarray) -> FacetIndex:
+        """Индексы полей снимка для фасетного поиска прямо из массивов"""
+        # Города с одинаковым ключом (регистр, пробелы) объединяются в одно значение фасета
+        keys: Dict[str, int] = {}
+        location_names: List[str] = []
+        remap = np.zeros(len(self._locations) + 1, dtype=np.int32)
+        for code, name in enumerate(self._locations.values):
+            key = normalize_location(name)
+            if key not in keys:
+                keys[key] = len(location_names)
+                location_names.append(name.strip())
+            remap[code] = keys[key]
+        remap[-1] = -1
+
+        pairs, kinds, vocabulary_size = self._snapshot_skill_pairs(rows)
+        unique_pairs = np.unique(pairs)
+        return FacetIndex(
+            vacancy_ids=self._ids[rows],
+            levels=self._levels[rows],
+            job_types=self._job_types[rows],
+            locations=remap[self._location_codes[rows]],
+            location_names=location_names,
+            salary_min=self._salary_min[rows],
+            salary_max=self._salary_max[rows],
+            skill_rows=unique_pairs // vocabulary_size,
+            skill_columns=unique_pairs % vocabulary_size,
+            skill_required=np.isin(unique_pairs, pairs[kinds == REQUIRED]),
+            skill_preferred=np.isin(unique_pairs, pairs[kinds == PREFERRED]),
+            skill_names=self._skills.values,
+        )
+
+    def get_vacancies_data_for_chat(self) -> List[Dict]:
+        """
+        Получить данные о вакансиях в формате для чат-бота
+        """
+        return [dict(item) for item in self.get_catalog_snapshot()]
+
+    def get_company_by_id(self, company_id: int) -> Optional[Company]:
+        """Получить компанию по ID"""
+        return self.companies.get(company_id)
+
+    def get_all_companies(self) -> List[Company]:
+        """Получить все компании"""
+        return list(self.companies.values())
+
+    def encode_vacancies(self, vacancies: List[Vacancy], version: int) -> bytes:
+        """
+        JSON-массив вакансий из кэшированных фрагментов (сбрасываются при изменении вакансии или компании).
+        Модели, прочитанные до изменения каталога (version устарела), кодируются без сохранения.
+        """
+        return self.vacancy_fragments.encode_list(vacancies, store=version == self.version)
+
+    def encode_companies(self, companies: List[Company], version: int) -> bytes:
+        """JSON-массив компаний из кэшированных фрагментов (см. encode_vacancies)"""
+        return self.company_fragments.encode_list(companies, store=version == self.version)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Байты, занятые массивами и текстом (без словарей навыков и городов)"""
+        arrays = (
+            self._ids, self._alive, self._company_ids, self._salary_min, self._salary_max, self._posted,
+            self._job_types, self._levels, self._location_codes, self._skill_offsets, self._skill_ids,
+            self._skill_kinds, self._skill_rows, self._sorted_ids, self._sorted_rows,
+        )
+        return {
+            "vacancies": int(np.count_nonzero(self._alive[:self._size])),
+            "rows": self._size,
+            "arrays": sum(a.nbytes for a in arrays),
+            "text": self._titles.nbytes + self._descriptions.nbytes,
+        }
+
+
+def _encode_date(value: Optional[datetime]) -> int:
+    if value is None:
+        return NO_DATE
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _decode_date(value: int) -> Optional[datetime]:
+    return None if value == NO_DATE else EPOCH + timedelta(microseconds=int(value))
+
+
+def _read_ndjson(path: str, model):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield model.model_validate_json(line)
@@ -0,0 +1,84 @@
+"""
+Общие фикстуры тестов: хранилища каталога, локальный сервер benchmarks/fake_openai.py
+вместо OpenAI и клиент приложения, который обращается к нему
+"""
+import os
+import socket
+import sys
+import threading
+import time
+
+import pytest
+import uvicorn
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+import fake_openai  # noqa: E402
+
+from columnar import ColumnarDatabase  # noqa: E402
+from database import Database  # noqa: E402
+from sqlite_database import SQLiteDatabase  # noqa: E402
+
+
+@pytest.fixture(params=["memory", "sqlite", "columnar"])
+def db(request, tmp_path):
+    """Каждое из хранилищ каталога с мок-данными"""
+    if request.param == "sqlite":
+        database = SQLiteDatabase(str(tmp_path / "vacancies.db"))
+        yield database
+        database.close()
+    elif request.param == "columnar":
+        yield ColumnarDatabase()
+    else:
+        yield Database()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def fake_url():
+    """Фейковый сервер OpenAI в фоновом потоке"""
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(fake_openai.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}/v1"
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+def fake(fake_url):
+    """Настройки фейкового сервера; после теста восстанавливаются"""
+    saved = {name: getattr(fake_openai.settings, name) for name in vars(fake_openai.Settings) if not name.startswith("_")}
+    fake_openai.settings.latency = 0.0
+    fake_openai.settings.chunk_delay = 0.0
+    yield fake_openai.settings
+    for name, value in saved.items():
+        setattr(fake_openai.settings, name, value)
+
+
+@pytest.fixture
+def client(fake, fake_url, monkeypatch):
+    """
+    TestClient приложения с каталогом в памяти (свой для каждого теста) и OpenAI
+    на фейковом сервере. Запускает lifespan: хранилище, сервисы и прогрев.
+    """
+    from fastapi.testclient import TestClient
+
+    import main
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("OPENAI_BASE_URL", fake_url)
+    monkeypatch.setenv("OPENAI_RETRY_BASE_DELAY", "0.01")
+    monkeypatch.setenv("OPENAI_RETRY_MAX_DELAY", "0.02")
+    monkeypatch.delenv("CHAT_SESSIONS_DB", raising=False)
+    monkeypatch.setattr(main, "get_database", Database)
+    main.recommendations_cache.clear()
+    with TestClient(main.app) as test_client:
+        yield test_client
@@ -3,9 +3,15 @@
 В реальном проекте здесь будет подключение к БД.
 Сейчас используем мок-данные для демонстрации.
 """
-from typing import List, Dict, Optional
+import os
+import threading
+import uuid
+from typing import Iterable, List, Dict, Optional, Tuple
 from models import Vacancy, Company, JobType, ExperienceLevel
-from datetime import datetime
+from skill_index import SkillIndex
+from catalog import CatalogSnapshot
+from serialization import FragmentCache
+from datetime import datetime, timezone
 
 
 # Мок-данные компаний
@@ -118,12 +124,61 @@ class Database:
     В реальном проекте здесь будет подключение к БД (PostgreSQL, MongoDB и т.д.)
     """
     
+    # Фильтры и фасеты считаются по индексам снимка каталога (FacetIndex)
+    facets_in_sql = False
+    
     def __init__(self):
         self.companies = {c.id: c for c in MOCK_COMPANIES}
         self.vacancies = {}
+        self.skill_index = SkillIndex()
+        # Версия каталога увеличивается при каждом изменении вакансий или компаний.
+        # Счетчик свой у каждого процесса, поэтому в ETag входит и идентификатор каталога
+        self.catalog_id = uuid.uuid4().hex
+        self.version = 0
+        self.last_modified = datetime.now(timezone.utc)
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+        # Закодированный JSON вакансий и компаний для списочных ответов API
+        self.vacancy_fragments = FragmentCache()
+        self.company_fragments = FragmentCache()
         for vac in MOCK_VACANCIES:
-            vac.company = self.companies.get(vac.company_id)
-            self.vacancies[vac.id] = vac
+            self.add_vacancy(vac)
+    
+    def _bump_version(self) -> None:
+        self.version += 1
+        self.last_modified = datetime.now(timezone.utc)
+    
+    def get_catalog_state(self) -> Tuple[int, datetime]:
+        """Версия каталога и время его последнего изменения"""
+        return self.version, self.last_modified
+    
+    def add_vacancy(self, vacancy: Vacancy) -> None:
+        """Добавить или обновить вакансию"""
+        vacancy.company = self.companies.get(vacancy.company_id)
+        self.vacancies[vacancy.id] = vacancy
+        self.skill_index.add(vacancy.id, vacancy.required_skills, vacancy.preferred_skills)
+        self.vacancy_fragments.invalidate(vacancy.id)
+        self._bump_version()
+    
+    def remove_vacancy(self, vacancy_id: int) -> Optional[Vacancy]:
+        """Удалить вакансию"""
+        self.skill_index.remove(vacancy_id)
+        vacancy = self.vacancies.pop(vacancy_id, None)
+        self.vacancy_fragments.invalidate(vacancy_id)
+        if vacancy is not None:
+            self._bump_version()
+        return vacancy
+    
+    def add_company(self, company: Company) -> None:
+        """Добавить или обновить компанию"""
+        self.companies[company.id] = company
+        self.company_fragments.invalidate(company.id)
+        for vacancy in self.vacancies.values():
+            if vacancy.company_id == company.id:
+                vacancy.company = company
+                # Компания вложена в JSON вакансии
+                self.vacancy_fragments.invalidate(vacancy.id)
+        self._bump_version()
     
     def get_all_vacancies(self) -> List[Vacancy]:
         """Получить все вакансии"""
@@ -133,38 +188,50 @@ class Database:
         """Получить вакансию по ID"""
         return self.vacancies.get(vacancy_id)
     
-    def get_vacancies_by_skills(self, skills: List[str]) -> List[Vacancy]:
-        """Получить вакансии, требующие указанные навыки"""
-        matching = []
-        skills_lower = [s.lower() for s in skills]
+    def get_vacancies_by_ids(self, vacancy_ids: Iterable[int]) -> List[Vacancy]:
+        """Вакансии по списку ID в том же порядке (отсутствующие пропускаются)"""
+        return [self.vacancies[vid] for vid in vacancy_ids if vid in self.vacancies]
+    
+    def get_vacancies_by_skills(
+        self,
+        skills: List[str],
+        match: str = "any",
+        scope: str = "all"
+    ) -> List[Vacancy]:
+        """
+        Получить вакансии, требующие указанные навыки
         
-        for vacancy in self.vacancies.values():
-            vacancy_skills = [s.lower() for s in vacancy.required_skills + vacancy.preferred_skills]
-            if any(skill in vacancy_skills for skill in skills_lower):
-                matching.append(vacancy)
+        - **match**: "any" - любой из навыков, "all" - все навыки
+        - **scope**: "all", "required" или "preferred" - где искать навыки
         
-        return matching
+        Результат отсортирован по числу совпавших навыков.
+        """
+        ids = self.skill_index.search(skills, match=match, scope=scope)
+        return [self.vacancies[vid] for vid in ids]
+    
+    def facet_search(self, query: Optional[str] = None, **filters):
+        """
+        Фильтры, страница и фасеты по индексам полей снимка каталога (FacetIndex.search):
+        ID вакансий страницы, общее число найденных и счетчики фасетов.
+        query - полнотекстовый поиск BM25 по названию, описанию и навыкам.
+        """
+        return self.get_catalog_snapshot().facet_search(query, **filters)
+    
+    def get_catalog_snapshot(self) -> CatalogSnapshot:
+        """
+        Получить неизменяемый снимок вакансий в формате для чат-бота.
+        Снимок пересобирается только после изменения каталога.
+        """
+        with self._snapshot_lock:
+            if self._snapshot is None or self._snapshot.version != self.version:
+                self._snapshot = CatalogSnapshot.from_vacancies(self.version, list(self.vacancies.values()))
+            return self._snapshot
     
     def get_vacancies_data_for_chat(self) -> List[Dict]:
         """
         Получить данные о вакансиях в формате для чат-бота
         """
-        result = []
-        for vac in self.vacancies.values():
-            result.append({
-                "id": vac.id,
-                "title": vac.title,
-                "description": vac.description,
-                "company_name": vac.company.name if vac.company else "N/A",
-                "location": vac.location,
-                "salary_min": vac.salary_min,
-                "salary_max": vac.salary_max,
-                "job_type": vac.job_type.value if vac.job_type else None,
-                "experience_level": vac.experience_level.value if vac.experience_level else None,
-                "required_skills": vac.required_skills,
-                "preferred_skills": vac.preferred_skills,
-            })
-        return result
+        return [dict(item) for item in self.get_catalog_snapshot()]
     
     def get_company_by_id(self, company_id: int) -> Optional[Company]:
         """Получить компанию по ID"""
@@ -173,8 +240,64 @@ class Database:
     def get_all_companies(self) -> List[Company]:
         """Получить все компании"""
         return list(self.companies.values())
+    
+    def encode_vacancies(self, vacancies: List[Vacancy], version: int) -> bytes:
+        """
+        JSON-массив вакансий из кэшированных фрагментов.
+        Фрагменты сбрасываются при изменении вакансии или ее компании; version - версия
+        каталога, при которой прочитаны vacancies: если каталог с тех пор изменился,
+        фрагменты этих моделей не сохраняются.
+        """
+        return self.vacancy_fragments.encode_list(vacancies, store=version == self.version)
+    
+    def encode_companies(self, companies: List[Company], version: int) -> bytes:
+        """JSON-массив компаний из кэшированных фрагментов (см. encode_vacancies)"""
+        return self.company_fragments.encode_list(companies, store=version == self.version)
+
+
+def create_database():
+    """
+    Создает хранилище, выбранное переменной окружения AI_DB_BACKEND:
+    - memory (по умолчанию): мок-данные в памяти процесса
+    - sqlite: файл SQLite (AI_DB_PATH) с полнотекстовым поиском FTS5
+    - columnar: колоночные массивы в памяти; каталог загружается из NDJSON
+      (AI_DB_VACANCIES, AI_DB_COMPANIES), без них - мок-данные
+    """
+    backend = os.getenv("AI_DB_BACKEND", "memory").lower()
+    if backend == "sqlite":
+        from sqlite_database import SQLiteDatabase
+        return SQLiteDatabase(os.getenv("AI_DB_PATH", "vacancies.db"))
+    if backend == "columnar":
+        from columnar import ColumnarDatabase
+        vacancies_path = os.getenv("AI_DB_VACANCIES")
+        if vacancies_path:
+            return ColumnarDatabase.from_ndjson(vacancies_path, os.getenv("AI_DB_COMPANIES") or None)
+        return ColumnarDatabase()
+    if backend != "memory":
+        raise ValueError(f"Неизвестное хранилище AI_DB_BACKEND={backend}")
+    return Database()
+
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def get_database():
+    """
+    Глобальный экземпляр БД. Создается при первом обращении (при старте приложения),
+    а не при импорте модуля: загрузка каталога может занимать заметное время.
+    """
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = create_database()
+    return _db
 
 
-# Глобальный экземпляр БД
-db = Database()
+def __getattr__(name: str):
+    # `from database import db` по-прежнему возвращает глобальный экземпляр
+    if name == "db":
+        return get_database()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
@@ -0,0 +1,358 @@
+"""
+Фасетный поиск вакансий по заранее построенным индексам полей.
+Индекс строится один раз на снимок каталога: битовые маски по значениям уровня
+опыта и типа занятости, списки позиций по городам и навыкам, отсортированные
+массивы зарплат. Фильтры - векторные операции над масками, а модели Vacancy
+создаются только для вакансий запрошенной страницы.
+"""
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models import ExperienceLevel, JobType
+from recommender import LEVEL_CODES
+from skill_index import normalize_skill
+
+
+LEVEL_VALUES = [level.value for level in ExperienceLevel]
+JOB_TYPE_VALUES = [job_type.value for job_type in JobType]
+JOB_TYPE_CODES = {value: code for code, value in enumerate(JOB_TYPE_VALUES)}
+
+
+def normalize_location(location: str) -> str:
+    """Ключ города для фильтра: без учета регистра и пробелов по краям"""
+    return location.strip().lower()
+
+
+def _csr(keys: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Порядок элементов, сгруппированных по ключу, и смещения групп (ключи 0..size-1)"""
+    order = np.argsort(keys, kind="stable")
+    offsets = np.searchsorted(keys[order], np.arange(size + 1))
+    return order, offsets
+
+
+def _and(masks: Sequence[Optional[np.ndarray]]) -> Optional[np.ndarray]:
+    """Пересечение масок; None - фильтр не задан"""
+    result = None
+    for mask in masks:
+        if mask is None:
+            continue
+        result = mask.copy() if result is None else np.logical_and(result, mask, out=result)
+    return result
+
+
+def _ranks(keys: List[str]) -> np.ndarray:
+    """Места ключей в алфавитном порядке (для детерминированного порядка значений с равным числом)"""
+    ranks = np.empty(len(keys), dtype=np.int64)
+    ranks[sorted(range(len(keys)), key=keys.__getitem__)] = np.arange(len(keys))
+    return ranks
+
+
+def _counts(
+    values: List[str],
+    counts: np.ndarray,
+    size: Optional[int] = None,
+    ranks: Optional[np.ndarray] = None
+) -> List[Dict[str, Any]]:
+    """
+    Значения фасета с ненулевым числом вакансий, по убыванию числа.
+    При равном числе - по ranks (как ORDER BY count DESC, key в SQLiteDatabase), иначе по порядку values.
+    """
+    order = np.argsort(-counts, kind="stable") if ranks is None else np.lexsort((ranks, -counts))
+    order = order[counts[order] > 0]
+    if size is not None:
+        order = order[:size]
+    return [{"value": values[i], "count": int(counts[i])} for i in order]
+
+
+class FacetIndex:
+    """
+    Индексы полей снимка каталога для фильтров, фасетов и постраничной выдачи.
+
+    Позиции вакансий совпадают с позициями в снимке. Навыки хранятся
+    уникальными парами (позиция, навык) с признаками "есть в обязательных"
+    и "есть в желательных", отсортированными по позиции.
+    """
+
+    def __init__(
+        self,
+        vacancy_ids: np.ndarray,
+        levels: np.ndarray,
+        job_types: np.ndarray,
+        locations: np.ndarray,
+        location_names: List[str],
+        salary_min: np.ndarray,
+        salary_max: np.ndarray,
+        skill_rows: np.ndarray,
+        skill_columns: np.ndarray,
+        skill_required: np.ndarray,
+        skill_preferred: np.ndarray,
+        skill_names: List[str]
+    ):
+        self.size = len(vacancy_ids)
+        self.vacancy_ids = vacancy_ids
+
+        # Битовые маски по значениям перечислений; код -1 - значение не указано
+        self._levels = levels
+        self._level_masks = [levels == code for code in range(len(LEVEL_VALUES))]
+        self._job_types = job_types
+        self._job_type_masks = [job_types == code for code in range(len(JOB_TYPE_VALUES))]
+
+        # Города: позиции вакансий по коду города
+        self._locations = locations
+        self.location_names = location_names
+        self._location_keys = {normalize_location(name): code for code, name in enumerate(location_names)}
+        self._location_ranks = _ranks([normalize_location(name) for name in location_names])
+        self._location_order, self._location_offsets = _csr(
+            np.where(locations >= 0, locations, len(location_names)), len(location_names)
+        )
+
+        # Верхняя и нижняя граница вилки (если указана одна граница - она же вторая), отсортированные
+        self._salary_top = np.where(np.isnan(salary_max), salary_min, salary_max)
+        self._salary_bottom = np.where(np.isnan(salary_min), salary_max, salary_min)
+        self._top_order, self._top_sorted = self._sorted_salaries(self._salary_top)
+        self._bottom_order, self._bottom_sorted = self._sorted_salaries(self._salary_bottom)
+
+        # Навыки: пары по позиции (для подсчета фасета) и по навыку (для фильтра)
+        self.skill_names = skill_names
+        self._skill_ids = {normalize_skill(name): i for i, name in enumerate(skill_names)}
+        self._skill_ranks = _ranks([normalize_skill(name) for name in skill_names])
+        self._skill_columns = skill_columns
+        self._skill_row_offsets = np.searchsorted(skill_rows, np.arange(self.size + 1))
+        self._skill_order, self._skill_offsets = _csr(skill_columns, len(skill_names))
+        self._skill_rows = skill_rows
+        self._skill_required = skill_required
+        self._skill_preferred = skill_preferred
+
+        # Фасеты всего каталога по размеру списка значений
+        self._all_facets: Dict[int, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_items(cls, items: Sequence[Mapping]) -> "FacetIndex":
+        """Индекс по элементам снимка каталога (словари vacancy_to_chat_item)"""
+        size = len(items)
+        levels = np.full(size, -1, dtype=np.int8)
+        job_types = np.full(size, -1, dtype=np.int8)
+        locations = np.full(size, -1, dtype=np.int32)
+        salary_min = np.full(size, np.nan)
+        salary_max = np.full(size, np.nan)
+        location_codes: Dict[str, int] = {}
+        location_names: List[str] = []
+        skill_ids: Dict[str, int] = {}
+        skill_names: List[str] = []
+        pairs: Dict[Tuple[int, int], List[bool]] = {}
+
+        for position, item in enumerate(items):
+            levels[position] = LEVEL_CODES.get(item.get("experience_level"), -1)
+            job_types[position] = JOB_TYPE_CODES.get(item.get("job_type"), -1)
+            if item.get("location") is not None:
+                key = normalize_location(item["location"])
+                code = location_codes.get(key)
+                if code is None:
+                    code = location_codes[key] = len(location_names)
+                    location_names.append(item["location"].strip())
+                locations[position] = code
+            if item.get("salary_min") is not None:
+                salary_min[position] = item["salary_min"]
+            if item.get("salary_max") is not None:
+                salary_max[position] = item["salary_max"]
+            for kind, field in enumerate(("required_skills", "preferred_skills")):
+                for skill in item.get(field, ()):
+                    key = normalize_skill(skill)
+                    if not key:
+                        continue
+                    column = skill_ids.get(key)
+                    if column is None:
+                        column = skill_ids[key] = len(skill_names)
+                        skill_names.append(skill.strip())
+                    pairs.setdefault((position, column), [False, False])[kind] = True
+
+        keys = np.asarray(list(pairs), dtype=np.int64).reshape(-1, 2)
+        flags = np.asarray(list(pairs.values()), dtype=bool).reshape(-1, 2)
+        return cls(
+            vacancy_ids=np.fromiter((item["id"] for item in items), dtype=np.int64, count=size),
+            levels=levels,
+            job_types=job_types,
+            locations=locations,
+            location_names=location_names,
+            salary_min=salary_min,
+            salary_max=salary_max,
+            skill_rows=keys[:, 0],
+            skill_columns=keys[:, 1],
+            skill_required=flags[:, 0],
+            skill_preferred=flags[:, 1],
+            skill_names=skill_names,
+        )
+
+    @staticmethod
+    def _sorted_salaries(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        positions = np.flatnonzero(~np.isnan(values))
+        order = positions[np.argsort(values[positions], kind="stable")]
+        return order, values[order]
+
+    # Маски фильтров
+
+    def _enum_mask(self, masks: List[np.ndarray], codes: Dict[str, int], values: List[str]) -> np.ndarray:
+        result = np.zeros(self.size, dtype=bool)
+        for value in values:
+            code = codes.get(value)
+            if code is not None:
+                result |= masks[code]
+        return result
+
+    def _location_mask(self, locations: List[str]) -> np.ndarray:
+        result = np.zeros(self.size, dtype=bool)
+        for location in locations:
+            code = self._location_keys.get(normalize_location(location))
+            if code is not None:
+                result[self._location_order[self._location_offsets[code]:self._location_offsets[code + 1]]] = True
+        return result
+
+    def _salary_mask(self, salary_from: Optional[float], salary_to: Optional[float]) -> np.ndarray:
+        """Вилка пересекается с диапазоном: верхняя граница >= salary_from, нижняя <= salary_to"""
+        result = None
+        if salary_from is not None:
+            result = np.zeros(self.size, dtype=bool)
+            result[self._top_order[np.searchsorted(self._top_sorted, salary_from, side="left"):]] = True
+        if salary_to is not None:
+            below = np.zeros(self.size, dtype=bool)
+            below[self._bottom_order[:np.searchsorted(self._bottom_sorted, salary_to, side="right")]] = True
+            result = below if result is None else result & below
+        return result
+
+    def rank_skills(self, skills: List[str], match: str = "any", scope: str = "all") -> np.ndarray:
+        """
+        Позиции вакансий с навыками запроса: по числу совпавших навыков,
+        затем по совпадениям в обязательных навыках и по ID
+        """
+        query = [s for s in dict.fromkeys(normalize_skill(s) for s in skills) if s]
+        columns = [self._skill_ids[s] for s in query if s in self._skill_ids]
+        if not columns or (match == "all" and len(columns) < len(query)):
+            return np.zeros(0, dtype=np.int64)
+
+        entries = np.concatenate(
+            [self._skill_order[self._skill_offsets[c]:self._skill_offsets[c + 1]] for c in columns]
+        )
+        if scope == "required":
+            entries = entries[self._skill_required[entries]]
+        elif scope == "preferred":
+            entries = entries[self._skill_preferred[entries]]
+
+        positions, matches = np.unique(self._skill_rows[entries], return_counts=True)
+        required_hits = np.zeros(len(positions), dtype=np.int64)
+        if scope != "preferred":
+            required, counts = np.unique(self._skill_rows[entries[self._skill_required[entries]]], return_counts=True)
+            required_hits[np.searchsorted(positions, required)] = counts
+
+        if match == "all":
+            keep = matches == len(query)
+            positions, matches, required_hits = positions[keep], matches[keep], required_hits[keep]
+        return positions[np.lexsort((self.vacancy_ids[positions], -required_hits, -matches))]
+
+    # Фасеты
+
+    def _skill_counts(self, positions: np.ndarray) -> np.ndarray:
+        """Число вакансий с каждым навыком среди positions (проход только по их навыкам)"""
+        starts = self._skill_row_offsets[positions]
+        lengths = self._skill_row_offsets[positions + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.zeros(len(self.skill_names), dtype=np.int64)
+        shifts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        entries = shifts + np.arange(total)
+        return np.bincount(self._skill_columns[entries], minlength=len(self.skill_names))
+
+    def _facets(
+        self,
+        masks: Dict[str, Optional[np.ndarray]],
+        positions: np.ndarray,
+        facet_size: int
+    ) -> Dict[str, Any]:
+        """
+        Счетчики фасетов. Для уровня, типа занятости и города счетчик значения -
+        сколько вакансий нашлось бы, если выбрать это значение при остальных фильтрах
+        """
+        def disjunctive(field: str, codes: np.ndarray, size: int) -> np.ndarray:
+            others = _and([mask for name, mask in masks.items() if name != field])
+            selected = codes if others is None else codes[others]
+            return np.bincount(selected.astype(np.int64) + 1, minlength=size + 1)[1:]
+
+        top = self._salary_top[positions]
+        bottom = self._salary_bottom[positions]
+        return {
+            "experience_level": _counts(LEVEL_VALUES, disjunctive("experience_level", self._levels, len(LEVEL_VALUES))),
+            "job_type": _counts(JOB_TYPE_VALUES, disjunctive("job_type", self._job_types, len(JOB_TYPE_VALUES))),
+            "location": _counts(
+                self.location_names,
+                disjunctive("location", self._locations, len(self.location_names)),
+                facet_size,
+                self._location_ranks
+            ),
+            "skills": _counts(self.skill_names, self._skill_counts(positions), facet_size, self._skill_ranks),
+            "salary": {
+                "min": float(np.nanmin(bottom)) if np.any(~np.isnan(bottom)) else None,
+                "max": float(np.nanmax(top)) if np.any(~np.isnan(top)) else None,
+            },
+        }
+
+    def search(
+        self,
+        skills: Optional[List[str]] = None,
+        skills_match: str = "any",
+        skills_scope: str = "all",
+        experience_levels: Optional[List[str]] = None,
+        job_types: Optional[List[str]] = None,
+        locations: Optional[List[str]] = None,
+        salary_from: Optional[float] = None,
+        salary_to: Optional[float] = None,
+        relevance: Optional[np.ndarray] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        facets: bool = True,
+        facet_size: int = 20
+    ) -> Tuple[List[int], int, Optional[Dict[str, Any]]]:
+        """
+        ID вакансий страницы, общее число найденных и счетчики фасетов.
+
+        Несколько значений одного поля объединяются через ИЛИ, разные поля - через И.
+        relevance - оценки текстового запроса по позициям снимка: остаются вакансии
+        с положительной оценкой, отсортированные по ней. Без текста вакансии
+        упорядочены по навыкам (если заданы), иначе в порядке снимка.
+        """
+        masks: Dict[str, Optional[np.ndarray]] = {
+            "experience_level": self._enum_mask(self._level_masks, LEVEL_CODES, experience_levels)
+            if experience_levels else None,
+            "job_type": self._enum_mask(self._job_type_masks, JOB_TYPE_CODES, job_types) if job_types else None,
+            "location": self._location_mask(locations) if locations else None,
+            "salary": self._salary_mask(salary_from, salary_to),
+            "query": relevance > 0 if relevance is not None else None,
+        }
+        ranked = None
+        if skills:
+            ranked = self.rank_skills(skills, skills_match, skills_scope)
+            masks["skills"] = np.zeros(self.size, dtype=bool)
+            masks["skills"][ranked] = True
+
+        result = _and(masks.values())
+        if ranked is not None:
+            positions = ranked[result[ranked]]
+        elif result is not None:
+            positions = np.flatnonzero(result)
+        else:
+            positions = np.arange(self.size)
+        if relevance is not None:
+            positions = positions[np.argsort(-relevance[positions], kind="stable")]
+
+        total = len(positions)
+        page = positions[offset:offset + limit if limit is not None else None]
+
+        facet_counts = None
+        if facets:
+            if result is None:
+                # Фасеты всего каталога не зависят от запроса и считаются один раз
+                if facet_size not in self._all_facets:
+                    self._all_facets[facet_size] = self._facets(masks, positions, facet_size)
+                facet_counts = self._all_facets[facet_size]
+            else:
+                facet_counts = self._facets(masks, positions, facet_size)
+        return self.vacancy_ids[page].tolist(), total, facet_counts
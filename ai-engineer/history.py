@@ -0,0 +1,143 @@
+"""
+История разговора в пределах бюджета токенов.
+Последние сообщения передаются модели целиком, более ранние сжимаются
+в короткое локальное (экстрактивное) резюме. Резюме скользящее: когда сообщения
+выходят из окна, они дописываются к резюме предыдущего запроса, а не сжимаются заново.
+"""
+import hashlib
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import tiktoken
+
+from cache import LRUCache
+from models import ChatMessage
+
+
+# Служебные токены, которые API добавляет к каждому сообщению
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_HEADER = "Краткое содержание предыдущей части разговора:"
+ROLE_LABELS = {"user": "Пользователь", "assistant": "Ассистент", "system": "Система"}
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+SUMMARY_LINE_CHARS = 200
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """Число токенов текста по словарю модели"""
+    return len(_encoding(model).encode(text))
+
+
+def _summary_line(message: ChatMessage) -> str:
+    """Первое предложение сообщения, обрезанное до SUMMARY_LINE_CHARS символов"""
+    text = " ".join(message.content.split())
+    first = SENTENCE_RE.split(text, maxsplit=1)[0]
+    if len(first) > SUMMARY_LINE_CHARS:
+        first = first[:SUMMARY_LINE_CHARS].rstrip() + "…"
+    return f"{ROLE_LABELS.get(message.role, message.role)}: {first}"
+
+
+class _SummaryState(NamedTuple):
+    """Резюме префикса истории: строки с числом токенов и сколько старых сообщений в него не вошло"""
+    lines: Tuple[Tuple[str, int], ...]
+    dropped: int
+
+
+class HistoryCompactor:
+    """
+    Укладывает историю в бюджет токенов.
+    
+    - **budget**: токены на всю историю, включая резюме
+    - **summary_budget**: из них токены на резюме ранних сообщений
+    
+    Число токенов сообщения и резюме префиксов истории кэшируются. Резюме нового
+    префикса продолжает резюме самого длинного уже сжатого префикса, поэтому
+    в длинной сессии каждое сообщение считается и сжимается один раз.
+    """
+    
+    def __init__(self, budget: int = 2000, summary_budget: int = 300, model: str = "gpt-4", cache_size: int = 4096):
+        self.budget = budget
+        self.summary_budget = min(summary_budget, budget)
+        self.model = model
+        self._tokens = LRUCache(maxsize=cache_size)
+        self._summaries = LRUCache(maxsize=cache_size)
+    
+    def message_tokens(self, message: ChatMessage) -> int:
+        key = (message.role, message.content)
+        return self._tokens.get_or_build(
+            key,
+            lambda: count_tokens(message.content, self.model) + MESSAGE_OVERHEAD_TOKENS
+        )
+    
+    def compact(self, history: Sequence[ChatMessage]) -> Tuple[Optional[str], List[ChatMessage]]:
+        """
+        Возвращает (резюме ранних сообщений или None, последние сообщения целиком).
+        Если вся история влезает в бюджет, резюме не строится.
+        """
+        total = 0
+        start = len(history)
+        for message in reversed(history):
+            tokens = self.message_tokens(message)
+            if total + tokens > self.budget:
+                break
+            total += tokens
+            start -= 1
+        
+        if start == 0:
+            return None, list(history)
+        
+        # Освобождаем место под резюме, отбрасывая самые старые из оставшихся сообщений
+        while start < len(history) and total > self.budget - self.summary_budget:
+            total -= self.message_tokens(history[start])
+            start += 1
+        
+        return self._summary(history[:start]), list(history[start:])
+    
+    def _summary(self, older: Sequence[ChatMessage]) -> str:
+        """Резюме older: к резюме самого длинного закэшированного префикса дописываются остальные сообщения"""
+        # Ключ префикса - цепочка хешей сообщений: ключ older[:i + 1] зависит от ключа older[:i]
+        keys: List[str] = []
+        key = ""
+        for m in older:
+            key = hashlib.sha1(f"{key}\x00{m.role}\x01{m.content}".encode()).hexdigest()
+            keys.append(key)
+        
+        state, done = _SummaryState((), 0), 0
+        for i in range(len(older), 0, -1):
+            cached = self._summaries.get(keys[i - 1])
+            if cached is not None:
+                state, done = cached, i
+                break
+        if done < len(older):
+            state = self._extend_summary(state, older[done:])
+            self._summaries.set(keys[-1], state)
+        return self._render_summary(state)
+    
+    def _extend_summary(self, state: _SummaryState, evicted: Sequence[ChatMessage]) -> _SummaryState:
+        """Добавляет строки вышедших из окна сообщений и отбрасывает самые старые строки сверх бюджета"""
+        budget = self.summary_budget - count_tokens(SUMMARY_HEADER, self.model) - MESSAGE_OVERHEAD_TOKENS
+        lines = list(state.lines)
+        for message in evicted:
+            line = _summary_line(message)
+            lines.append((line, count_tokens(line, self.model) + 1))
+        total = sum(tokens for _, tokens in lines)
+        dropped = state.dropped
+        while lines and total > budget:
+            total -= lines.pop(0)[1]
+            dropped += 1
+        return _SummaryState(tuple(lines), dropped)
+    
+    @staticmethod
+    def _render_summary(state: _SummaryState) -> str:
+        lines = [line for line, _ in state.lines]
+        if state.dropped:
+            lines.insert(0, f"(ранее: еще {state.dropped} сообщений)")
+        return "\n".join([SUMMARY_HEADER, *lines])
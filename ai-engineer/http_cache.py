@@ -0,0 +1,72 @@
+"""
+Условные GET-запросы (ETag / Last-Modified) для эндпоинтов каталога.
+Валидаторы зависят только от каталога, его версии и параметров запроса, поэтому
+ответ 304 отдается без обращения к данным и без сериализации.
+
+Заголовки и проверка If-None-Match / If-Modified-Since повторяют conditional_get.py
+API вакансий: сервис разворачивается отдельно и не зависит от корня репозитория.
+"""
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+from fastapi import Request, Response
+
+from cache import LRUCache
+
+
+def validator_headers(etag: str, last_modified: datetime) -> Dict[str, str]:
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified.replace(microsecond=0), usegmt=True),
+        # Клиент может хранить ответ, но перед использованием обязан его перепроверить
+        "Cache-Control": "no-cache",
+    }
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+def not_modified(request: Request, etag: str, last_modified: datetime) -> Optional[Response]:
+    """
+    Ответ 304, если копия клиента актуальна, иначе None.
+    If-None-Match важнее If-Modified-Since (RFC 9110); last_modified - с часовым поясом.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        try:
+            since = parsedate_to_datetime(request.headers.get("if-modified-since", ""))
+        except (TypeError, ValueError):
+            since = None
+        fresh = since is not None and since.tzinfo is not None and last_modified.replace(microsecond=0) <= since
+    
+    if fresh:
+        return Response(status_code=304, headers=validator_headers(etag, last_modified))
+    return None
+
+
+class CatalogValidators:
+    """
+    Предвычисленные ETag для каждой комбинации (каталог, ресурс, версия, параметры).
+    
+    Версия каталога в памяти - счетчик своего процесса, поэтому у воркеров с разными
+    изменениями совпадают номера версий при разном содержимом. catalog - идентификатор
+    хранилища (Database.catalog_id): у каталога в памяти он свой для каждого процесса,
+    у файла SQLite - общий для всех воркеров.
+    """
+    
+    def __init__(self, maxsize: int = 4096):
+        self._etags = LRUCache(maxsize=maxsize)
+    
+    def etag(self, catalog: str, resource: str, version: int, params: Optional[Mapping[str, Any]] = None) -> str:
+        key = (catalog, resource, version, tuple(sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)))
+        return self._etags.get_or_build(
+            key,
+            lambda: '"' + hashlib.sha1(repr(key).encode()).hexdigest()[:24] + '"'
+        )
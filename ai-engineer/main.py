@@ -1,20 +1,108 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from typing import List, Optional, Dict, Any
+from contextlib import asynccontextmanager
 import os
+import json
+import asyncio
+import logging
 from dotenv import load_dotenv
 
-from models import ChatRequest, ChatResponse, Vacancy, Company
-from chat_service import ChatBotService
-from database import db
+from models import (
+    ChatRequest, ChatResponse, Vacancy, Company, SkillMatchMode, SkillScope, RecommendationEngine,
+    BatchRecommendationsRequest, VacancySearchResponse
+)
+from chat_service import ChatBotService, CHAT_STAGE_SECONDS
+from database import get_database
+from cache import AsyncResultCache
+from http_cache import CatalogValidators, not_modified, validator_headers
+from metrics import CONTENT_TYPE, REGISTRY, PrometheusMiddleware
+from serialization import RawJSONResponse
+from sessions import SessionStore
+from skill_index import normalize_skill
+from startup import Warmup, catalog_warmup_steps
 
 # Загружаем переменные окружения
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Хранилище, сервис чат-бота и сессии создаются при старте приложения (lifespan),
+# а не при импорте модуля, чтобы импорт и запуск воркера оставались быстрыми
+db = None
+chat_service: Optional[ChatBotService] = None
+sessions: Optional[SessionStore] = None
+
+# Фоновый прогрев индексов и кэшей; его состояние отдает /api/ready
+warmup: Optional[Warmup] = None
+
+
+# Кэш результатов /api/recommendations (LRU + TTL, одновременные одинаковые запросы объединяются)
+recommendations_cache = AsyncResultCache(
+    maxsize=int(os.getenv("RECOMMENDATIONS_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("RECOMMENDATIONS_CACHE_TTL", "300"))
+)
+
+
+# Пакетные рекомендации: максимум профилей в запросе и одновременных вычислений
+RECOMMENDATIONS_BATCH_MAX_PROFILES = int(os.getenv("RECOMMENDATIONS_BATCH_MAX_PROFILES", "5000"))
+RECOMMENDATIONS_BATCH_CONCURRENCY = int(os.getenv("RECOMMENDATIONS_BATCH_CONCURRENCY", "8"))
+# Тело строки профиля, для которого не удалось получить рекомендации (после index и profile_id)
+BATCH_ERROR_LINE = '"error":"Не удалось получить рекомендации"}\n'.encode()
+
+
+# ETag для эндпоинтов каталога по версии каталога и параметрам запроса
+catalog_validators = CatalogValidators()
+
+
+def _create_chat_service() -> Optional[ChatBotService]:
+    """Сервис чат-бота; клиент OpenAI (и импорт openai) создается позже, при прогреве"""
+    try:
+        return ChatBotService()
+    except ValueError as e:
+        print(f"Внимание: {e}")
+        print("Установите OPENAI_API_KEY в переменных окружения или в .env файле")
+        return None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Старт: открываем хранилище каталога и создаем сервисы, затем запускаем прогрев
+    индексов в фоне - сервер начинает принимать запросы, не дожидаясь его.
+    Остановка: прерываем прогрев, закрываем пул соединений с OpenAI и сессии.
+    """
+    global db, chat_service, sessions, warmup
+    db = await asyncio.to_thread(get_database)
+    chat_service = _create_chat_service()
+    # Серверные сессии чата (история и контекст пользователя)
+    sessions = SessionStore(
+        maxsize=int(os.getenv("CHAT_SESSIONS_MAX", "10000")),
+        ttl=float(os.getenv("CHAT_SESSION_TTL", "86400")),
+        path=os.getenv("CHAT_SESSIONS_DB") or None,
+        max_messages=int(os.getenv("CHAT_SESSION_MAX_MESSAGES", "200"))
+    )
+    warmup = Warmup(
+        catalog_warmup_steps(db, chat_service),
+        retries=int(os.getenv("WARMUP_RETRIES", "2")),
+        retry_delay=float(os.getenv("WARMUP_RETRY_DELAY", "1"))
+    )
+    warmup_task = asyncio.create_task(warmup.run())
+    try:
+        yield
+    finally:
+        warmup_task.cancel()
+        if chat_service:
+            await chat_service.aclose()
+        sessions.close()
+
+
 app = FastAPI(
     title="AI Chat Bot для вакансий",
     description="AI чат-бот для подбора вакансий, ответов на вопросы и рекомендаций по навыкам",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Настройка CORS для работы с фронтендом
@@ -26,13 +114,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Инициализация сервиса чат-бота
-try:
-    chat_service = ChatBotService()
-except ValueError as e:
-    print(f"Внимание: {e}")
-    print("Установите OPENAI_API_KEY в переменных окружения или в .env файле")
-    chat_service = None
+# Метрики запросов по эндпоинтам (отдаются в /metrics)
+app.add_middleware(PrometheusMiddleware, routes_app=app)
 
 
 @app.get("/")
@@ -43,9 +126,12 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "chat": "/api/chat",
+            "chat_stream": "/api/chat/stream",
             "recommendations": "/api/recommendations",
             "vacancies": "/api/vacancies",
-            "companies": "/api/companies"
+            "companies": "/api/companies",
+            "health": "/api/health",
+            "ready": "/api/ready"
         }
     }
 
@@ -56,9 +142,11 @@ async def chat(request: ChatRequest):
     Основной эндпоинт для общения с чат-ботом
     
     - **message**: Сообщение пользователя
-    - **conversation_history**: История разговора (опционально)
-    - **user_skills**: Навыки пользователя для контекста (опционально)
-    - **user_experience**: Уровень опыта пользователя (опционально)
+    - **session_id**: ID сессии из предыдущего ответа (опционально); история
+      и контекст пользователя хранятся на сервере
+    - **conversation_history**: История разговора (опционально, заменяет историю сессии)
+    - **user_skills**: Навыки пользователя для контекста (опционально, сохраняются в сессии)
+    - **user_experience**: Уровень опыта пользователя (опционально, сохраняется в сессии)
     """
     if not chat_service:
         raise HTTPException(
@@ -66,39 +154,178 @@ async def chat(request: ChatRequest):
             detail="Chat service не инициализирован. Проверьте OPENAI_API_KEY"
         )
     
+    session = sessions.get_or_create(request.session_id)
+    request = session.apply(request)
+    
     # Получаем данные о вакансиях для контекста
-    vacancies_data = db.get_vacancies_data_for_chat()
+    with CHAT_STAGE_SECONDS.time(stage="catalog_snapshot"):
+        vacancies_data = db.get_catalog_snapshot()
     
     # Получаем ответ от чат-бота
     response = await chat_service.get_chat_response(request, vacancies_data)
     
+    # Локальный ответ без модели не попадает в историю сессии
+    if response.degraded:
+        sessions.save(session)
+    else:
+        sessions.add_turn(session, request.message, response.response)
+    response.session_id = session.id
     return response
 
 
+def _sse_event(event: str, data: dict) -> str:
+    """Форматирует одно событие server-sent events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Потоковый вариант /api/chat (server-sent events)
+    
+    Ответ отдается по мере генерации событиями:
+    - **token**: `{"content": "..."}` - очередной фрагмент ответа
+    - **done**: итоговый ChatResponse с suggested_vacancies, skill_recommendations и session_id
+    - **error**: `{"detail": "..."}` - ответ модели оборвался после первых токенов;
+      если модель не ответила совсем, приходит локальный ответ (degraded) событиями token и done
+    
+    Сессии работают так же, как в /api/chat.
+    """
+    if not chat_service:
+        raise HTTPException(
+            status_code=500,
+            detail="Chat service не инициализирован. Проверьте OPENAI_API_KEY"
+        )
+    
+    session = sessions.get_or_create(request.session_id)
+    request = session.apply(request)
+    with CHAT_STAGE_SECONDS.time(stage="catalog_snapshot"):
+        vacancies_data = db.get_catalog_snapshot()
+    
+    async def event_stream():
+        async for event, payload in chat_service.stream_chat_response(request, vacancies_data):
+            if event == "token":
+                yield _sse_event("token", {"content": payload})
+            elif event == "done":
+                if payload.degraded:
+                    sessions.save(session)
+                else:
+                    sessions.add_turn(session, request.message, payload.response)
+                payload.session_id = session.id
+                yield _sse_event("done", payload.model_dump())
+            else:
+                sessions.save(session)
+                yield _sse_event("error", {"detail": payload})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+async def _compute_recommendations(
+    engine: RecommendationEngine,
+    user_skills: List[str],
+    user_experience: Optional[str],
+    vacancies_data
+) -> Dict[str, Any]:
+    """
+    Рекомендации выбранным движком:
+    - local: локальное ранжирование без обращения к модели
+    - hybrid: локальное ранжирование и текстовый разбор от модели
+    - llm: ранжирование моделью, при ошибке модели - локальное ранжирование
+
+    При ошибке модели в результате выставляется fallback (такие результаты не кэшируются),
+    текст ошибки клиенту не отдается.
+    """
+    if engine == RecommendationEngine.LLM:
+        try:
+            result = await chat_service.get_structured_recommendations(
+                user_skills=user_skills,
+                user_experience=user_experience,
+                vacancies_data=vacancies_data
+            )
+            return {**result, "engine": engine.value}
+        except Exception:
+            logger.exception("Ошибка ранжирования моделью, используется локальное")
+        # Модель недоступна - отвечаем локальным ранжированием
+        local = vacancies_data.recommender.recommend(user_skills, user_experience)
+        return {**local, "engine": RecommendationEngine.LOCAL.value, "fallback": True}
+    
+    result = {
+        **vacancies_data.recommender.recommend(user_skills, user_experience),
+        "engine": engine.value
+    }
+    if engine == RecommendationEngine.HYBRID:
+        vacancies = [vacancies_data.get(vac_id) for vac_id in result["recommended_vacancy_ids"]]
+        try:
+            result.update(await chat_service.explain_recommendations(
+                user_skills=user_skills,
+                user_experience=user_experience,
+                vacancies=vacancies,
+                skill_recommendations=result["skill_recommendations"]
+            ))
+        except Exception:
+            # Локальный подбор отдается без разбора от модели
+            logger.exception("Ошибка разбора рекомендаций моделью")
+            result["fallback"] = True
+    return result
+
+
+def _recommendations_key(
+    engine: RecommendationEngine,
+    user_skills: List[str],
+    user_experience: Optional[str],
+    version: int
+) -> tuple:
+    """Ключ кэша: профили с одинаковыми навыками и опытом получают одни рекомендации"""
+    return (
+        tuple(sorted({normalize_skill(s) for s in user_skills} - {""})),
+        (user_experience or "").strip().lower(),
+        engine.value,
+        version
+    )
+
+
+async def _cached_recommendations(
+    engine: RecommendationEngine,
+    user_skills: List[str],
+    user_experience: Optional[str],
+    vacancies_data
+) -> Dict[str, Any]:
+    return await recommendations_cache.get_or_compute(
+        _recommendations_key(engine, user_skills, user_experience, vacancies_data.version),
+        lambda: _compute_recommendations(engine, user_skills, user_experience, vacancies_data),
+        # Ответы без модели (ошибка обращения к ней) не кэшируем
+        should_cache=lambda result: not result.get("fallback")
+    )
+
+
 @app.post("/api/recommendations")
 async def get_recommendations(
     user_skills: List[str],
-    user_experience: Optional[str] = None
+    user_experience: Optional[str] = None,
+    engine: RecommendationEngine = RecommendationEngine.LLM
 ):
     """
     Получить структурированные рекомендации по вакансиям и навыкам
     
     - **user_skills**: Список навыков пользователя
     - **user_experience**: Уровень опыта (junior, middle, senior, lead)
+    - **engine**: llm (по умолчанию), local - без обращения к модели, hybrid - локальный подбор и разбор от модели
     """
-    if not chat_service:
+    if not chat_service and engine != RecommendationEngine.LOCAL:
         raise HTTPException(
             status_code=500,
             detail="Chat service не инициализирован. Проверьте OPENAI_API_KEY"
         )
     
-    vacancies_data = db.get_vacancies_data_for_chat()
-    
-    recommendations = chat_service.get_structured_recommendations(
-        user_skills=user_skills,
-        user_experience=user_experience,
-        vacancies_data=vacancies_data
-    )
+    vacancies_data = db.get_catalog_snapshot()
+    recommendations = await _cached_recommendations(engine, user_skills, user_experience, vacancies_data)
     
     # Получаем полную информацию о рекомендованных вакансиях
     recommended_vacancies = []
@@ -115,29 +342,235 @@ async def get_recommendations(
     }
 
 
+@app.post("/api/recommendations/batch")
+async def get_recommendations_batch(request: BatchRecommendationsRequest):
+    """
+    Рекомендации для множества профилей (поток NDJSON)
+    
+    - **profiles**: список профилей `{"user_skills": [...], "user_experience": "...", "profile_id": "..."}`
+    - **engine**: как в /api/recommendations
+    
+    Одинаковые профили (те же навыки и опыт) вычисляются один раз, одновременно
+    выполняется не больше RECOMMENDATIONS_BATCH_CONCURRENCY вычислений. Каждая строка
+    ответа - результат одного профиля в формате /api/recommendations с полями
+    `index` (позиция в запросе) и `profile_id`; строки идут по мере готовности.
+    Если для профиля не удалось получить рекомендации, его строка содержит только
+    `index`, `profile_id` и `error`; остальные профили обрабатываются как обычно.
+    """
+    if not chat_service and request.engine != RecommendationEngine.LOCAL:
+        raise HTTPException(
+            status_code=500,
+            detail="Chat service не инициализирован. Проверьте OPENAI_API_KEY"
+        )
+    if len(request.profiles) > RECOMMENDATIONS_BATCH_MAX_PROFILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Не больше {RECOMMENDATIONS_BATCH_MAX_PROFILES} профилей в одном запросе"
+        )
+    
+    # Один снимок каталога и одна версия на весь пакет
+    vacancies_data = db.get_catalog_snapshot()
+    version = vacancies_data.version
+    
+    groups: Dict[tuple, List[int]] = {}
+    for index, profile in enumerate(request.profiles):
+        key = _recommendations_key(request.engine, profile.user_skills, profile.user_experience, version)
+        groups.setdefault(key, []).append(index)
+    
+    semaphore = asyncio.Semaphore(RECOMMENDATIONS_BATCH_CONCURRENCY)
+    vacancies_by_id: Dict[int, Optional[Vacancy]] = {}
+    
+    async def compute(key: tuple, indices: List[int]):
+        profile = request.profiles[indices[0]]
+        async with semaphore:
+            try:
+                result = await _cached_recommendations(
+                    request.engine, profile.user_skills, profile.user_experience, vacancies_data
+                )
+            except Exception:
+                # Ошибка одного профиля не прерывает поток: по нему отдается строка с error
+                logger.exception("Ошибка рекомендаций для профиля %s", profile.profile_id)
+                result = None
+        return indices, result
+    
+    def encode(result: Dict[str, Any]) -> bytes:
+        """Тело строки без index/profile_id; вакансии берутся из кэша JSON-фрагментов"""
+        vacancies = []
+        for vac_id in result.get("recommended_vacancy_ids", []):
+            if vac_id not in vacancies_by_id:
+                vacancies_by_id[vac_id] = db.get_vacancy_by_id(vac_id)
+            if vacancies_by_id[vac_id] is not None:
+                vacancies.append(vacancies_by_id[vac_id])
+        return (
+            b'"recommended_vacancies":' + db.encode_vacancies(vacancies, version)
+            + b',"skill_recommendations":' + json.dumps(result.get("skill_recommendations", []), ensure_ascii=False).encode()
+            + b',"analysis":' + json.dumps(result, ensure_ascii=False).encode()
+            + b"}\n"
+        )
+    
+    async def results():
+        tasks = [asyncio.ensure_future(compute(key, indices)) for key, indices in groups.items()]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                indices, result = await finished
+                body = encode(result) if result is not None else BATCH_ERROR_LINE
+                for index in indices:
+                    profile_id = request.profiles[index].profile_id
+                    yield (
+                        b'{"index":' + str(index).encode()
+                        + b',"profile_id":' + json.dumps(profile_id).encode() + b"," + body
+                    )
+        finally:
+            # Клиент отключился - незавершенные вычисления больше не нужны
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@app.get("/api/recommendations/cache")
+async def get_recommendations_cache_stats():
+    """Статистика кэша рекомендаций: размер, попадания, промахи, объединенные запросы"""
+    return recommendations_cache.stats()
+
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    """Значения параметра через запятую"""
+    values = [v.strip() for v in value.split(",") if v.strip()] if value else []
+    return values or None
+
+
+def _vacancy_filters(
+    skills: Optional[str],
+    experience_level: Optional[str],
+    job_type: Optional[str],
+    location: Optional[str],
+    salary_from: Optional[float],
+    salary_to: Optional[float],
+    skills_match: SkillMatchMode,
+    skills_scope: SkillScope
+) -> Dict[str, Any]:
+    """Параметры запроса списка вакансий в фильтры FacetIndex.search"""
+    return {
+        "skills": _split(skills),
+        "skills_match": skills_match.value,
+        "skills_scope": skills_scope.value,
+        "experience_levels": _split(experience_level),
+        "job_types": _split(job_type),
+        "locations": _split(location),
+        "salary_from": salary_from,
+        "salary_to": salary_to,
+    }
+
+
 @app.get("/api/vacancies", response_model=List[Vacancy])
 async def get_vacancies(
+    request: Request,
     skills: Optional[str] = None,
-    experience_level: Optional[str] = None
+    experience_level: Optional[str] = None,
+    job_type: Optional[str] = None,
+    location: Optional[str] = None,
+    salary_from: Optional[float] = None,
+    salary_to: Optional[float] = None,
+    skills_match: SkillMatchMode = SkillMatchMode.ANY,
+    skills_scope: SkillScope = SkillScope.ALL,
+    q: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1)
 ):
     """
     Получить список вакансий
     
     - **skills**: Фильтр по навыкам (через запятую)
-    - **experience_level**: Фильтр по уровню опыта
+    - **experience_level**, **job_type**, **location**: Фильтры по уровню опыта, типу занятости
+      и городу (несколько значений через запятую - любое из них)
+    - **salary_from** / **salary_to**: Вилка зарплаты должна пересекаться с диапазоном
+    - **skills_match**: any - любой из навыков, all - все навыки
+    - **skills_scope**: all, required или preferred - в каких навыках вакансии искать
+    - **q**: Полнотекстовый поиск по названию, описанию и навыкам
+    - **offset** / **limit**: Страница результатов (по умолчанию - все вакансии);
+      общее число найденных возвращается в заголовке X-Total-Count
+    
+    При поиске по тексту вакансии отсортированы по релевантности,
+    при фильтрации по навыкам - по числу совпадений.
+    Фильтр только по навыкам выполняется по инвертированному индексу навыков,
+    остальные фильтры - по индексам полей снимка каталога (см. /api/vacancies/search).
+    Поддерживает условные запросы (If-None-Match / If-Modified-Since).
+    Ответ собирается из закодированных заранее фрагментов JSON.
     """
-    vacancies = db.get_all_vacancies()
+    version, last_modified = db.get_catalog_state()
+    etag = catalog_validators.etag(db.catalog_id, "vacancies", version, request.query_params)
+    cached = not_modified(request, etag, last_modified)
+    if cached:
+        return cached
     
-    # Фильтрация по навыкам
-    if skills:
-        skills_list = [s.strip() for s in skills.split(",")]
-        vacancies = db.get_vacancies_by_skills(skills_list)
+    headers = validator_headers(etag, last_modified)
+    filters = _vacancy_filters(
+        skills, experience_level, job_type, location, salary_from, salary_to, skills_match, skills_scope
+    )
+    other_filters = [value for key, value in filters.items() if key not in ("skills", "skills_match", "skills_scope")]
+    filtered = filters["skills"] is not None or any(value is not None for value in other_filters)
+    if not (filtered or q or offset or limit):
+        vacancies = db.get_all_vacancies()
+    elif filters["skills"] and not q and all(value is None for value in other_filters):
+        # Только навыки: инвертированный индекс навыков, который обновляется при записи
+        # (индексы полей снимка перестраиваются на каждую версию каталога)
+        vacancies = db.get_vacancies_by_skills(
+            filters["skills"], match=filters["skills_match"], scope=filters["skills_scope"]
+        )
+        headers["X-Total-Count"] = str(len(vacancies))
+        vacancies = vacancies[offset:offset + limit if limit is not None else None]
+    else:
+        ids, total, _ = db.facet_search(
+            q, offset=offset, limit=limit, facets=False, **filters
+        )
+        vacancies = db.get_vacancies_by_ids(ids)
+        headers["X-Total-Count"] = str(total)
+    return RawJSONResponse(db.encode_vacancies(vacancies, version), headers=headers)
+
+
+@app.get("/api/vacancies/search", response_model=VacancySearchResponse)
+async def search_vacancies(
+    request: Request,
+    skills: Optional[str] = None,
+    experience_level: Optional[str] = None,
+    job_type: Optional[str] = None,
+    location: Optional[str] = None,
+    salary_from: Optional[float] = None,
+    salary_to: Optional[float] = None,
+    skills_match: SkillMatchMode = SkillMatchMode.ANY,
+    skills_scope: SkillScope = SkillScope.ALL,
+    q: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    facet_size: int = Query(20, ge=1, le=100)
+):
+    """
+    Фасетный поиск вакансий с постраничной выдачей
     
-    # Фильтрация по уровню опыта
-    if experience_level:
-        vacancies = [v for v in vacancies if v.experience_level and v.experience_level.value == experience_level]
+    Параметры фильтров - как у GET /api/vacancies. В ответе, кроме страницы вакансий,
+    общее число найденных и счетчики фасетов: уровни опыта, типы занятости, города,
+    самые частые навыки (до **facet_size** значений) и диапазон зарплат.
+    Счетчик значения уровня, типа занятости или города - сколько вакансий нашлось бы,
+    если выбрать это значение при остальных фильтрах.
+    Модели вакансий собираются только для запрошенной страницы.
+    """
+    version, last_modified = db.get_catalog_state()
+    etag = catalog_validators.etag(db.catalog_id, "vacancies/search", version, request.query_params)
+    cached = not_modified(request, etag, last_modified)
+    if cached:
+        return cached
     
-    return vacancies
+    filters = _vacancy_filters(
+        skills, experience_level, job_type, location, salary_from, salary_to, skills_match, skills_scope
+    )
+    ids, total, facets = db.facet_search(
+        q, offset=offset, limit=limit, facet_size=facet_size, **filters
+    )
+    items = db.encode_vacancies(db.get_vacancies_by_ids(ids), version)
+    head = f'{{"total":{total},"offset":{offset},"limit":{limit},"facets":'
+    body = head.encode() + json.dumps(facets, ensure_ascii=False).encode() + b',"items":' + items + b"}"
+    return RawJSONResponse(body, headers=validator_headers(etag, last_modified))
 
 
 @app.get("/api/vacancies/{vacancy_id}", response_model=Vacancy)
@@ -150,9 +583,17 @@ async def get_vacancy(vacancy_id: int):
 
 
 @app.get("/api/companies", response_model=List[Company])
-async def get_companies():
-    """Получить список всех компаний"""
-    return db.get_all_companies()
+async def get_companies(request: Request):
+    """Получить список всех компаний (поддерживает If-None-Match / If-Modified-Since)"""
+    version, last_modified = db.get_catalog_state()
+    etag = catalog_validators.etag(db.catalog_id, "companies", version)
+    cached = not_modified(request, etag, last_modified)
+    if cached:
+        return cached
+    return RawJSONResponse(
+        db.encode_companies(db.get_all_companies(), version),
+        headers=validator_headers(etag, last_modified)
+    )
 
 
 @app.get("/api/companies/{company_id}", response_model=Company)
@@ -166,13 +607,35 @@ async def get_company(company_id: int):
 
 @app.get("/api/health")
 async def health_check():
-    """Проверка здоровья сервиса"""
+    """Проверка здоровья сервиса (liveness): процесс запущен и отвечает"""
     return {
         "status": "healthy",
-        "chat_service_available": chat_service is not None
+        "chat_service_available": chat_service is not None,
+        # closed - запросы к OpenAI идут, open - чат отвечает локально по каталогу
+        "openai_circuit": chat_service.breaker.state if chat_service else None
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Метрики в текстовом формате Prometheus: длительность и число запросов по эндпоинтам,
+    запросы в обработке, этапы обработки сообщения чата, длительность, токены и ошибки OpenAI
+    """
+    return Response(REGISTRY.render(), headers={"Content-Type": CONTENT_TYPE})
+
+
+@app.get("/api/ready")
+async def readiness_check():
+    """
+    Готовность к нагрузке (readiness): индексы каталога и кэши прогреты.
+    Пока идет прогрев или если шаг прогрева не удался и после повторов, отвечает 503 и состоянием шагов.
+    """
+    report = warmup.report() if warmup else {"status": "starting", "steps": {}}
+    report["catalog_version"] = db.get_catalog_state()[0] if db is not None else None
+    return JSONResponse(report, status_code=200 if warmup and warmup.ready else 503)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
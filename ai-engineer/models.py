@@ -18,6 +18,23 @@ class ExperienceLevel(str, Enum):
     LEAD = "lead"
 
 
+class SkillMatchMode(str, Enum):
+    ANY = "any"
+    ALL = "all"
+
+
+class SkillScope(str, Enum):
+    ALL = "all"
+    REQUIRED = "required"
+    PREFERRED = "preferred"
+
+
+class RecommendationEngine(str, Enum):
+    LLM = "llm"
+    LOCAL = "local"
+    HYBRID = "hybrid"
+
+
 class Company(BaseModel):
     id: int
     name: str
@@ -59,6 +76,10 @@ class ChatRequest(BaseModel):
     user_experience: Optional[str] = Field(
         default=None, description="Уровень опыта пользователя"
     )
+    session_id: Optional[str] = Field(
+        default=None, max_length=64,
+        description="ID серверной сессии: история и контекст пользователя берутся из нее"
+    )
 
 
 class ChatResponse(BaseModel):
@@ -69,4 +90,49 @@ class ChatResponse(BaseModel):
     skill_recommendations: Optional[List[str]] = Field(
         default=None, description="Рекомендации по навыкам для улучшения"
     )
+    session_id: Optional[str] = Field(
+        default=None, description="ID сессии для следующих сообщений"
+    )
+    degraded: bool = Field(
+        default=False, description="Ответ подобран локально по каталогу: модель недоступна"
+    )
+
+
+
+class RecommendationProfile(BaseModel):
+    user_skills: List[str] = Field(default=[], description="Навыки кандидата")
+    user_experience: Optional[str] = Field(default=None, description="Уровень опыта кандидата")
+    profile_id: Optional[str] = Field(default=None, description="ID кандидата во внешней системе")
+
+
+class BatchRecommendationsRequest(BaseModel):
+    profiles: List[RecommendationProfile] = Field(..., description="Профили кандидатов")
+    engine: RecommendationEngine = Field(
+        default=RecommendationEngine.LLM, description="Движок рекомендаций"
+    )
+
+
+class FacetValue(BaseModel):
+    value: str = Field(..., description="Значение поля")
+    count: int = Field(..., description="Число вакансий с этим значением")
+
+
+class SalaryRange(BaseModel):
+    min: Optional[float] = Field(default=None, description="Нижняя граница зарплат найденных вакансий")
+    max: Optional[float] = Field(default=None, description="Верхняя граница зарплат найденных вакансий")
+
+
+class VacancyFacets(BaseModel):
+    experience_level: List[FacetValue] = Field(default=[], description="Уровни опыта")
+    job_type: List[FacetValue] = Field(default=[], description="Типы занятости")
+    location: List[FacetValue] = Field(default=[], description="Города")
+    skills: List[FacetValue] = Field(default=[], description="Самые частые навыки")
+    salary: SalaryRange = Field(default=SalaryRange(), description="Диапазон зарплат")
+
 
+class VacancySearchResponse(BaseModel):
+    total: int = Field(..., description="Всего найдено вакансий")
+    offset: int = Field(..., description="Смещение страницы")
+    limit: int = Field(..., description="Размер страницы")
+    facets: VacancyFacets = Field(..., description="Счетчики фасетов")
+    items: List[Vacancy] = Field(..., description="Вакансии страницы")
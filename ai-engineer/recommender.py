@@ -0,0 +1,164 @@
+"""
+Локальный детерминированный подбор вакансий по навыкам и уровню опыта.
+Работает без обращения к модели и отвечает за миллисекунды.
+"""
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from models import ExperienceLevel
+from skill_index import normalize_skill
+
+
+LEVEL_CODES = {level.value: code for code, level in enumerate(ExperienceLevel)}
+
+
+class LocalRecommender:
+    """
+    Оценка вакансий по матрице вакансия x навык.
+    
+    Матрица хранится в разреженном виде (CSR): для каждой вакансии - ID ее
+    навыков и их веса (обязательные навыки весят больше желательных).
+    Оценка вакансии складывается из доли покрытых пользователем навыков
+    (с учетом весов) и близости уровня опыта.
+    """
+    
+    def __init__(
+        self,
+        items: Sequence[Mapping],
+        required_weight: float = 2.0,
+        preferred_weight: float = 1.0,
+        level_weight: float = 0.3
+    ):
+        self.level_weight = level_weight
+        self.vacancy_ids = np.fromiter((item["id"] for item in items), dtype=np.int64, count=len(items))
+        self.levels = np.fromiter(
+            (LEVEL_CODES.get(item.get("experience_level"), -1) for item in items),
+            dtype=np.int8,
+            count=len(items)
+        )
+        
+        self.skill_ids: Dict[str, int] = {}
+        self.skill_names: List[str] = []
+        rows: List[int] = []
+        columns: List[int] = []
+        weights: List[float] = []
+        for row, item in enumerate(items):
+            seen = set()
+            for skills, weight in ((item.get("required_skills", ()), required_weight),
+                                   (item.get("preferred_skills", ()), preferred_weight)):
+                for skill in skills:
+                    key = normalize_skill(skill)
+                    if not key or key in seen:
+                        continue
+                    seen.add(key)
+                    column = self.skill_ids.get(key)
+                    if column is None:
+                        column = self.skill_ids[key] = len(self.skill_names)
+                        self.skill_names.append(skill)
+                    rows.append(row)
+                    columns.append(column)
+                    weights.append(weight)
+        
+        self._set_matrix(
+            np.asarray(rows, dtype=np.int32),
+            np.asarray(columns, dtype=np.int32),
+            np.asarray(weights, dtype=np.float32)
+        )
+    
+    @classmethod
+    def from_arrays(
+        cls,
+        vacancy_ids: np.ndarray,
+        levels: np.ndarray,
+        skill_names: List[str],
+        rows: np.ndarray,
+        columns: np.ndarray,
+        weights: np.ndarray,
+        level_weight: float = 0.3
+    ) -> "LocalRecommender":
+        """
+        Движок по готовой разреженной матрице (колоночное хранилище), без обхода вакансий.
+        rows - позиции вакансий, columns - индексы в skill_names; пары (row, column) не повторяются.
+        """
+        recommender = cls.__new__(cls)
+        recommender.level_weight = level_weight
+        recommender.vacancy_ids = vacancy_ids
+        recommender.levels = levels
+        recommender.skill_names = list(skill_names)
+        recommender.skill_ids = {normalize_skill(name): i for i, name in enumerate(recommender.skill_names)}
+        recommender._set_matrix(rows.astype(np.int32), columns.astype(np.int32), weights.astype(np.float32))
+        return recommender
+    
+    def _set_matrix(self, rows: np.ndarray, columns: np.ndarray, weights: np.ndarray) -> None:
+        self._rows = rows
+        self._columns = columns
+        self._weights = weights
+        self._totals = np.bincount(rows, weights=weights, minlength=len(self.vacancy_ids)).astype(np.float32)
+    
+    def score(self, user_skills: Sequence[str], user_experience: Optional[str] = None) -> np.ndarray:
+        """Оценки всех вакансий для навыков и уровня опыта пользователя"""
+        known = np.zeros(len(self.skill_names), dtype=bool)
+        has_skills = False
+        for skill in user_skills:
+            key = normalize_skill(skill)
+            has_skills = has_skills or bool(key)
+            column = self.skill_ids.get(key)
+            if column is not None:
+                known[column] = True
+        
+        matched = np.bincount(
+            self._rows,
+            weights=self._weights * known[self._columns],
+            minlength=len(self.vacancy_ids)
+        )
+        coverage = np.divide(matched, self._totals, out=np.zeros_like(matched), where=self._totals > 0)
+        
+        level = LEVEL_CODES.get((user_experience or "").strip().lower())
+        if level is None:
+            level_fit = np.full(len(self.vacancy_ids), 0.5)
+        else:
+            distance = np.abs(self.levels.astype(np.int16) - level)
+            level_fit = np.where(self.levels < 0, 0.5, np.clip(1 - 0.5 * distance, 0, 1))
+        
+        scores = (1 - self.level_weight) * coverage + self.level_weight * level_fit
+        # Без единого совпадения по навыкам вакансия не рекомендуется
+        if has_skills:
+            scores[matched == 0] = 0
+        return scores
+    
+    def recommend(
+        self,
+        user_skills: Sequence[str],
+        user_experience: Optional[str] = None,
+        top_n: int = 5,
+        top_skills: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Рекомендации в формате get_structured_recommendations:
+        ID лучших вакансий и навыки, которых пользователю чаще всего не хватает для них.
+        """
+        if not len(self.vacancy_ids):
+            return {"recommended_vacancy_ids": [], "skill_recommendations": []}
+        
+        scores = self.score(user_skills, user_experience)
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > top_n:
+            candidates = candidates[np.argpartition(-scores[candidates], top_n - 1)[:top_n]]
+        candidates = candidates[np.lexsort((self.vacancy_ids[candidates], -scores[candidates]))]
+        
+        # Недостающие навыки лучших вакансий, взвешенные оценкой вакансии
+        known = {self.skill_ids[k] for k in (normalize_skill(s) for s in user_skills) if k in self.skill_ids}
+        in_top = np.isin(self._rows, candidates)
+        missing = in_top & ~np.isin(self._columns, list(known))
+        skill_scores = np.bincount(
+            self._columns[missing],
+            weights=self._weights[missing] * scores[self._rows[missing]],
+            minlength=len(self.skill_names)
+        )
+        skill_order = [c for c in np.argsort(-skill_scores, kind="stable")[:top_skills] if skill_scores[c] > 0]
+        
+        return {
+            "recommended_vacancy_ids": self.vacancy_ids[candidates].tolist(),
+            "skill_recommendations": [self.skill_names[c] for c in skill_order],
+        }
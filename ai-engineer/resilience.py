@@ -0,0 +1,349 @@
+"""
+Защита от медленного или недоступного внешнего сервиса (OpenAI).
+
+- Дедлайн: общий бюджет времени на вызов, включая повторы (а для потока - и чтение
+  ответа); каждая попытка ограничена таймаутом попытки и остатком дедлайна.
+- Повторы: только для временных ошибок (таймауты, обрывы соединения, 408/409/429, 5xx),
+  с экспоненциальной задержкой и полным джиттером, чтобы воркеры не повторяли синхронно.
+- Автомат отключения (circuit breaker): после серии неудачных вызовов (вызов с повторами
+  считается одной неудачей) вызовы сразу завершаются ошибкой CircuitOpenError, и сервис
+  отвечает локально, не ожидая таймаутов. Через recovery_time пропускается один пробный вызов.
+- Хеджирование: если попытка не завершилась за p95 недавних задержек, параллельно
+  отправляется вторая, берется первый успешный ответ. По умолчанию выключено.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from metrics import Counter, Gauge
+
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 429}
+# Ошибки клиента openai без кода ответа (таймаут и обрыв соединения)
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError"}
+
+
+RETRIES = Counter("upstream_retries_total", "Повторные попытки запросов к внешнему сервису", ("operation",))
+HEDGES = Counter(
+    "upstream_hedged_requests_total", "Дополнительные (хеджирующие) запросы к внешнему сервису", ("operation",)
+)
+REJECTED = Counter(
+    "upstream_rejected_total", "Вызовы, отклоненные открытым автоматом отключения", ("operation",)
+)
+BREAKER_STATE = Gauge(
+    "circuit_breaker_state", "Состояние автомата отключения: 0 - закрыт, 1 - пробный вызов, 2 - открыт", ("name",)
+)
+
+
+class CircuitOpenError(Exception):
+    """Вызов не выполнялся: автомат отключения открыт"""
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Бюджет времени на вызов исчерпан"""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Временная ошибка, после которой имеет смысл повторить запрос"""
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(exc).__mro__)
+
+
+def is_unavailable(exc: BaseException) -> bool:
+    """Сервис недоступен: автомат отключения открыт или временные ошибки не прошли после повторов"""
+    return isinstance(exc, CircuitOpenError) or is_retryable(exc)
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """Значение заголовка Retry-After ответа с ошибкой (в секундах), если оно есть"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Число повторов и экспоненциальная задержка с полным джиттером"""
+
+    def __init__(self, max_retries: int = 2, base_delay: float = 0.25, max_delay: float = 2.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, retry: int, exc: Optional[BaseException] = None) -> float:
+        """Пауза перед повтором номер retry (с нуля); Retry-After сервера учитывается до max_delay"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+        retry_after = _retry_after(exc) if exc is not None else None
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Автомат отключения по числу неудач подряд.
+    closed - вызовы идут; open - вызовы отклоняются до истечения recovery_time;
+    half_open - пропускается один пробный вызов, его результат закрывает или снова открывает автомат.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str = "openai",
+        failure_threshold: int = 5,
+        recovery_time: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._set_state(self.CLOSED)
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        BREAKER_STATE.set(self._STATE_VALUES[state], name=self.name)
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.recovery_time:
+            self._set_state(self.HALF_OPEN)
+        return self._state
+
+    def allow(self) -> bool:
+        """Можно ли выполнить вызов; в half_open разрешается только один пробный вызов"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_in_flight = False
+        if self._state != self.CLOSED:
+            self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+            self._set_state(self.OPEN)
+
+    def release(self) -> None:
+        """Пробный вызов завершился без результата (например, отменен клиентом)"""
+        self._probe_in_flight = False
+
+
+class LatencyWindow:
+    """Задержки последних успешных попыток для оценки квантилей"""
+
+    def __init__(self, size: int = 200):
+        self._values = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def observe(self, seconds: float) -> None:
+        self._values.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self._values:
+            return None
+        values = sorted(self._values)
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class ResilientCaller:
+    """
+    Выполняет запрос к внешнему сервису с дедлайном, повторами, автоматом отключения
+    и (опционально) хеджированием. Запрос передается функцией attempt(timeout),
+    которую можно вызывать несколько раз, в том числе одновременно.
+    Автомат отключения учитывает итог логического вызова, а не отдельные попытки.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        deadline: Optional[float] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge_quantile: Optional[float] = None,
+        hedge_min_delay: float = 0.5,
+        hedge_min_samples: int = 20
+    ):
+        self.timeout = timeout
+        self.deadline = deadline or timeout
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = LatencyWindow()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Через сколько секунд отправлять хеджирующий запрос (None - не отправлять)"""
+        if self.hedge_quantile is None or len(self.latency) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.quantile(self.hedge_quantile))
+
+    def _admit(self, operation: str) -> None:
+        if not self.breaker.allow():
+            REJECTED.inc(operation=operation)
+            raise CircuitOpenError(f"{self.breaker.name}: сервис временно недоступен")
+
+    def _settle(self, error: Optional[BaseException]) -> None:
+        """Итог вызова для автомата отключения: одна неудача на вызов, сколько бы ни было попыток"""
+        if error is None:
+            self.breaker.record_success()
+        elif is_retryable(error):
+            self.breaker.record_failure()
+        else:
+            # Ошибка запроса (например, 400) или отмена, а не недоступность сервиса
+            self.breaker.release()
+
+    async def call(
+        self,
+        operation: str,
+        attempt: Callable[[float], Awaitable[T]],
+        deadline: Optional[float] = None,
+        hedge: bool = True
+    ) -> T:
+        """
+        Выполняет attempt с повторами в пределах deadline секунд (по умолчанию - self.deadline).
+        Бросает CircuitOpenError, если автомат открыт, DeadlineExceeded, если бюджет исчерпан,
+        иначе - последнюю ошибку запроса.
+        """
+        expires = time.monotonic() + (deadline or self.deadline)
+        self._admit(operation)
+        try:
+            result = await self._retrying(operation, attempt, expires, hedge)
+        except BaseException as e:
+            self._settle(e)
+            raise
+        self._settle(None)
+        return result
+
+    async def stream(
+        self,
+        operation: str,
+        open_stream: Callable[[float], Awaitable[AsyncIterator[T]]],
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[T]:
+        """
+        Потоковый вызов: открытие потока с повторами и чтение всех его элементов
+        в пределах одного дедлайна. Ошибка посреди потока не повторяется (часть ответа
+        уже отдана), но, как и истекший дедлайн, считается неудачей вызова.
+        """
+        expires = time.monotonic() + (deadline or self.deadline)
+        self._admit(operation)
+        error: Optional[BaseException] = None
+        stream = None
+        try:
+            stream = await self._retrying(operation, open_stream, expires, hedge=False)
+            iterator = stream.__aiter__()
+            while True:
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    raise DeadlineExceeded(f"Дедлайн запроса к {self.breaker.name} истек")
+                try:
+                    item = await asyncio.wait_for(iterator.__anext__(), remaining)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError as e:
+                    raise DeadlineExceeded(f"Дедлайн запроса к {self.breaker.name} истек") from e
+                yield item
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._settle(error)
+            # Брошенный поток закрывается, чтобы не держать соединение
+            response = getattr(stream, "response", None)
+            if error is not None and response is not None:
+                await response.aclose()
+
+    async def _retrying(
+        self,
+        operation: str,
+        attempt: Callable[[float], Awaitable[T]],
+        expires: float,
+        hedge: bool
+    ) -> T:
+        """Попытки с паузами между повторами, пока не истечет дедлайн expires"""
+        retry = 0
+        while True:
+            remaining = expires - time.monotonic()
+            timeout = min(self.timeout, remaining)
+            try:
+                if hedge:
+                    return await self._hedged(operation, attempt, timeout)
+                return await self._attempt(attempt, timeout)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                remaining = expires - time.monotonic()
+                if retry >= self.retry.max_retries or remaining <= 0:
+                    if remaining <= 0 and not isinstance(e, DeadlineExceeded):
+                        raise DeadlineExceeded(f"Дедлайн запроса к {self.breaker.name} истек") from e
+                    raise
+                delay = self.retry.delay(retry, e)
+                if delay >= remaining:
+                    raise DeadlineExceeded(f"Дедлайн запроса к {self.breaker.name} истек") from e
+                RETRIES.inc(operation=operation)
+                retry += 1
+                await asyncio.sleep(delay)
+
+    async def _attempt(self, attempt: Callable[[float], Awaitable[T]], timeout: float) -> T:
+        """Одна попытка с жестким таймаутом (таймаут клиента HTTP ограничивает только чтение)"""
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(attempt(timeout), timeout)
+        except asyncio.TimeoutError as e:
+            raise DeadlineExceeded(f"Попытка не уложилась в {timeout:.2f} с") from e
+        self.latency.observe(time.monotonic() - start)
+        return result
+
+    async def _hedged(self, operation: str, attempt: Callable[[float], Awaitable[T]], timeout: float) -> T:
+        delay = self.hedge_delay()
+        if delay is None or delay >= timeout:
+            return await self._attempt(attempt, timeout)
+
+        tasks = {asyncio.ensure_future(self._attempt(attempt, timeout))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                HEDGES.inc(operation=operation)
+                tasks.add(asyncio.ensure_future(self._attempt(attempt, timeout - delay)))
+            error: Optional[BaseException] = None
+            pending = tasks
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,111 @@
+"""
+Локальный поиск релевантных вакансий (BM25) для отбора контекста в промпт.
+Индекс строится один раз на снимок каталога, оценка запроса векторизована на NumPy.
+"""
+import re
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+
+TOKEN_RE = re.compile(r"[\w+#]+")
+
+# Поля вакансии и их вес (число повторов токенов поля в документе)
+FIELD_WEIGHTS = (
+    ("title", 3),
+    ("required_skills", 2),
+    ("preferred_skills", 1),
+    ("description", 1),
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбивает текст на токены в нижнем регистре (C++, C# и т.п. сохраняются)"""
+    return TOKEN_RE.findall(text.lower())
+
+
+def _vacancy_tokens(item: Mapping) -> List[str]:
+    tokens: List[str] = []
+    for field, weight in FIELD_WEIGHTS:
+        value = item.get(field)
+        if not value:
+            continue
+        text = " ".join(value) if isinstance(value, (list, tuple)) else str(value)
+        tokens.extend(tokenize(text) * weight)
+    return tokens
+
+
+class BM25Index:
+    """
+    Индекс BM25 по названию, описанию и навыкам вакансий.
+    
+    Для каждого термина хранятся позиции документов и готовые веса BM25
+    (CSR-подобная раскладка), поэтому оценка запроса - это несколько
+    векторных сложений по спискам документов терминов запроса.
+    """
+    
+    def __init__(self, items: Sequence[Mapping], k1: float = 1.5, b: float = 0.75):
+        self.size = len(items)
+        postings: Dict[str, Dict[int, int]] = {}
+        lengths = np.zeros(self.size, dtype=np.float32)
+        levels: List[Optional[str]] = []
+        
+        for position, item in enumerate(items):
+            tokens = _vacancy_tokens(item)
+            lengths[position] = len(tokens)
+            levels.append(item.get("experience_level"))
+            for token in tokens:
+                doc_tf = postings.setdefault(token, {})
+                doc_tf[position] = doc_tf.get(position, 0) + 1
+        
+        avg_length = float(lengths.mean()) if self.size else 0.0
+        norm = k1 * (1 - b + b * lengths / avg_length) if avg_length else np.full(self.size, k1, dtype=np.float32)
+        
+        self.vocabulary: Dict[str, int] = {}
+        offsets = [0]
+        doc_chunks = []
+        weight_chunks = []
+        for term_id, (term, doc_tf) in enumerate(postings.items()):
+            self.vocabulary[term] = term_id
+            docs = np.fromiter(doc_tf.keys(), dtype=np.int32, count=len(doc_tf))
+            tf = np.fromiter(doc_tf.values(), dtype=np.float32, count=len(doc_tf))
+            df = len(doc_tf)
+            idf = np.log(1 + (self.size - df + 0.5) / (df + 0.5))
+            doc_chunks.append(docs)
+            weight_chunks.append((idf * tf * (k1 + 1) / (tf + norm[docs])).astype(np.float32))
+            offsets.append(offsets[-1] + df)
+        
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        self._docs = np.concatenate(doc_chunks) if doc_chunks else np.zeros(0, dtype=np.int32)
+        self._weights = np.concatenate(weight_chunks) if weight_chunks else np.zeros(0, dtype=np.float32)
+        self._levels = np.asarray(levels, dtype=object)
+    
+    def score(self, query: str) -> np.ndarray:
+        """Оценки BM25 всех вакансий для текста запроса"""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for token in set(tokenize(query)):
+            term_id = self.vocabulary.get(token)
+            if term_id is None:
+                continue
+            start, end = self._offsets[term_id], self._offsets[term_id + 1]
+            scores[self._docs[start:end]] += self._weights[start:end]
+        return scores
+    
+    def top_k(self, query: str, k: int, experience_level: Optional[str] = None, level_boost: float = 1.25) -> List[int]:
+        """
+        Позиции k самых релевантных вакансий в порядке убывания оценки.
+        Вакансии нужного уровня опыта получают множитель level_boost.
+        Вакансии без совпадений с запросом не возвращаются.
+        """
+        if not self.size or k <= 0:
+            return []
+        
+        scores = self.score(query)
+        if experience_level:
+            scores[self._levels == experience_level] *= level_boost
+        
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        order = np.lexsort((candidates, -scores[candidates]))
+        return candidates[order].tolist()
@@ -0,0 +1,75 @@
+"""
+Кэш закодированного JSON для ответов со списками вакансий и компаний.
+Каждый объект кодируется один раз (сериализатором pydantic-core), список
+собирается склейкой готовых фрагментов без повторной валидации и кодирования.
+"""
+import threading
+from typing import Dict, Hashable, Iterable, Optional
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+class FragmentCache:
+    """
+    Закодированные в JSON модели по ID.
+    
+    Хранилище сбрасывает фрагмент при изменении объекта (invalidate) или,
+    если отдельные изменения не отслеживаются, весь кэш при смене версии каталога (sync).
+    Модели, прочитанные до последнего изменения каталога, кодируются без сохранения
+    (store=False): иначе в кэш вернулся бы только что сброшенный устаревший фрагмент.
+    """
+    
+    def __init__(self):
+        self._fragments: Dict[Hashable, bytes] = {}
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._fragments)
+    
+    def sync(self, version: int) -> None:
+        """Сбросить все фрагменты, если каталог изменился с момента их кодирования"""
+        with self._lock:
+            if version != self._version:
+                self._fragments.clear()
+                self._version = version
+    
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                self._fragments.pop(key, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments.clear()
+    
+    def fragment(self, model: BaseModel, store: bool = True) -> bytes:
+        """JSON одной модели; ключ - ее id"""
+        if not store:
+            return type(model).__pydantic_serializer__.to_json(model)
+        key = model.id
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self.hits += 1
+                return fragment
+            self.misses += 1
+        # Кодирование - вне блокировки; если другой поток успел сохранить фрагмент, берется его
+        fragment = type(model).__pydantic_serializer__.to_json(model)
+        with self._lock:
+            return self._fragments.setdefault(key, fragment)
+    
+    def encode_list(self, models: Iterable[BaseModel], store: bool = True) -> bytes:
+        """JSON-массив из готовых фрагментов"""
+        return b"[" + b",".join(self.fragment(m, store) for m in models) + b"]"
+    
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._fragments), "hits": self.hits, "misses": self.misses}
+
+
+class RawJSONResponse(Response):
+    """Ответ с уже закодированным JSON"""
+    media_type = "application/json"
@@ -0,0 +1,160 @@
+"""
+Серверные сессии чата: история разговора и контекст пользователя (навыки, опыт).
+Клиент передает только новое сообщение и session_id, поэтому размер запроса
+не растет с длиной разговора.
+
+Сессии хранятся в LRU-кэше с TTL; при заданном пути к файлу дополнительно
+сохраняются в SQLite и переживают перезапуск сервера (и видны всем воркерам).
+Неизвестный или истекший session_id не принимается: клиент получает новую сессию.
+"""
+import sqlite3
+import threading
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+from cache import TTLCache
+from models import ChatMessage, ChatRequest
+from skill_index import normalize_skill
+
+
+class ChatSession(BaseModel):
+    id: str
+    history: List[ChatMessage] = Field(default_factory=list)
+    user_skills: List[str] = Field(default_factory=list)
+    user_experience: Optional[str] = None
+    # Время сохранения версии, с которой начат запрос (0 - новая сессия)
+    _updated_at: float = PrivateAttr(0.0)
+    # Историю целиком заменил клиент (conversation_history)
+    _history_replaced: bool = PrivateAttr(False)
+    
+    def apply(self, request: ChatRequest) -> ChatRequest:
+        """
+        Запрос, дополненный историей и контекстом пользователя из сессии.
+        Переданные в запросе навыки и опыт обновляют контекст сессии; если клиент
+        прислал conversation_history (старый формат), она заменяет историю сессии.
+        """
+        if request.conversation_history:
+            self.history = list(request.conversation_history)
+            self._history_replaced = True
+        if request.user_skills:
+            self.user_skills = list(dict.fromkeys(s.strip() for s in request.user_skills if normalize_skill(s)))
+        if request.user_experience:
+            self.user_experience = request.user_experience
+        return request.model_copy(update={
+            "conversation_history": self.history,
+            "user_skills": self.user_skills,
+            "user_experience": self.user_experience,
+        })
+    
+    def add_turn(self, user_message: str, assistant_message: str, max_messages: int) -> None:
+        self.history.append(ChatMessage(role="user", content=user_message))
+        self.history.append(ChatMessage(role="assistant", content=assistant_message))
+        del self.history[:-max_messages]
+
+
+class SessionStore:
+    """
+    Хранилище сессий чата.
+    
+    - **maxsize**, **ttl**: размер LRU-кэша в памяти и время жизни сессии без активности (секунды)
+    - **path**: файл SQLite для долговременного хранения (None - только память)
+    - **max_messages**: сколько последних сообщений хранится в сессии
+    """
+    
+    def __init__(self, maxsize: int = 10000, ttl: float = 86400, path: Optional[str] = None, max_messages: int = 200):
+        self.ttl = ttl
+        self.max_messages = max_messages
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._lock, self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS chat_sessions ("
+                    "id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS ix_chat_sessions_updated ON chat_sessions (updated_at)")
+    
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+    
+    def _latest(self, session_id: str) -> Optional[ChatSession]:
+        """
+        Последняя сохраненная версия сессии. Кэш только избавляет от разбора JSON:
+        с файлом SQLite версия сверяется по updated_at, т.к. сессию мог изменить другой воркер.
+        """
+        cached = self._cache.get(session_id)
+        if self._conn is None:
+            return cached
+        row = self._conn.execute(
+            "SELECT data, updated_at FROM chat_sessions WHERE id = ? AND updated_at > ?",
+            (session_id, time.time() - self.ttl)
+        ).fetchone()
+        if row is None:
+            return None
+        if cached is None or cached._updated_at != row[1]:
+            cached = ChatSession.model_validate_json(row[0])
+            cached._updated_at = row[1]
+            self._cache.set(session_id, cached)
+        return cached
+    
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        """Копия последней версии сессии (None - сессия неизвестна или истекла)"""
+        with self._lock:
+            session = self._latest(session_id)
+        return session.model_copy(deep=True) if session is not None else None
+    
+    def get_or_create(self, session_id: Optional[str] = None) -> ChatSession:
+        """
+        Сессия по ID или новая со случайным ID, если ID не передан, неизвестен или сессия истекла.
+        ID, придуманный клиентом, не становится ID сессии.
+        """
+        session = self.get(session_id) if session_id else None
+        return session or ChatSession(id=uuid.uuid4().hex)
+    
+    def save(self, session: ChatSession, turn: Optional[Tuple[str, str]] = None) -> None:
+        """
+        Сохраняет сессию (и новую пару реплик turn) и продлевает ее время жизни.
+        
+        Если с начала запроса сессию сохранил параллельный запрос, реплики добавляются
+        к сохраненной им истории, а не затирают ее. Чтение и запись идут под блокировкой
+        записи SQLite, поэтому это верно и для запросов в разных воркерах.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                latest = self._latest(session.id)
+                if latest is not None and latest._updated_at != session._updated_at and not session._history_replaced:
+                    session.history = list(latest.history)
+                if turn is not None:
+                    session.add_turn(*turn, self.max_messages)
+                now = time.time()
+                if latest is not None and now <= latest._updated_at:
+                    now = latest._updated_at + 1e-6
+                session._updated_at = now
+                session._history_replaced = False
+                if self._conn is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO chat_sessions (id, data, updated_at) VALUES (?, ?, ?)",
+                        (session.id, session.model_dump_json(), now)
+                    )
+                    self._conn.execute("DELETE FROM chat_sessions WHERE updated_at <= ?", (now - self.ttl,))
+                    self._conn.commit()
+            except BaseException:
+                if self._conn is not None:
+                    self._conn.rollback()
+                raise
+            self._cache.set(session.id, session.model_copy(deep=True))
+    
+    def add_turn(self, session: ChatSession, user_message: str, assistant_message: str) -> None:
+        self.save(session, turn=(user_message, assistant_message))
+    
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "persistent": self._conn is not None}
@@ -0,0 +1,106 @@
+"""
+Инвертированный индекс навыков вакансий.
+Хранит для каждого нормализованного навыка список (множество) ID вакансий,
+где он встречается в обязательных или желательных навыках.
+Индекс обновляется при каждом изменении вакансии и не перестраивается целиком.
+
+normalize_skill используют все индексы навыков (фасеты, рекомендации, поиск навыков
+в тексте, таблица vacancy_skills в SQLite): навыки сравниваются в одном каноническом виде.
+"""
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+def normalize_skill(skill: str) -> str:
+    """Приводит навык к каноническому виду: нижний регистр, одиночные пробелы"""
+    return " ".join(skill.lower().split())
+
+
+class SkillIndex:
+    """
+    Индекс навык -> ID вакансий.
+    
+    Поддерживает поиск по любому (any) или всем (all) навыкам запроса
+    с ограничением области поиска: все навыки вакансии, только обязательные
+    (required) или только желательные (preferred).
+    Стоимость запроса пропорциональна суммарной длине списков вакансий
+    для навыков запроса, а не размеру каталога.
+    """
+    
+    def __init__(self):
+        self._required: Dict[str, Set[int]] = defaultdict(set)
+        self._preferred: Dict[str, Set[int]] = defaultdict(set)
+        # Навыки каждой вакансии, чтобы корректно удалять ее из индекса
+        self._by_vacancy: Dict[int, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._by_vacancy)
+    
+    def add(self, vacancy_id: int, required_skills: Iterable[str], preferred_skills: Iterable[str]) -> None:
+        """Добавляет (или переиндексирует) вакансию"""
+        if vacancy_id in self._by_vacancy:
+            self.remove(vacancy_id)
+        
+        required = tuple(s for s in dict.fromkeys(normalize_skill(s) for s in required_skills) if s)
+        preferred = tuple(s for s in dict.fromkeys(normalize_skill(s) for s in preferred_skills) if s)
+        for skill in required:
+            self._required[skill].add(vacancy_id)
+        for skill in preferred:
+            self._preferred[skill].add(vacancy_id)
+        self._by_vacancy[vacancy_id] = (required, preferred)
+    
+    def remove(self, vacancy_id: int) -> None:
+        """Удаляет вакансию из индекса"""
+        skills = self._by_vacancy.pop(vacancy_id, None)
+        if skills is None:
+            return
+        
+        required, preferred = skills
+        for postings, vacancy_skills in ((self._required, required), (self._preferred, preferred)):
+            for skill in vacancy_skills:
+                ids = postings.get(skill)
+                if ids is None:
+                    continue
+                ids.discard(vacancy_id)
+                if not ids:
+                    del postings[skill]
+    
+    def search(self, skills: Iterable[str], match: str = "any", scope: str = "all") -> List[int]:
+        """
+        Ищет вакансии по навыкам.
+        
+        - **match**: "any" - хотя бы один навык, "all" - все навыки запроса
+        - **scope**: "all", "required" или "preferred" - в каких навыках вакансии искать
+        
+        Возвращает ID вакансий, отсортированные по числу совпавших навыков
+        (при равенстве - по числу совпадений в обязательных навыках).
+        """
+        query = [s for s in dict.fromkeys(normalize_skill(s) for s in skills) if s]
+        if not query:
+            return []
+        
+        use_required = scope in ("all", "required")
+        use_preferred = scope in ("all", "preferred")
+        empty: Set[int] = set()
+        
+        matches: Counter = Counter()
+        required_hits: Counter = Counter()
+        for skill in query:
+            required_ids = self._required.get(skill, empty) if use_required else empty
+            preferred_ids = self._preferred.get(skill, empty) if use_preferred else empty
+            if match == "all" and not required_ids and not preferred_ids:
+                return []
+            for vacancy_id in required_ids:
+                matches[vacancy_id] += 1
+                required_hits[vacancy_id] += 1
+            for vacancy_id in preferred_ids:
+                if vacancy_id not in required_ids:
+                    matches[vacancy_id] += 1
+        
+        if match == "all":
+            candidates = [vid for vid, count in matches.items() if count == len(query)]
+        else:
+            candidates = list(matches)
+        
+        candidates.sort(key=lambda vid: (-matches[vid], -required_hits[vid], vid))
+        return candidates
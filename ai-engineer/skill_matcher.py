@@ -0,0 +1,125 @@
+"""
+Поиск навыков и названий вакансий каталога в тексте ответа модели.
+Автомат Ахо-Корасик строится один раз по словарю каталога и находит
+все вхождения за один проход по тексту (время линейно по длине текста).
+"""
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Mapping, Sequence, Tuple
+
+from skill_index import normalize_skill
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class AhoCorasick:
+    """
+    Автомат для одновременного поиска множества шаблонов без учета регистра.
+    Совпадения засчитываются только по границам слов ("Go" не находится в "Google").
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Hashable]]):
+        # Переходы, суффиксные ссылки и (длина шаблона, значение) для каждого состояния
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Hashable]]] = [[]]
+        for pattern, value in patterns:
+            self._add(pattern.lower(), value)
+        self._build_links()
+
+    def _add(self, pattern: str, value: Hashable) -> None:
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), value))
+
+    def _build_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                # Совпадения суффиксов наследуются, чтобы не ходить по ссылкам при поиске
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> List[Tuple[int, int, Hashable]]:
+        """
+        Все вхождения шаблонов по границам слов: (начало, конец, значение).
+        Вхождения, целиком лежащие внутри более длинного ("API" внутри "REST API"), отбрасываются.
+        """
+        lowered = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        matches: List[Tuple[int, int, Hashable]] = []
+        state = 0
+        for end, char in enumerate(lowered, start=1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, value in output[state]:
+                start = end - length
+                if (start == 0 or not _is_word_char(lowered[start - 1])) and (
+                    end == len(lowered) or not _is_word_char(lowered[end])
+                ):
+                    matches.append((start, end, value))
+
+        matches.sort(key=lambda m: (m[0], m[0] - m[1]))
+        result: List[Tuple[int, int, Hashable]] = []
+        covered_until = -1
+        for match in matches:
+            # Шаблоны с одинаковым вхождением (навык и название вакансии) сохраняются все
+            same_span = bool(result) and result[-1][:2] == match[:2]
+            if match[1] <= covered_until and not same_span:
+                continue
+            result.append(match)
+            covered_until = max(covered_until, match[1])
+        return result
+
+
+class SkillMatcher:
+    """
+    Словарь каталога: навыки из required/preferred_skills и названия вакансий.
+    Навык возвращается в написании, в котором он впервые встретился в каталоге;
+    шаблоны строятся по нормализованному ключу, как и текст, в котором идет поиск.
+    """
+
+    def __init__(self, items: Sequence[Mapping]):
+        self.skills: Dict[str, str] = {}
+        titles: Dict[str, List[int]] = {}
+        for item in items:
+            for skill in (*item.get("required_skills", ()), *item.get("preferred_skills", ())):
+                key = normalize_skill(skill)
+                if key:
+                    self.skills.setdefault(key, skill.strip())
+            title = " ".join(item.get("title", "").split())
+            if title:
+                titles.setdefault(title.lower(), []).append(item["id"])
+        self.titles = {title: tuple(ids) for title, ids in titles.items()}
+        self._automaton = AhoCorasick(
+            [(key, ("skill", key)) for key in self.skills]
+            + [(title, ("title", title)) for title in self.titles]
+        )
+
+    def extract(self, text: str) -> Tuple[List[int], List[str]]:
+        """ID вакансий, названия которых упомянуты в тексте, и навыки каталога - в порядке упоминания"""
+        vacancy_ids: Dict[int, None] = {}
+        skills: Dict[str, None] = {}
+        for _, _, (kind, key) in self._automaton.find(" ".join(text.split())):
+            if kind == "skill":
+                skills[self.skills[key]] = None
+            else:
+                vacancy_ids.update(dict.fromkeys(self.titles[key]))
+        return list(vacancy_ids), list(skills)
@@ -0,0 +1,627 @@
+"""
+Хранилище вакансий и компаний в SQLite.
+Полнотекстовый поиск - FTS5, фильтры по городу, уровню, типу занятости, зарплате
+и навыкам и счетчики фасетов выполняются в SQL, поэтому воркеру не нужно держать
+в памяти индексы всего каталога. Методы совпадают с Database из database.py,
+поэтому хранилища взаимозаменяемы.
+"""
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from itertools import islice
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from catalog import CatalogSnapshot
+from facets import JOB_TYPE_VALUES, LEVEL_VALUES, normalize_location
+from models import Company, Vacancy
+from retrieval import tokenize
+from serialization import FragmentCache
+from skill_index import normalize_skill
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('version', 0);
+-- Случайный идентификатор файла: ETag пересозданной базы не совпадут со старыми
+INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('instance', random() & 9223372036854775807);
+INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('updated_at', CAST(strftime('%s', 'now') AS INTEGER));
+
+CREATE TABLE IF NOT EXISTS companies (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    industry TEXT,
+    website TEXT,
+    location TEXT
+);
+
+CREATE TABLE IF NOT EXISTS vacancies (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    company_id INTEGER NOT NULL,
+    location TEXT,
+    location_key TEXT,
+    salary_min REAL,
+    salary_max REAL,
+    job_type TEXT,
+    experience_level TEXT,
+    required_skills TEXT NOT NULL DEFAULT '[]',
+    preferred_skills TEXT NOT NULL DEFAULT '[]',
+    posted_date TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_vacancies_company ON vacancies (company_id);
+CREATE INDEX IF NOT EXISTS ix_vacancies_location ON vacancies (location_key);
+CREATE INDEX IF NOT EXISTS ix_vacancies_level ON vacancies (experience_level);
+CREATE INDEX IF NOT EXISTS ix_vacancies_job_type ON vacancies (job_type);
+CREATE INDEX IF NOT EXISTS ix_vacancies_salary_top ON vacancies (COALESCE(salary_max, salary_min));
+CREATE INDEX IF NOT EXISTS ix_vacancies_salary_bottom ON vacancies (COALESCE(salary_min, salary_max));
+
+CREATE TABLE IF NOT EXISTS vacancy_skills (
+    skill TEXT NOT NULL,
+    vacancy_id INTEGER NOT NULL,
+    in_required INTEGER NOT NULL DEFAULT 0,
+    in_preferred INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (skill, vacancy_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_vacancy_skills_vacancy ON vacancy_skills (vacancy_id);
+
+-- Написание навыка для фасетов (в vacancy_skills навык нормализован)
+CREATE TABLE IF NOT EXISTS skill_names (
+    skill TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS vacancies_fts USING fts5 (
+    title, description, skills, tokenize = 'unicode61'
+);
+"""
+
+VACANCY_COLUMNS = """
+    v.id, v.title, v.description, v.company_id, v.location, v.salary_min, v.salary_max,
+    v.job_type, v.experience_level, v.required_skills, v.preferred_skills, v.posted_date,
+    c.name AS company_name, c.description AS company_description, c.industry AS company_industry,
+    c.website AS company_website, c.location AS company_location
+"""
+
+# Ограничение SQLite на число параметров в одном запросе
+MAX_VARIABLES = 900
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Фильтр поиска: (поле, соединение или условие WHERE, SQL, параметры)
+Filter = Tuple[str, bool, str, List[Any]]
+
+
+def _fts_query(text: str) -> Optional[str]:
+    """Текст пользователя -> запрос FTS5 (любой из токенов, каждый в кавычках)"""
+    tokens = list(dict.fromkeys(tokenize(text)))
+    if not tokens:
+        return None
+    return " OR ".join('"' + token.replace('"', '""') + '"' for token in tokens)
+
+
+class SQLiteDatabase:
+    """
+    Хранилище вакансий и компаний в файле SQLite.
+
+    Версия каталога хранится в самой базе, поэтому все воркеры, открывшие
+    один файл, видят изменения друг друга. Пустая база заполняется мок-данными.
+    """
+
+    # Фильтры и фасеты считаются запросами SQL, без индексов снимка каталога в памяти
+    facets_in_sql = True
+
+    def __init__(self, path: str = "vacancies.db", seed: bool = True):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        # Фасеты всего каталога по (версия, размер списка значений)
+        self._catalog_facets: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        # Закодированный JSON вакансий и компаний; сбрасывается при смене версии каталога
+        self.vacancy_fragments = FragmentCache()
+        self.company_fragments = FragmentCache()
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+            # Общий для всех воркеров, открывших этот файл
+            self.catalog_id = "sqlite-%x" % self._conn.execute(
+                "SELECT value FROM catalog_meta WHERE key = 'instance'"
+            ).fetchone()[0]
+
+        if seed and self._conn.execute("SELECT COUNT(*) FROM vacancies").fetchone()[0] == 0:
+            from database import MOCK_COMPANIES, MOCK_VACANCIES
+            self.bulk_load(MOCK_VACANCIES, MOCK_COMPANIES)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @property
+    def version(self) -> int:
+        """Версия каталога; увеличивается при каждом изменении"""
+        with self._lock:
+            return self._conn.execute("SELECT value FROM catalog_meta WHERE key = 'version'").fetchone()[0]
+
+    def _bump_version(self) -> None:
+        self._conn.execute("UPDATE catalog_meta SET value = value + 1 WHERE key = 'version'")
+        self._conn.execute(
+            "UPDATE catalog_meta SET value = CAST(strftime('%s', 'now') AS INTEGER) WHERE key = 'updated_at'"
+        )
+
+    def get_catalog_state(self) -> Tuple[int, datetime]:
+        """Версия каталога и время его последнего изменения"""
+        with self._lock:
+            meta = dict(self._conn.execute(
+                "SELECT key, value FROM catalog_meta WHERE key IN ('version', 'updated_at')"
+            ).fetchall())
+        return meta["version"], datetime.fromtimestamp(meta["updated_at"], tz=timezone.utc)
+
+    # Запись
+
+    def _write_company(self, company: Company) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO companies (id, name, description, industry, website, location) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (company.id, company.name, company.description, company.industry, company.website, company.location)
+        )
+
+    def _delete_vacancy_rows(self, vacancy_ids: Sequence[int]) -> None:
+        for chunk in _chunks(vacancy_ids, MAX_VARIABLES):
+            marks = ",".join("?" * len(chunk))
+            self._conn.execute(f"DELETE FROM vacancy_skills WHERE vacancy_id IN ({marks})", chunk)
+            self._conn.execute(f"DELETE FROM vacancies_fts WHERE rowid IN ({marks})", chunk)
+
+    def _write_vacancies(self, vacancies: Sequence[Vacancy]) -> None:
+        """Вставляет или заменяет пачку вакансий вместе с навыками и полнотекстовым индексом"""
+        self._delete_vacancy_rows([v.id for v in vacancies])
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO vacancies (id, title, description, company_id, location, location_key, "
+            "salary_min, salary_max, job_type, experience_level, required_skills, preferred_skills, posted_date) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    v.id, v.title, v.description, v.company_id, v.location,
+                    v.location.strip().lower() if v.location else None,
+                    v.salary_min, v.salary_max,
+                    v.job_type.value if v.job_type else None,
+                    v.experience_level.value if v.experience_level else None,
+                    json.dumps(v.required_skills, ensure_ascii=False),
+                    json.dumps(v.preferred_skills, ensure_ascii=False),
+                    v.posted_date.isoformat() if v.posted_date else None,
+                )
+                for v in vacancies
+            ]
+        )
+        self._conn.executemany(
+            "INSERT INTO vacancy_skills (skill, vacancy_id, in_required, in_preferred) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (skill, vacancy_id) DO UPDATE SET "
+            "in_required = MAX(in_required, excluded.in_required), "
+            "in_preferred = MAX(in_preferred, excluded.in_preferred)",
+            [
+                (skill, v.id, int(required), int(not required))
+                for v in vacancies
+                for skills, required in ((v.required_skills, True), (v.preferred_skills, False))
+                for skill in {normalize_skill(s) for s in skills} - {""}
+            ]
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO skill_names (skill, name) VALUES (?, ?)",
+            [
+                (normalize_skill(skill), skill.strip())
+                for v in vacancies
+                for skill in v.required_skills + v.preferred_skills
+                if normalize_skill(skill)
+            ]
+        )
+        self._conn.executemany(
+            "INSERT INTO vacancies_fts (rowid, title, description, skills) VALUES (?, ?, ?, ?)",
+            [
+                (v.id, v.title, v.description, " ".join(v.required_skills + v.preferred_skills))
+                for v in vacancies
+            ]
+        )
+
+    def add_vacancy(self, vacancy: Vacancy) -> None:
+        """Добавить или обновить вакансию"""
+        with self._lock, self._conn:
+            self._write_vacancies([vacancy])
+            self._bump_version()
+
+    def remove_vacancy(self, vacancy_id: int) -> Optional[Vacancy]:
+        """Удалить вакансию"""
+        with self._lock, self._conn:
+            vacancy = self.get_vacancy_by_id(vacancy_id)
+            if vacancy is None:
+                return None
+            self._delete_vacancy_rows([vacancy_id])
+            self._conn.execute("DELETE FROM vacancies WHERE id = ?", (vacancy_id,))
+            self._bump_version()
+        return vacancy
+
+    def add_company(self, company: Company) -> None:
+        """Добавить или обновить компанию"""
+        with self._lock, self._conn:
+            self._write_company(company)
+            self._bump_version()
+
+    def bulk_load(
+        self,
+        vacancies: Iterable[Vacancy],
+        companies: Iterable[Company] = (),
+        batch_size: int = 5000
+    ) -> int:
+        """
+        Массовая загрузка каталога пачками по batch_size записей в одной транзакции на пачку.
+        Принимает любые итерируемые источники (в том числе генераторы), поэтому
+        в памяти одновременно находится не больше одной пачки. Возвращает число вакансий.
+        """
+        loaded = 0
+        with self._lock:
+            with self._conn:
+                for company in companies:
+                    self._write_company(company)
+            for batch in _chunks(vacancies, batch_size):
+                with self._conn:
+                    self._write_vacancies(batch)
+                loaded += len(batch)
+            with self._conn:
+                self._bump_version()
+        return loaded
+
+    # Чтение
+
+    def _row_to_vacancy(self, row: sqlite3.Row) -> Vacancy:
+        company = None
+        if row["company_name"] is not None:
+            company = Company(
+                id=row["company_id"],
+                name=row["company_name"],
+                description=row["company_description"],
+                industry=row["company_industry"],
+                website=row["company_website"],
+                location=row["company_location"],
+            )
+        return Vacancy(
+            id=row["id"],
+            title=row["title"],
+            description=row["description"],
+            company_id=row["company_id"],
+            company=company,
+            location=row["location"],
+            salary_min=row["salary_min"],
+            salary_max=row["salary_max"],
+            job_type=row["job_type"],
+            experience_level=row["experience_level"],
+            required_skills=json.loads(row["required_skills"]),
+            preferred_skills=json.loads(row["preferred_skills"]),
+            posted_date=datetime.fromisoformat(row["posted_date"]) if row["posted_date"] else None,
+        )
+
+    def _select_vacancies(self, where: str = "", params: Sequence[Any] = (), tail: str = "ORDER BY v.id") -> List[Vacancy]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {VACANCY_COLUMNS} FROM vacancies v LEFT JOIN companies c ON c.id = v.company_id "
+                f"{where} {tail}",
+                params
+            ).fetchall()
+        return [self._row_to_vacancy(row) for row in rows]
+
+    def get_vacancies_by_ids(self, ids: Sequence[int]) -> List[Vacancy]:
+        """Вакансии по списку ID в том же порядке (отсутствующие пропускаются)"""
+        found: Dict[int, Vacancy] = {}
+        for chunk in _chunks(ids, MAX_VARIABLES):
+            marks = ",".join("?" * len(chunk))
+            for vacancy in self._select_vacancies(f"WHERE v.id IN ({marks})", chunk, tail=""):
+                found[vacancy.id] = vacancy
+        return [found[vid] for vid in ids if vid in found]
+
+    def get_all_vacancies(self) -> List[Vacancy]:
+        """Получить все вакансии"""
+        return self._select_vacancies()
+
+    def get_vacancy_by_id(self, vacancy_id: int) -> Optional[Vacancy]:
+        """Получить вакансию по ID"""
+        vacancies = self._select_vacancies("WHERE v.id = ?", (vacancy_id,), tail="")
+        return vacancies[0] if vacancies else None
+
+    def _skill_matches_sql(self, skills: List[str], match: str, scope: str) -> Tuple[str, List[Any], int]:
+        """
+        Подзапрос (vacancy_id, matches, required_hits) по навыкам.
+        Возвращает SQL, параметры и число навыков запроса (0 - навыков нет).
+        """
+        query = [s for s in dict.fromkeys(normalize_skill(s) for s in skills) if s]
+        if not query:
+            return "", [], 0
+
+        conditions = [f"skill IN ({','.join('?' * len(query))})"]
+        if scope == "required":
+            conditions.append("in_required = 1")
+        elif scope == "preferred":
+            conditions.append("in_preferred = 1")
+        required_hits = "SUM(in_required)" if scope in ("all", "required") else "0"
+        having = f"HAVING COUNT(*) = {len(query)}" if match == "all" else ""
+        sql = (
+            f"SELECT vacancy_id, COUNT(*) AS matches, {required_hits} AS required_hits "
+            f"FROM vacancy_skills WHERE {' AND '.join(conditions)} GROUP BY vacancy_id {having}"
+        )
+        return sql, query, len(query)
+
+    def get_vacancies_by_skills(self, skills: List[str], match: str = "any", scope: str = "all") -> List[Vacancy]:
+        """
+        Получить вакансии, требующие указанные навыки (по индексу vacancy_skills)
+
+        - **match**: "any" - любой из навыков, "all" - все навыки
+        - **scope**: "all", "required" или "preferred" - где искать навыки
+
+        Результат отсортирован по числу совпавших навыков.
+        """
+        sql, params, count = self._skill_matches_sql(skills, match, scope)
+        if not count:
+            return []
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute(
+                f"SELECT vacancy_id FROM ({sql}) ORDER BY matches DESC, required_hits DESC, vacancy_id", params
+            )]
+            return self.get_vacancies_by_ids(ids)
+
+    def _search_filters(
+        self,
+        query: Optional[str],
+        skills: Optional[List[str]],
+        skills_match: str,
+        skills_scope: str,
+        experience_levels: Optional[List[str]],
+        job_types: Optional[List[str]],
+        locations: Optional[List[str]],
+        salary_from: Optional[float],
+        salary_to: Optional[float]
+    ) -> List[Filter]:
+        """Фильтры поиска; несколько значений одного поля объединяются через ИЛИ"""
+        filters: List[Filter] = []
+        if query:
+            fts = _fts_query(query)
+            if fts is None:
+                filters.append(("query", False, "0", []))
+            else:
+                filters.append((
+                    "query", True,
+                    "JOIN (SELECT rowid AS vacancy_id, rank FROM vacancies_fts WHERE vacancies_fts MATCH ?) f "
+                    "ON f.vacancy_id = v.id",
+                    [fts]
+                ))
+        if skills:
+            skills_sql, skills_params, count = self._skill_matches_sql(skills, skills_match, skills_scope)
+            if count:
+                filters.append(("skills", True, f"JOIN ({skills_sql}) m ON m.vacancy_id = v.id", skills_params))
+            else:
+                filters.append(("skills", False, "0", []))
+
+        for field, column, values in (
+            ("experience_level", "v.experience_level", experience_levels),
+            ("job_type", "v.job_type", job_types),
+            ("location", "v.location_key", [normalize_location(l) for l in locations or ()]),
+        ):
+            if values:
+                filters.append((field, False, f"{column} IN ({','.join('?' * len(values))})", list(values)))
+        if salary_from is not None:
+            filters.append(("salary", False, "COALESCE(v.salary_max, v.salary_min) >= ?", [salary_from]))
+        if salary_to is not None:
+            filters.append(("salary", False, "COALESCE(v.salary_min, v.salary_max) <= ?", [salary_to]))
+        return filters
+
+    @staticmethod
+    def _from_where(
+        filters: List[Filter],
+        exclude: Optional[str] = None,
+        extra: Optional[str] = None
+    ) -> Tuple[str, List[Any]]:
+        """FROM ... WHERE ... по фильтрам, кроме фильтров поля exclude (для фасетов этого поля)"""
+        active = [f for f in filters if f[0] != exclude]
+        joins = [f for f in active if f[1]]
+        conditions = [f[2] for f in active if not f[1]] + ([extra] if extra else [])
+        sql = "FROM vacancies v " + " ".join(f[2] for f in joins)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        params = [p for f in joins for p in f[3]] + [p for f in active if not f[1] for p in f[3]]
+        return sql, params
+
+    def _value_counts(self, filters: List[Filter], field: str, column: str, values: List[str]) -> List[Dict[str, Any]]:
+        """Фасет перечисления: сколько вакансий нашлось бы с этим значением при остальных фильтрах"""
+        sql, params = self._from_where(filters, exclude=field, extra=f"{column} IS NOT NULL")
+        counts = dict(self._conn.execute(f"SELECT {column}, COUNT(*) {sql} GROUP BY {column}", params).fetchall())
+        ordered = sorted((value for value in values if counts.get(value)), key=lambda value: -counts[value])
+        return [{"value": value, "count": counts[value]} for value in ordered]
+
+    def _facets(self, filters: List[Filter], facet_size: int) -> Dict[str, Any]:
+        """Счетчики фасетов в формате FacetIndex: уровни, типы занятости, города, навыки, зарплаты"""
+        location_sql, location_params = self._from_where(
+            filters, exclude="location", extra="v.location_key IS NOT NULL"
+        )
+        # Город подписывается написанием из вакансии с наименьшим ID (как в снимке каталога), а не из найденных
+        locations = self._conn.execute(
+            f"SELECT (SELECT TRIM(l.location) FROM vacancies l WHERE l.location_key = v.location_key "
+            f"ORDER BY l.id LIMIT 1), COUNT(*) AS n {location_sql} "
+            f"GROUP BY v.location_key ORDER BY n DESC, v.location_key LIMIT ?",
+            location_params + [facet_size]
+        ).fetchall()
+
+        sql, params = self._from_where(filters)
+        skills = self._conn.execute(
+            f"SELECT COALESCE(MIN(n.name), s.skill), COUNT(*) AS c FROM vacancy_skills s "
+            f"LEFT JOIN skill_names n ON n.skill = s.skill "
+            f"WHERE s.vacancy_id IN (SELECT v.id {sql}) GROUP BY s.skill ORDER BY c DESC, s.skill LIMIT ?",
+            params + [facet_size]
+        ).fetchall()
+        salary_min, salary_max = self._conn.execute(
+            f"SELECT MIN(COALESCE(v.salary_min, v.salary_max)), MAX(COALESCE(v.salary_max, v.salary_min)) {sql}",
+            params
+        ).fetchone()
+        return {
+            "experience_level": self._value_counts(filters, "experience_level", "v.experience_level", LEVEL_VALUES),
+            "job_type": self._value_counts(filters, "job_type", "v.job_type", JOB_TYPE_VALUES),
+            "location": [{"value": name, "count": count} for name, count in locations],
+            "skills": [{"value": name, "count": count} for name, count in skills],
+            "salary": {
+                "min": float(salary_min) if salary_min is not None else None,
+                "max": float(salary_max) if salary_max is not None else None,
+            },
+        }
+
+    def facet_search(
+        self,
+        query: Optional[str] = None,
+        skills: Optional[List[str]] = None,
+        skills_match: str = "any",
+        skills_scope: str = "all",
+        experience_levels: Optional[List[str]] = None,
+        job_types: Optional[List[str]] = None,
+        locations: Optional[List[str]] = None,
+        salary_from: Optional[float] = None,
+        salary_to: Optional[float] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        facets: bool = True,
+        facet_size: int = 20
+    ) -> Tuple[List[int], int, Optional[Dict[str, Any]]]:
+        """
+        Поиск с фильтрами, страницей и фасетами (как FacetIndex.search); все выполняется в SQL
+
+        - **query**: полнотекстовый поиск FTS5 по названию, описанию и навыкам
+        - **skills**: "any" - любой из навыков, "all" - все навыки; scope "all", "required" или "preferred"
+        - **experience_levels**, **job_types**, **locations**: любое из значений
+        - **salary_from** / **salary_to**: вилка зарплаты должна пересекаться с диапазоном
+
+        Возвращает ID вакансий страницы, общее число найденных и счетчики фасетов.
+        Вакансии отсортированы по релевантности тексту, затем по числу совпавших навыков и по ID.
+        """
+        filters = self._search_filters(
+            query, skills, skills_match, skills_scope, experience_levels, job_types, locations, salary_from, salary_to
+        )
+        fields = {f[0] for f in filters}
+        order = (["f.rank"] if "query" in fields and filters[0][1] else []) + (
+            ["m.matches DESC", "m.required_hits DESC"] if any(f[0] == "skills" and f[1] for f in filters) else []
+        ) + ["v.id"]
+        sql, params = self._from_where(filters)
+
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute(
+                f"SELECT v.id {sql} ORDER BY {', '.join(order)} LIMIT ? OFFSET ?",
+                params + [limit if limit is not None else -1, offset]
+            )]
+            total = self._conn.execute(f"SELECT COUNT(*) {sql}", params).fetchone()[0]
+
+            facet_counts = None
+            if facets:
+                if filters:
+                    facet_counts = self._facets(filters, facet_size)
+                else:
+                    # Фасеты всего каталога не зависят от запроса и считаются один раз на версию
+                    key = (self.version, facet_size)
+                    if key not in self._catalog_facets:
+                        self._catalog_facets = {
+                            k: v for k, v in self._catalog_facets.items() if k[0] == key[0]
+                        }
+                        self._catalog_facets[key] = self._facets(filters, facet_size)
+                    facet_counts = self._catalog_facets[key]
+        return ids, total, facet_counts
+
+    def get_catalog_snapshot(self) -> CatalogSnapshot:
+        """
+        Получить неизменяемый снимок вакансий в формате для чат-бота.
+        Снимок пересобирается только после изменения каталога.
+        """
+        # Соединение общее для потоков (запросы и фоновый прогрев), поэтому чтение идет под
+        # блокировкой; заодно снимок одной версии строится один раз
+        with self._lock:
+            version = self.version
+            if self._snapshot is None or self._snapshot.version != version:
+                rows = self._conn.execute(
+                    "SELECT v.id, v.title, v.description, c.name AS company_name, v.location, "
+                    "v.salary_min, v.salary_max, v.job_type, v.experience_level, "
+                    "v.required_skills, v.preferred_skills "
+                    "FROM vacancies v LEFT JOIN companies c ON c.id = v.company_id ORDER BY v.id"
+                )
+                items: List[Mapping] = []
+                for row in rows:
+                    item = dict(row)
+                    item["company_name"] = item["company_name"] or "N/A"
+                    item["required_skills"] = tuple(json.loads(item["required_skills"]))
+                    item["preferred_skills"] = tuple(json.loads(item["preferred_skills"]))
+                    items.append(MappingProxyType(item))
+                self._snapshot = CatalogSnapshot(version, tuple(items))
+            return self._snapshot
+
+    def get_vacancies_data_for_chat(self) -> List[Dict]:
+        """
+        Получить данные о вакансиях в формате для чат-бота
+        """
+        return [dict(item) for item in self.get_catalog_snapshot()]
+
+    def get_company_by_id(self, company_id: int) -> Optional[Company]:
+        """Получить компанию по ID"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM companies WHERE id = ?", (company_id,)).fetchone()
+        return Company(**dict(row)) if row else None
+
+    def get_all_companies(self) -> List[Company]:
+        """Получить все компании"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM companies ORDER BY id").fetchall()
+        return [Company(**dict(row)) for row in rows]
+
+    def encode_vacancies(self, vacancies: List[Vacancy], version: int) -> bytes:
+        """
+        JSON-массив вакансий из кэшированных фрагментов.
+
+        Базу могут менять другие процессы, поэтому изменения отдельных строк здесь
+        не видны: фрагменты живут в пределах версии каталога. version нужно прочитать
+        до выборки vacancies, тогда фрагмент не окажется старее своей версии.
+        """
+        self.vacancy_fragments.sync(version)
+        return self.vacancy_fragments.encode_list(vacancies)
+
+    def encode_companies(self, companies: List[Company], version: int) -> bytes:
+        """JSON-массив компаний из кэшированных фрагментов (см. encode_vacancies)"""
+        self.company_fragments.sync(version)
+        return self.company_fragments.encode_list(companies)
+
+
+def _read_ndjson(path: str, model):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield model.model_validate_json(line)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Массовая загрузка каталога в SQLite из NDJSON")
+    parser.add_argument("--db", default="vacancies.db", help="Путь к файлу базы")
+    parser.add_argument("--companies", help="NDJSON-файл с компаниями")
+    parser.add_argument("--vacancies", required=True, help="NDJSON-файл с вакансиями")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    storage = SQLiteDatabase(args.db, seed=False)
+    companies = _read_ndjson(args.companies, Company) if args.companies else ()
+    count = storage.bulk_load(_read_ndjson(args.vacancies, Vacancy), companies, batch_size=args.batch_size)
+    print(f"Загружено вакансий: {count}")
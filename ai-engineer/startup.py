@@ -0,0 +1,101 @@
+"""
+Прогрев приложения после старта.
+Тяжелые импорты и индексы каталога строятся в фоне, пока сервер уже принимает
+запросы; готовность отдельно от liveness-проверки показывает /api/ready.
+"""
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class Warmup:
+    """
+    Последовательный прогрев: каждый шаг выполняется в отдельном потоке,
+    чтобы не блокировать цикл событий. Упавший шаг повторяется до retries раз
+    с растущей паузой; ошибка шага не останавливает остальные, но приложение
+    с упавшим шагом не считается готовым.
+    """
+
+    def __init__(self, steps: List[Tuple[str, Callable[[], Any]]], retries: int = 2, retry_delay: float = 1.0):
+        self._steps = steps
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.status: Dict[str, str] = {name: "pending" for name, _ in steps}
+        self.seconds: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        """Все шаги завершены успешно"""
+        return self.finished_at is not None and not self.errors
+
+    async def run(self) -> None:
+        self.started_at = time.perf_counter()
+        for name, step in self._steps:
+            self.status[name] = "running"
+            start = time.perf_counter()
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+                try:
+                    await asyncio.to_thread(step)
+                except Exception as e:
+                    self.errors[name] = str(e)
+                else:
+                    self.errors.pop(name, None)
+                    break
+            self.status[name] = "failed" if name in self.errors else "done"
+            self.seconds[name] = round(time.perf_counter() - start, 4)
+        self.finished_at = time.perf_counter()
+
+    def report(self) -> Dict[str, Any]:
+        """Состояние прогрева для эндпоинта готовности"""
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.perf_counter()) - self.started_at, 4)
+        return {
+            "status": "ready" if self.ready else "failed" if self.finished_at is not None else "warming_up",
+            "elapsed_seconds": elapsed,
+            "steps": {
+                name: {"status": status, "seconds": self.seconds.get(name), "error": self.errors.get(name)}
+                for name, status in self.status.items()
+            },
+        }
+
+
+def catalog_warmup_steps(db, chat_service=None) -> List[Tuple[str, Callable[[], Any]]]:
+    """
+    Шаги прогрева: клиент OpenAI (импорт openai), снимок каталога и индексы чата
+    (BM25, рекомендации, поиск навыков). Для хранилищ в памяти еще индексы фасетов
+    и JSON-фрагменты всех вакансий и компаний. Хранилище SQL (db.facets_in_sql)
+    фильтрует и считает фасеты в базе, а фрагменты кэширует по мере запросов,
+    поэтому прогрев не загружает в память весь каталог ради них.
+    """
+    def snapshot():
+        return db.get_catalog_snapshot()
+
+    def vacancy_fragments():
+        version, _ = db.get_catalog_state()
+        db.encode_vacancies(db.get_all_vacancies(), version)
+
+    def company_fragments():
+        version, _ = db.get_catalog_state()
+        db.encode_companies(db.get_all_companies(), version)
+
+    steps = [
+        ("catalog_snapshot", snapshot),
+        ("search_index", lambda: snapshot().search_index),
+        ("recommender", lambda: snapshot().recommender),
+        ("skill_matcher", lambda: snapshot().skill_matcher),
+    ]
+    if not db.facets_in_sql:
+        steps += [
+            ("facet_index", lambda: snapshot().facet_index),
+            ("vacancy_fragments", vacancy_fragments),
+            ("company_fragments", company_fragments),
+        ]
+    if chat_service is not None:
+        steps.insert(0, ("openai_client", lambda: chat_service.client))
+    return steps
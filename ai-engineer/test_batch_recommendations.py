@@ -0,0 +1,80 @@
+"""
+Тесты пакетных рекомендаций POST /api/recommendations/batch (поток NDJSON)
+против фейкового сервера OpenAI
+"""
+import asyncio
+import json
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def computed(client, monkeypatch):
+    """Навыки профилей, для которых рекомендации действительно вычислялись"""
+    calls = []
+    compute = main._compute_recommendations
+
+    async def recording(engine, user_skills, user_experience, vacancies_data):
+        calls.append(tuple(user_skills))
+        if "Slow" in user_skills:
+            await asyncio.sleep(0.3)
+        if "Broken" in user_skills:
+            raise RuntimeError("сбой ранжирования")
+        return await compute(engine, user_skills, user_experience, vacancies_data)
+
+    monkeypatch.setattr(main, "_compute_recommendations", recording)
+    return calls
+
+
+def _lines(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_same_profiles_are_computed_once(client, computed):
+    profiles = [
+        {"user_skills": ["Python", "Django"], "user_experience": "middle", "profile_id": "a"},
+        {"user_skills": [" django", "PYTHON"], "user_experience": "Middle ", "profile_id": "b"},
+        {"user_skills": ["React"], "profile_id": "c"},
+        {"user_skills": ["Python", "Django"], "user_experience": "middle", "profile_id": "d"},
+    ]
+    lines = _lines(client.post("/api/recommendations/batch", json={"profiles": profiles}))
+    assert len(computed) == 2
+    assert sorted(line["index"] for line in lines) == [0, 1, 2, 3]
+    by_index = {line["index"]: line for line in lines}
+    assert [by_index[i]["profile_id"] for i in range(4)] == ["a", "b", "c", "d"]
+    assert by_index[0]["analysis"] == by_index[1]["analysis"] == by_index[3]["analysis"]
+    assert by_index[0]["analysis"]["engine"] == "llm"
+    assert [v["id"] for v in by_index[0]["recommended_vacancies"]] == by_index[0]["analysis"]["recommended_vacancy_ids"]
+
+
+def test_lines_are_streamed_in_completion_order(client, computed):
+    profiles = [
+        {"user_skills": ["Slow"], "profile_id": "slow"},
+        {"user_skills": ["Python"], "profile_id": "fast"},
+    ]
+    lines = _lines(client.post("/api/recommendations/batch", json={"profiles": profiles, "engine": "local"}))
+    assert [(line["index"], line["profile_id"]) for line in lines] == [(1, "fast"), (0, "slow")]
+
+
+def test_failed_profile_gets_error_line(client, computed, fake):
+    profiles = [
+        {"user_skills": ["Broken"], "profile_id": "x"},
+        {"user_skills": ["Python"], "profile_id": "y"},
+        {"user_skills": ["Broken"], "profile_id": "z"},
+    ]
+    lines = sorted(_lines(client.post("/api/recommendations/batch", json={"profiles": profiles})), key=lambda l: l["index"])
+    assert lines[0] == {"index": 0, "profile_id": "x", "error": "Не удалось получить рекомендации"}
+    assert lines[2] == {"index": 2, "profile_id": "z", "error": "Не удалось получить рекомендации"}
+    assert lines[1]["analysis"]["engine"] == "llm"
+
+    # Ошибка модели - локальные рекомендации с fallback, а не error
+    fake.failure_rate = 1.0
+    fake.failure_status = 400
+    lines = _lines(client.post("/api/recommendations/batch", json={"profiles": [{"user_skills": ["Go"]}]}))
+    assert lines[0]["analysis"]["fallback"] is True
+    assert lines[0]["analysis"]["engine"] == "local"
+    assert "error" not in lines[0]
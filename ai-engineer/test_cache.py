@@ -0,0 +1,140 @@
+"""
+Тесты кэшей в памяти процесса
+"""
+import asyncio
+
+import pytest
+
+import cache
+from cache import AsyncResultCache, LRUCache, TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Управляемые часы для проверки устаревания записей"""
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+    assert "b" not in lru
+    assert lru.get("a") == 1 and lru.get("c") == 3
+    assert lru.get("b", "нет") == "нет"
+    assert lru.stats() == {"size": 2, "maxsize": 2, "hits": 3, "misses": 1}
+
+
+def test_lru_get_or_build_builds_once():
+    lru = LRUCache(maxsize=4)
+    built = []
+    for _ in range(3):
+        assert lru.get_or_build("key", lambda: built.append(1) or "value") == "value"
+    assert built == [1]
+
+
+def test_lru_caches_falsy_values():
+    lru = LRUCache()
+    lru.set("none", None)
+    assert lru.get_or_build("none", lambda: pytest.fail("значение уже в кэше")) is None
+
+
+def test_ttl_entries_expire(clock):
+    ttl = TTLCache(maxsize=4, ttl=10)
+    ttl.set("a", 1)
+    clock[0] += 9.9
+    assert ttl.get("a") == 1
+    clock[0] += 0.1
+    assert ttl.get("a") is None
+    assert len(ttl) == 0
+    assert ttl.stats()["ttl"] == 10
+
+
+def test_ttl_respects_maxsize(clock):
+    ttl = TTLCache(maxsize=1, ttl=10)
+    ttl.set("a", 1)
+    ttl.set("b", 2)
+    assert ttl.get("a") is None
+    assert ttl.get("b") == 2
+
+
+def test_concurrent_requests_are_coalesced():
+    results = AsyncResultCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "ответ"
+
+    async def run():
+        values = await asyncio.gather(*(results.get_or_compute("key", compute) for _ in range(5)))
+        # Повторный запрос после вычисления берется из кэша
+        values.append(await results.get_or_compute("key", compute))
+        return values
+
+    assert asyncio.run(run()) == ["ответ"] * 6
+    assert calls == [1]
+    assert results.coalesced == 4
+    assert results.stats()["in_flight"] == 0
+
+
+def test_rejected_results_are_shared_but_not_cached():
+    results = AsyncResultCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return None
+
+    async def run():
+        first = await asyncio.gather(*(results.get_or_compute("key", compute, lambda v: v is not None) for _ in range(3)))
+        second = await results.get_or_compute("key", compute, lambda v: v is not None)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == [None, None, None] and second is None
+    assert calls == [1, 1]
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    results = AsyncResultCache()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("сбой")
+
+    async def run():
+        outcomes = await asyncio.gather(*(results.get_or_compute("key", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+        return await results.get_or_compute("key", lambda: asyncio.sleep(0, result="ok"))
+
+    assert asyncio.run(run()) == "ok"
+    assert calls == [1]
+
+
+def test_cancelled_waiter_does_not_abort_computation():
+    results = AsyncResultCache()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "ответ"
+
+    async def run():
+        first = asyncio.ensure_future(results.get_or_compute("key", compute))
+        second = asyncio.ensure_future(results.get_or_compute("key", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "ответ"
+    assert results.coalesced == 1
@@ -0,0 +1,58 @@
+"""
+Тесты потокового чата POST /api/chat/stream (server-sent events)
+против фейкового сервера OpenAI
+"""
+import json
+from typing import List, Tuple
+
+import fake_openai
+
+
+def _events(response) -> List[Tuple[str, dict]]:
+    """События SSE ответа: (event, data)"""
+    events = []
+    for block in response.text.split("\n\n"):
+        if not block.strip():
+            continue
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_tokens_then_single_done_event(client):
+    response = client.post("/api/chat/stream", json={"message": "Какие есть вакансии?", "user_skills": ["Python"]})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response)
+    kinds = [kind for kind, _ in events]
+    assert kinds == ["token"] * (len(events) - 1) + ["done"]
+    assert len(events) > 2
+
+    # Фрагменты идут в порядке генерации, итог совпадает с их склейкой
+    text = "".join(data["content"] for _, data in events[:-1])
+    done = events[-1][1]
+    assert text.strip() == fake_openai.CHAT_REPLY
+    assert done["response"] == text
+    assert done["degraded"] is False
+    assert done["session_id"]
+    assert "Docker" in done["skill_recommendations"]
+    assert "Python" not in done["skill_recommendations"]
+
+
+def test_session_continues_after_stream(client):
+    first = _events(client.post("/api/chat/stream", json={"message": "Привет"}))[-1][1]
+    second = _events(client.post("/api/chat/stream", json={"message": "А еще?", "session_id": first["session_id"]}))
+    kind, done = second[-1]
+    assert kind == "done"
+    assert done["session_id"] == first["session_id"]
+
+
+def test_model_error_streams_degraded_answer(client, fake):
+    fake.failure_rate = 1.0
+    fake.failure_status = 400
+    events = _events(client.post("/api/chat/stream", json={"message": "Python вакансии", "user_skills": ["Python"]}))
+    assert [kind for kind, _ in events] == ["token", "done"]
+    done = events[-1][1]
+    assert done["degraded"] is True
+    assert done["response"] == events[0][1]["content"]
+    assert "Injected failure" not in done["response"]
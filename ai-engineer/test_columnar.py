@@ -0,0 +1,175 @@
+"""
+Тесты колоночного хранилища каталога: совпадение с хранилищем в памяти,
+удаление строк (tombstones), переиндексация, компактификация и загрузка из NDJSON
+"""
+import json
+
+from catalog import vacancy_to_chat_item
+from columnar import ColumnarDatabase
+from database import Database
+from models import Company, Vacancy
+
+
+def _dump(vacancies):
+    return [v.model_dump(mode="json") for v in vacancies]
+
+
+def _vacancy(vacancy_id: int, **fields) -> Vacancy:
+    data = {"id": vacancy_id, "title": f"Вакансия {vacancy_id}", "description": "", "company_id": 1}
+    data.update(fields)
+    return Vacancy(**data)
+
+
+def test_seed_catalog_matches_memory_database():
+    memory, columnar = Database(), ColumnarDatabase()
+    assert _dump(columnar.get_all_vacancies()) == _dump(memory.get_all_vacancies())
+    assert _dump(columnar.get_all_companies()) == _dump(memory.get_all_companies())
+    assert [dict(item) for item in columnar.get_catalog_snapshot()] == [dict(item) for item in memory.get_catalog_snapshot()]
+    assert columnar.get_vacancies_data_for_chat() == memory.get_vacancies_data_for_chat()
+
+
+def test_get_by_ids_keeps_order_and_skips_missing():
+    db = ColumnarDatabase()
+    assert [v.id for v in db.get_vacancies_by_ids([3, 99, 1])] == [3, 1]
+    assert db.get_vacancy_by_id(99) is None
+
+
+def test_update_and_remove():
+    db = ColumnarDatabase()
+    version = db.version
+    updated = db.get_vacancy_by_id(2).model_copy(update={"title": "Senior Frontend", "salary_min": None})
+    db.add_vacancy(updated)
+    assert db.get_vacancy_by_id(2).title == "Senior Frontend"
+    assert db.get_vacancy_by_id(2).salary_min is None
+    assert [v.id for v in db.get_all_vacancies()] == [1, 2, 3, 4, 5]
+
+    assert db.remove_vacancy(2).title == "Senior Frontend"
+    assert db.remove_vacancy(2) is None
+    assert db.get_vacancy_by_id(2) is None
+    assert [v.id for v in db.get_all_vacancies()] == [1, 3, 4, 5]
+    assert db.version == version + 2
+    # Удаленная строка остается в массивах до перестройки
+    assert db.memory_usage()["vacancies"] == 4
+    assert db.memory_usage()["rows"] == 6
+
+
+def test_removed_after_reindex_leaves_snapshot():
+    db = ColumnarDatabase()
+    db.add_vacancy(_vacancy(10, required_skills=["Go"]))
+    assert db.get_catalog_snapshot().get(10) is not None
+    db.remove_vacancy(10)
+    snapshot = db.get_catalog_snapshot()
+    assert snapshot.get(10) is None
+    assert [item["id"] for item in snapshot] == [1, 2, 3, 4, 5]
+    assert [v.id for v in db.get_all_vacancies()] == [1, 2, 3, 4, 5]
+
+
+def test_snapshot_get_finds_items_by_id():
+    db = ColumnarDatabase()
+    for vacancy_id in (50, 7, 30):
+        db.add_vacancy(_vacancy(vacancy_id, location="Москва"))
+    snapshot = db.get_catalog_snapshot()
+    assert [item["id"] for item in snapshot] == [1, 2, 3, 4, 5, 7, 30, 50]
+    assert snapshot.get(30)["title"] == "Вакансия 30"
+    assert snapshot.get(6) is None
+    assert dict(snapshot.get(7)) == dict(vacancy_to_chat_item(db.get_vacancy_by_id(7)))
+
+
+def test_company_update_reaches_vacancies():
+    db = ColumnarDatabase()
+    before = db.encode_vacancies(db.get_all_vacancies(), db.version)
+    db.add_company(Company(id=1, name="Новое имя"))
+    after = json.loads(db.encode_vacancies(db.get_all_vacancies(), db.version))
+    assert before != after
+    assert {v["company"]["name"] for v in after if v["company_id"] == 1} == {"Новое имя"}
+    assert db.get_catalog_snapshot().get(1)["company_name"] == "Новое имя"
+
+
+def _apply(db, writes):
+    for vacancy in writes:
+        if isinstance(vacancy, int):
+            db.remove_vacancy(vacancy)
+        else:
+            db.add_vacancy(vacancy)
+
+
+WRITES = [
+    _vacancy(10, required_skills=["Go", "Docker"], location="Казань", salary_min=100),
+    _vacancy(11, required_skills=["Rust"], preferred_skills=["Go"], description="Системное программирование"),
+    _vacancy(2, title="Senior Frontend", required_skills=["React", "TypeScript"]),
+    3,
+    _vacancy(10, required_skills=["Go"], location="Москва"),
+    4,
+    11,
+]
+
+
+def test_compaction_keeps_catalog_and_old_snapshots():
+    memory, db = Database(), ColumnarDatabase()
+    db.compact_min_dead_rows = 6
+    old = db.get_catalog_snapshot()
+    old_items = [dict(item) for item in old]
+    old_vacancies = db.get_all_vacancies()
+    _apply(memory, WRITES)
+    _apply(db, WRITES)
+
+    # 5 удаленных строк из 9 - меньше compact_min_dead_rows; шестое удаление запускает компактификацию
+    assert db.memory_usage()["rows"] == 9
+    memory.remove_vacancy(5)
+    db.remove_vacancy(5)
+    assert db.memory_usage()["rows"] == db.memory_usage()["vacancies"] == 3
+    assert _dump(db.get_all_vacancies()) == _dump(memory.get_all_vacancies())
+    assert [v.id for v in db.get_vacancies_by_skills(["go"])] == [10]
+    assert db.facet_search(locations=["москва"]) == memory.facet_search(locations=["москва"])
+    assert [dict(item) for item in db.get_catalog_snapshot()] == [dict(item) for item in memory.get_catalog_snapshot()]
+
+    # Снимок до компактификации читает прежние массивы
+    assert [dict(item) for item in old] == old_items
+    assert old.get(3)["id"] == 3
+    assert old.facet_search(skills=["python"], facets=False)[0] == Database().facet_search(skills=["python"], facets=False)[0]
+    assert old.recommender.recommend(["Python"], None) == Database().get_catalog_snapshot().recommender.recommend(["Python"], None)
+    assert _dump(db.get_vacancies_by_ids([v.id for v in old_vacancies])) == _dump(memory.get_vacancies_by_ids([1, 2, 3, 4, 5]))
+
+    # Запись после компактификации
+    vacancy = _vacancy(12, required_skills=["Kotlin"], preferred_skills=["Go"])
+    db.add_vacancy(vacancy)
+    memory.add_vacancy(vacancy)
+    assert _dump(db.get_all_vacancies()) == _dump(memory.get_all_vacancies())
+    assert [v.id for v in db.get_vacancies_by_skills(["go"])] == [10, 12]
+    assert db.get_catalog_snapshot().get(12)["preferred_skills"] == ("Go",)
+
+
+def test_compaction_waits_for_min_dead_rows():
+    db = ColumnarDatabase()
+    for vacancy_id in (1, 2, 3, 4, 5):
+        db.remove_vacancy(vacancy_id)
+    # По умолчанию компактификация ждет COMPACT_MIN_DEAD_ROWS удаленных строк
+    assert db.memory_usage()["rows"] == 5
+    db.compact()
+    assert db.memory_usage()["rows"] == 0
+    assert db.get_all_vacancies() == []
+    db.add_vacancy(_vacancy(1, required_skills=["Go"]))
+    assert [v.id for v in db.get_vacancies_by_skills(["go"])] == [1]
+
+
+def test_bulk_load_replaces_duplicates_and_bumps_version_once():
+    db = ColumnarDatabase(seed=False)
+    loaded = db.bulk_load((_vacancy(i) for i in (3, 1, 2, 1)), [Company(id=1, name="Компания")])
+    assert loaded == 4
+    assert db.version == 1
+    assert [v.id for v in db.get_all_vacancies()] == [1, 2, 3]
+    assert db.get_vacancy_by_id(1).company.name == "Компания"
+
+
+def test_from_ndjson(tmp_path):
+    memory = Database()
+    vacancies_path = tmp_path / "vacancies.ndjson"
+    companies_path = tmp_path / "companies.ndjson"
+    vacancies_path.write_text(
+        "\n".join(v.model_dump_json(exclude={"company"}) for v in memory.get_all_vacancies()) + "\n\n",
+        encoding="utf-8"
+    )
+    companies_path.write_text("\n".join(c.model_dump_json() for c in memory.get_all_companies()), encoding="utf-8")
+
+    db = ColumnarDatabase.from_ndjson(str(vacancies_path), str(companies_path))
+    assert _dump(db.get_all_vacancies()) == _dump(memory.get_all_vacancies())
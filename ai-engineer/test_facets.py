@@ -0,0 +1,146 @@
+"""
+Тесты фасетного поиска: фильтры, дизъюнктивные счетчики фасетов,
+страницы результатов и совпадение трех хранилищ каталога
+"""
+import itertools
+
+import numpy as np
+import pytest
+
+from database import Database
+from facets import FacetIndex, normalize_location
+from models import Vacancy
+
+
+ITEMS = [
+    {"id": 1, "location": "Москва", "salary_min": 100, "salary_max": 200, "job_type": "full_time",
+     "experience_level": "middle", "required_skills": ("Python",), "preferred_skills": ("SQL",)},
+    {"id": 2, "location": " москва ", "salary_min": None, "salary_max": 90, "job_type": "contract",
+     "experience_level": "junior", "required_skills": ("SQL",), "preferred_skills": ()},
+    {"id": 3, "location": "Казань", "salary_min": 300, "salary_max": None, "job_type": "full_time",
+     "experience_level": "senior", "required_skills": ("Python", "Go"), "preferred_skills": ()},
+    {"id": 4, "location": None, "salary_min": None, "salary_max": None, "job_type": None,
+     "experience_level": None, "required_skills": (), "preferred_skills": ("Python",)},
+]
+
+EXTRA = [
+    Vacancy(id=6, title="Go Developer", description="Сервисы на Go", company_id=2, location="москва",
+            salary_min=None, salary_max=150000, job_type="contract", experience_level="senior",
+            required_skills=["Go", "PostgreSQL"], preferred_skills=["python"]),
+    Vacancy(id=7, title="Стажер-аналитик", description="SQL и отчеты", company_id=3,
+            required_skills=["SQL"], preferred_skills=[]),
+]
+
+
+def _count(facet, value):
+    return next((entry["count"] for entry in facet if entry["value"] == value), 0)
+
+
+def test_normalize_location():
+    assert normalize_location("  Санкт-Петербург ") == "санкт-петербург"
+
+
+def test_filters_are_or_within_field_and_and_across_fields():
+    index = FacetIndex.from_items(ITEMS)
+    assert index.search(experience_levels=["middle", "senior"], facets=False)[:2] == ([1, 3], 2)
+    assert index.search(locations=["МОСКВА"], facets=False)[0] == [1, 2]
+    assert index.search(locations=["москва", "Казань"], job_types=["full_time"], facets=False)[0] == [1, 3]
+    assert index.search(locations=["Тверь"], facets=False)[:2] == ([], 0)
+
+
+def test_salary_range_overlaps_fork():
+    index = FacetIndex.from_items(ITEMS)
+    assert index.search(salary_from=150, facets=False)[0] == [1, 3]
+    assert index.search(salary_to=95, facets=False)[0] == [2]
+    assert index.search(salary_from=95, salary_to=250, facets=False)[0] == [1]
+
+
+def test_disjunctive_facet_counts():
+    index = FacetIndex.from_items(ITEMS)
+    _, total, facets = index.search(experience_levels=["middle"], locations=["Москва"])
+    assert total == 1
+    # Счетчик уровня учитывает остальные фильтры, но не фильтр по уровню
+    assert _count(facets["experience_level"], "junior") == 1
+    assert _count(facets["experience_level"], "senior") == 0
+    # Счетчик города - наоборот
+    assert _count(facets["location"], "Москва") == 1
+    assert _count(facets["location"], "Казань") == 0
+    # Навыки и зарплата считаются по найденным вакансиям
+    assert facets["skills"] == [{"value": "Python", "count": 1}, {"value": "SQL", "count": 1}]
+    assert facets["salary"] == {"min": 100.0, "max": 200.0}
+
+
+def test_whole_catalog_facets():
+    _, total, facets = FacetIndex.from_items(ITEMS).search()
+    assert total == 4
+    assert facets["location"] == [{"value": "Москва", "count": 2}, {"value": "Казань", "count": 1}]
+    assert facets["skills"][0] == {"value": "Python", "count": 3}
+    # У вилки только с верхней границей она же нижняя
+    assert facets["salary"] == {"min": 90.0, "max": 300.0}
+    assert FacetIndex.from_items(ITEMS).search(facet_size=1)[2]["skills"] == [{"value": "Python", "count": 3}]
+
+
+def test_relevance_filters_and_orders():
+    index = FacetIndex.from_items(ITEMS)
+    relevance = np.array([0.5, 0.0, 2.0, 1.0], dtype=np.float32)
+    assert index.search(relevance=relevance, facets=False)[0] == [3, 4, 1]
+    assert index.search(relevance=relevance, job_types=["full_time"], facets=False)[0] == [3, 1]
+
+
+def test_empty_index():
+    ids, total, facets = FacetIndex.from_items([]).search(skills=["Python"], locations=["Москва"])
+    assert (ids, total) == ([], 0)
+    assert facets["salary"] == {"min": None, "max": None}
+
+
+@pytest.fixture
+def db(db):
+    """Хранилище из conftest.py с вакансиями EXTRA"""
+    for vacancy in EXTRA:
+        db.add_vacancy(vacancy)
+    return db
+
+
+QUERIES = [
+    {},
+    {"skills": ["python", "Go"]},
+    {"skills": ["Python", "PostgreSQL"], "skills_match": "all", "skills_scope": "required"},
+    {"experience_levels": ["senior", "junior"], "locations": ["Москва"]},
+    {"job_types": ["contract"], "salary_from": 100000},
+    {"salary_to": 150000, "facet_size": 3},
+    {"query": "Python developer", "locations": ["москва"]},
+    {"query": "Go", "skills": ["PostgreSQL"]},
+]
+
+
+@pytest.mark.parametrize("filters", QUERIES)
+def test_backends_return_same_results(db, filters):
+    ids, total, facets = db.facet_search(**filters)
+    expected_ids, expected_total, expected_facets = _reference().facet_search(**filters)
+    assert (total, facets) == (expected_total, expected_facets)
+    if "query" in filters:
+        # SQLite ранжирует текст через FTS5, поэтому порядок по релевантности может отличаться
+        assert sorted(ids) == sorted(expected_ids)
+    else:
+        assert ids == expected_ids
+
+
+def test_facet_ties_are_ordered_by_key(db):
+    _, _, facets = db.facet_search(skills=["Go"])
+    assert [entry["value"] for entry in facets["skills"]] == ["Go", "PostgreSQL", "Python"]
+    _, _, facets = db.facet_search(experience_levels=["senior"])
+    assert facets["location"] == [{"value": "Москва", "count": 1}, {"value": "Санкт-Петербург", "count": 1}]
+
+
+def test_pages_split_the_full_result(db):
+    ids, total, _ = db.facet_search(skills=["Python", "SQL"], facets=False)
+    pages = [db.facet_search(skills=["Python", "SQL"], offset=offset, limit=2, facets=False) for offset in range(0, total, 2)]
+    assert all(page_total == total for _, page_total, _ in pages)
+    assert list(itertools.chain.from_iterable(page for page, _, _ in pages)) == ids
+
+
+def _reference() -> Database:
+    database = Database()
+    for vacancy in EXTRA:
+        database.add_vacancy(vacancy)
+    return database
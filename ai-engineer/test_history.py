@@ -0,0 +1,76 @@
+"""
+Тесты укладывания истории разговора в бюджет токенов
+"""
+from history import MESSAGE_OVERHEAD_TOKENS, SUMMARY_HEADER, HistoryCompactor, count_tokens
+from models import ChatMessage
+
+
+def _conversation(turns: int):
+    history = []
+    for i in range(turns):
+        history.append(ChatMessage(role="user", content=f"Вопрос номер {i} про вакансии Python. Подробности."))
+        history.append(ChatMessage(role="assistant", content=f"Ответ номер {i}: посмотрите вакансию №{i}. Еще текст."))
+    return history
+
+
+def _tokens(compactor: HistoryCompactor, summary, recent) -> int:
+    total = sum(compactor.message_tokens(m) for m in recent)
+    if summary:
+        total += count_tokens(summary) + MESSAGE_OVERHEAD_TOKENS
+    return total
+
+
+def test_short_history_is_kept_whole():
+    compactor = HistoryCompactor(budget=2000, summary_budget=300)
+    history = _conversation(2)
+    summary, recent = compactor.compact(history)
+    assert summary is None
+    assert recent == history
+
+
+def test_long_history_fits_budget_with_summary():
+    compactor = HistoryCompactor(budget=200, summary_budget=80)
+    history = _conversation(20)
+    summary, recent = compactor.compact(history)
+    assert summary.startswith(SUMMARY_HEADER)
+    assert recent == history[-len(recent):]
+    assert count_tokens(summary) + MESSAGE_OVERHEAD_TOKENS <= compactor.summary_budget
+    assert _tokens(compactor, summary, recent) <= compactor.budget
+    # Самые старые сообщения не поместились в резюме и только посчитаны
+    assert "(ранее: еще " in summary
+    assert "Ответ номер 0:" not in summary
+
+
+def test_summary_keeps_newest_evicted_messages():
+    compactor = HistoryCompactor(budget=200, summary_budget=80)
+    history = _conversation(20)
+    summary, recent = compactor.compact(history)
+    last_evicted = history[len(history) - len(recent) - 1]
+    assert last_evicted.content.split(".")[0] in summary
+
+
+def test_summary_is_rolled_forward_not_rebuilt(monkeypatch):
+    compactor = HistoryCompactor(budget=200, summary_budget=80)
+    extended = []
+    extend = compactor._extend_summary
+    monkeypatch.setattr(compactor, "_extend_summary", lambda state, evicted: extended.append(len(evicted)) or extend(state, evicted))
+
+    history = _conversation(10)
+    compactor.compact(history)
+    first = extended[-1]
+    for i in range(10, 15):
+        history = history + _conversation(i + 1)[-2:]
+        compactor.compact(history)
+    # Первое резюме сжимает все вытесненные сообщения, следующие - только новые
+    assert first > 2
+    assert all(count <= 2 for count in extended[1:])
+
+
+def test_rolling_summary_matches_summary_built_at_once():
+    rolling = HistoryCompactor(budget=200, summary_budget=80)
+    history = _conversation(10)
+    for i in range(10, 15):
+        history = history + _conversation(i + 1)[-2:]
+        rolled, _ = rolling.compact(history)
+    fresh, _ = HistoryCompactor(budget=200, summary_budget=80).compact(history)
+    assert rolled == fresh
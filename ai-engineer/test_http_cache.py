@@ -0,0 +1,100 @@
+"""
+Тесты условных GET-запросов: ETag каталога, проверка If-None-Match / If-Modified-Since
+и ответы 304 эндпоинтов каталога
+"""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from starlette.requests import Request
+
+from http_cache import CatalogValidators, not_modified, validator_headers
+
+MODIFIED = datetime(2024, 5, 1, 12, 0, 0, 500000, tzinfo=timezone.utc)
+
+
+def _request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/vacancies",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_etag_depends_on_catalog_version_and_params():
+    validators = CatalogValidators()
+    etag = validators.etag("mem", "vacancies", 1, {"skills": "python", "limit": None})
+    assert etag == validators.etag("mem", "vacancies", 1, {"skills": "python"})
+    assert etag != validators.etag("mem", "vacancies", 2, {"skills": "python"})
+    assert etag != validators.etag("db", "vacancies", 1, {"skills": "python"})
+    assert etag != validators.etag("mem", "vacancies", 1, {"skills": "go"})
+
+
+def test_if_none_match():
+    etag = '"abc"'
+    assert not_modified(_request(if_none_match='"x", W/"abc"'), etag, MODIFIED).status_code == 304
+    assert not_modified(_request(if_none_match="*"), etag, MODIFIED).status_code == 304
+    assert not_modified(_request(if_none_match='"x"'), etag, MODIFIED) is None
+    # If-None-Match важнее If-Modified-Since
+    since = format_datetime(MODIFIED + timedelta(days=1), usegmt=True)
+    assert not_modified(_request(if_none_match='"x"', if_modified_since=since), etag, MODIFIED) is None
+
+
+def test_if_modified_since():
+    response = not_modified(_request(if_modified_since=format_datetime(MODIFIED.replace(microsecond=0), usegmt=True)), '"a"', MODIFIED)
+    assert response.status_code == 304
+    assert response.headers["etag"] == '"a"'
+    older = format_datetime(MODIFIED - timedelta(seconds=1), usegmt=True)
+    assert not_modified(_request(if_modified_since=older), '"a"', MODIFIED) is None
+    assert not_modified(_request(if_modified_since="вчера"), '"a"', MODIFIED) is None
+    assert not_modified(_request(), '"a"', MODIFIED) is None
+
+
+def test_validator_headers():
+    headers = validator_headers('"a"', MODIFIED)
+    assert headers == {"ETag": '"a"', "Last-Modified": "Wed, 01 May 2024 12:00:00 GMT", "Cache-Control": "no-cache"}
+
+
+def test_vacancies_revalidate_with_304(client):
+    first = client.get("/api/vacancies", params={"skills": "Python"})
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "no-cache"
+
+    cached = client.get("/api/vacancies", params={"skills": "Python"}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    since = client.get("/api/vacancies", params={"skills": "Python"}, headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert since.status_code == 304
+    # Другие параметры - другой ETag
+    assert client.get("/api/vacancies", params={"skills": "Go"}).headers["etag"] != etag
+
+
+def test_write_changes_etag(client):
+    import main
+
+    first = client.get("/api/vacancies")
+    search = client.get("/api/vacancies/search")
+    vacancy = main.db.get_vacancy_by_id(1).model_copy(update={"id": 100, "title": "Rust Developer"})
+    main.db.add_vacancy(vacancy)
+
+    response = client.get("/api/vacancies", headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+    assert 100 in [v["id"] for v in response.json()]
+    assert client.get("/api/vacancies/search", headers={"If-None-Match": search.headers["etag"]}).status_code == 200
+    # Новый ETag снова подтверждается
+    assert client.get("/api/vacancies", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+
+def test_company_write_changes_etag(client):
+    import main
+
+    etag = client.get("/api/companies").headers["etag"]
+    assert client.get("/api/companies", headers={"If-None-Match": etag}).status_code == 304
+    main.db.add_company(main.db.get_company_by_id(1).model_copy(update={"id": 100, "name": "Globex"}))
+    response = client.get("/api/companies", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert "Globex" in [c["name"] for c in response.json()]
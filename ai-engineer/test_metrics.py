@@ -0,0 +1,102 @@
+"""
+Тесты метрик: текстовый формат Prometheus и эндпоинт /metrics
+"""
+import re
+from typing import Dict, FrozenSet, Tuple
+
+import pytest
+
+from metrics import CONTENT_TYPE, Counter, Gauge, Histogram, Registry
+
+SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"(?:,|$)')
+
+
+def _parse(text: str) -> Tuple[Dict[str, Tuple[str, str]], Dict[Tuple[str, FrozenSet], float]]:
+    """Разбор выгрузки: {имя: (тип, описание)} и {(имя ряда, метки): значение}"""
+    meta: Dict[str, list] = {}
+    samples: Dict[Tuple[str, FrozenSet], float] = {}
+    assert text.endswith("\n")
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            name, doc = line[len("# HELP "):].split(" ", 1)
+            meta.setdefault(name, [None, None])[1] = doc
+        elif line.startswith("# TYPE "):
+            name, kind = line[len("# TYPE "):].split(" ")
+            meta.setdefault(name, [None, None])[0] = kind
+        else:
+            match = SAMPLE_RE.match(line)
+            assert match, f"Строка не в формате Prometheus: {line!r}"
+            name, labels, value = match.groups()
+            pairs = LABEL_RE.findall(labels or "")
+            assert ",".join(f'{k}="{v}"' for k, v in pairs) == (labels or "")
+            samples[(name, frozenset(pairs))] = float(value)
+    return {name: tuple(value) for name, value in meta.items()}, samples
+
+
+def test_render_counter_gauge_and_histogram():
+    registry = Registry()
+    requests = Counter("requests_total", "Запросы", ("path",), registry=registry)
+    in_flight = Gauge("in_flight", "В обработке", registry=registry)
+    latency = Histogram("latency_seconds", "Задержка", ("op",), buckets=(0.1, 1.0), registry=registry)
+    requests.inc(path='/a"b\\c\n')
+    requests.inc(2, path="/x")
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, op="chat")
+
+    meta, samples = _parse(registry.render())
+    assert meta == {
+        "requests_total": ("counter", "Запросы"),
+        "in_flight": ("gauge", "В обработке"),
+        "latency_seconds": ("histogram", "Задержка"),
+    }
+    assert samples[("requests_total", frozenset({("path", '/a\\"b\\\\c\\n')}))] == 1
+    assert samples[("requests_total", frozenset({("path", "/x")}))] == 2
+    assert samples[("in_flight", frozenset())] == 1
+    # Корзины накопленные, последняя - +Inf и равна числу наблюдений
+    buckets = [samples[("latency_seconds_bucket", frozenset({("op", "chat"), ("le", le)}))] for le in ("0.1", "1", "+Inf")]
+    assert buckets == [1, 3, 4]
+    assert samples[("latency_seconds_count", frozenset({("op", "chat")}))] == 4
+    assert samples[("latency_seconds_sum", frozenset({("op", "chat")}))] == pytest.approx(4.05)
+
+
+def test_labels_and_duplicate_names_are_checked():
+    registry = Registry()
+    counter = Counter("events_total", "События", ("kind",), registry=registry)
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+    with pytest.raises(ValueError):
+        Counter("events_total", "Еще раз", registry=registry)
+
+
+def test_metrics_endpoint(client):
+    client.get("/api/vacancies/1")
+    client.get("/api/vacancies/2")
+    client.get("/api/vacancies/999")
+    assert client.post("/api/chat", json={"message": "Привет"}).json()["degraded"] is False
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE
+    meta, samples = _parse(response.text)
+    assert meta["http_requests_total"][0] == "counter"
+    assert meta["http_request_duration_seconds"][0] == "histogram"
+    assert meta["chat_stage_duration_seconds"][0] == "histogram"
+    assert meta["openai_tokens_total"][0] == "counter"
+    assert all(kind and doc for kind, doc in meta.values())
+
+    # Эндпоинт - шаблон маршрута, а не путь с ID
+    route = "/api/vacancies/{vacancy_id}"
+    ok = samples[("http_requests_total", frozenset({("method", "GET"), ("endpoint", route), ("status", "200")}))]
+    missing = samples[("http_requests_total", frozenset({("method", "GET"), ("endpoint", route), ("status", "404")}))]
+    assert ok >= 2 and missing >= 1
+    assert not any(("endpoint", "/api/vacancies/1") in labels for _, labels in samples)
+    assert samples[("http_request_duration_seconds_count", frozenset({("method", "GET"), ("endpoint", route)}))] >= 3
+
+    stages = {dict(labels)["stage"] for name, labels in samples if name == "chat_stage_duration_seconds_count"}
+    assert {"catalog_snapshot", "prepare_messages", "openai", "extract_mentions"} <= stages
+    assert samples[("openai_tokens_total", frozenset({("operation", "chat"), ("type", "prompt")}))] > 0
+    assert samples[("openai_request_duration_seconds_count", frozenset({("operation", "chat")}))] >= 1
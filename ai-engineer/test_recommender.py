@@ -0,0 +1,79 @@
+"""
+Тесты локального подбора вакансий по навыкам и уровню опыта
+"""
+import numpy as np
+import pytest
+
+from columnar import ColumnarDatabase
+from database import Database
+from recommender import LocalRecommender
+
+
+ITEMS = [
+    {"id": 1, "experience_level": "middle", "required_skills": ("Python", "Django"), "preferred_skills": ("Docker",)},
+    {"id": 2, "experience_level": "junior", "required_skills": ("JavaScript", "React"), "preferred_skills": ("Python",)},
+    {"id": 3, "experience_level": "senior", "required_skills": ("Python",), "preferred_skills": ("Kubernetes", "Docker")},
+    {"id": 4, "experience_level": None, "required_skills": ("Go",), "preferred_skills": ()},
+]
+
+
+def test_required_skills_weigh_more_than_preferred():
+    recommender = LocalRecommender(ITEMS, level_weight=0)
+    scores = recommender.score(["python"])
+    # Python - 2 из 5 весов вакансии 1 и 1 из 5 вакансии 2
+    np.testing.assert_allclose(scores, [0.4, 0.2, 0.5, 0.0], rtol=1e-6)
+
+
+def test_vacancies_without_matching_skills_score_zero():
+    recommender = LocalRecommender(ITEMS)
+    scores = recommender.score(["Rust"], "senior")
+    assert not scores.any()
+
+
+def test_level_fit_without_skills():
+    recommender = LocalRecommender(ITEMS, level_weight=1)
+    np.testing.assert_allclose(recommender.score([], "middle"), [1.0, 0.5, 0.5, 0.5])
+    np.testing.assert_allclose(recommender.score([], "lead"), [0.0, 0.0, 0.5, 0.5])
+    # Неизвестный уровень не влияет на порядок
+    np.testing.assert_allclose(recommender.score([], "стажер"), [0.5] * 4)
+
+
+def test_skills_are_normalized_and_deduplicated():
+    items = [{"id": 1, "required_skills": ("Python", " python "), "preferred_skills": ("PYTHON",)}]
+    recommender = LocalRecommender(items, level_weight=0)
+    assert recommender.skill_names == ["Python"]
+    np.testing.assert_allclose(recommender.score(["pYtHoN"]), [1.0])
+
+
+def test_recommend_orders_vacancies_and_suggests_missing_skills():
+    recommender = LocalRecommender(ITEMS)
+    result = recommender.recommend(["Python"], "senior", top_n=2)
+    assert result["recommended_vacancy_ids"] == [3, 1]
+    # Навыки пользователя не рекомендуются; Docker нужен обеим вакансиям
+    assert result["skill_recommendations"][0] == "Docker"
+    assert "Python" not in result["skill_recommendations"]
+    assert set(result["skill_recommendations"]) == {"Docker", "Kubernetes", "Django"}
+
+
+def test_recommend_limits():
+    recommender = LocalRecommender(ITEMS)
+    result = recommender.recommend(["Python", "Go"], top_n=10, top_skills=1)
+    assert sorted(result["recommended_vacancy_ids"]) == [1, 2, 3, 4]
+    assert len(result["skill_recommendations"]) == 1
+
+
+def test_recommend_on_empty_catalog():
+    assert LocalRecommender([]).recommend(["Python"]) == {"recommended_vacancy_ids": [], "skill_recommendations": []}
+
+
+@pytest.mark.parametrize("skills,experience", [
+    (["Python"], "middle"),
+    (["react", "JavaScript"], "junior"),
+    (["SQL", "Machine Learning"], None),
+    ([], "senior"),
+])
+def test_columnar_matrix_matches_item_matrix(skills, experience):
+    expected = Database().get_catalog_snapshot().recommender
+    actual = ColumnarDatabase().get_catalog_snapshot().recommender
+    np.testing.assert_allclose(actual.score(skills, experience), expected.score(skills, experience), rtol=1e-6)
+    assert actual.recommend(skills, experience) == expected.recommend(skills, experience)
@@ -0,0 +1,208 @@
+"""
+Тесты защиты от медленного или недоступного OpenAI: дедлайн, повторы,
+автомат отключения и хеджирование. Запросы идут к локальному серверу
+benchmarks/fake_openai.py (фикстуры fake_url и fake в conftest.py).
+"""
+import asyncio
+import time
+
+import fake_openai
+import pytest
+from openai import BadRequestError, InternalServerError
+
+from chat_service import CHAT_ERROR_PREFIX, ChatBotService
+from models import ChatRequest
+from resilience import (
+    CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResilientCaller, RetryPolicy
+)
+
+
+@pytest.fixture
+def service(fake_url, monkeypatch):
+    monkeypatch.setenv("OPENAI_BASE_URL", fake_url)
+    monkeypatch.setenv("OPENAI_RETRY_BASE_DELAY", "0.01")
+    monkeypatch.setenv("OPENAI_RETRY_MAX_DELAY", "0.02")
+    return ChatBotService(api_key="test", timeout=0.5)
+
+
+def _caller(**kwargs) -> ResilientCaller:
+    kwargs.setdefault("retry", RetryPolicy(max_retries=2, base_delay=0.01, max_delay=0.02))
+    kwargs.setdefault("breaker", CircuitBreaker(name="test", failure_threshold=2, recovery_time=0.2))
+    return ResilientCaller(**kwargs)
+
+
+def _completion(service: ChatBotService, calls: list):
+    """Попытка запроса к фейковому серверу; calls - номера попыток"""
+    async def attempt(timeout: float):
+        calls.append(len(calls) + 1)
+        return await service.client.chat.completions.create(
+            model="fake", messages=[{"role": "user", "content": "Привет"}], timeout=timeout
+        )
+    return attempt
+
+
+def test_timeout_gives_degraded_chat_response(service, fake):
+    fake.latency = 2.0
+
+    async def run():
+        started = time.monotonic()
+        response = await service.get_chat_response(ChatRequest(message="Привет"), timeout=0.3)
+        return response, time.monotonic() - started
+
+    response, elapsed = asyncio.run(run())
+    assert response.degraded
+    assert elapsed < 1.0
+
+
+def test_client_error_gives_degraded_chat_response_without_error_text(service, fake):
+    fake.failure_rate = 1.0
+    fake.failure_status = 400
+    response = asyncio.run(service.get_chat_response(ChatRequest(message="Привет")))
+    assert response.degraded
+    assert "Error code" not in response.response
+
+    async def run():
+        return [event async for event in service.stream_chat_response(ChatRequest(message="Привет"))]
+
+    events = asyncio.run(run())
+    assert [kind for kind, _ in events] == ["token", "done"]
+    assert events[-1][1].degraded
+
+
+def test_structured_recommendations_raise_model_errors(service, fake):
+    fake.failure_rate = 1.0
+    fake.failure_status = 400
+    with pytest.raises(BadRequestError):
+        asyncio.run(service.get_structured_recommendations(["Python"], None, []))
+
+
+def test_retry_recovers_from_server_errors(service, fake):
+    fake.failure_rate = 1.0
+    calls = []
+    attempt = _completion(service, calls)
+
+    async def flaky(timeout: float):
+        if len(calls) == 2:
+            fake.failure_rate = 0.0
+        return await attempt(timeout)
+
+    caller = _caller()
+    response = asyncio.run(caller.call("chat", flaky))
+    assert response.choices[0].message.content == fake_openai.CHAT_REPLY
+    assert calls == [1, 2, 3]
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_errors_are_not_retried(service, fake):
+    fake.failure_rate = 1.0
+    fake.failure_status = 400
+    calls = []
+    caller = _caller()
+    with pytest.raises(BadRequestError):
+        asyncio.run(caller.call("chat", _completion(service, calls)))
+    assert calls == [1]
+    assert caller.breaker._failures == 0
+
+
+def test_breaker_counts_one_failure_per_call_then_opens_and_recovers(service, fake):
+    fake.failure_rate = 1.0
+    calls = []
+    caller = _caller()
+    attempt = _completion(service, calls)
+
+    async def run():
+        with pytest.raises(InternalServerError):
+            await caller.call("chat", attempt)
+        # Три попытки одного вызова - одна неудача
+        assert len(calls) == 3
+        assert caller.breaker.state == CircuitBreaker.CLOSED
+
+        with pytest.raises(InternalServerError):
+            await caller.call("chat", attempt)
+        assert caller.breaker.state == CircuitBreaker.OPEN
+
+        # Открытый автомат отклоняет вызов, не обращаясь к серверу
+        calls.clear()
+        with pytest.raises(CircuitOpenError):
+            await caller.call("chat", attempt)
+        assert calls == []
+
+        # После recovery_time неудачный пробный вызов снова открывает автомат
+        await asyncio.sleep(0.25)
+        assert caller.breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(InternalServerError):
+            await caller.call("chat", attempt)
+        assert caller.breaker.state == CircuitBreaker.OPEN
+
+        # Успешный пробный вызов закрывает автомат
+        await asyncio.sleep(0.25)
+        fake.failure_rate = 0.0
+        await caller.call("chat", attempt)
+        assert caller.breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(run())
+
+
+def test_hedged_request_wins_over_slow_one(service, fake):
+    fake.slow_rate = 1.0
+    fake.slow_latency = 3.0
+    calls = []
+    attempt = _completion(service, calls)
+
+    async def first_slow(timeout: float):
+        if calls:
+            fake.slow_rate = 0.0
+        return await attempt(timeout)
+
+    caller = _caller(timeout=5.0, hedge_quantile=0.95, hedge_min_delay=0.1, hedge_min_samples=1)
+    caller.latency.observe(0.05)
+
+    async def run():
+        started = time.monotonic()
+        response = await caller.call("chat", first_slow)
+        return response, time.monotonic() - started
+
+    response, elapsed = asyncio.run(run())
+    assert response.choices[0].message.content == fake_openai.CHAT_REPLY
+    assert calls == [1, 2]
+    assert elapsed < 2.0
+
+
+def test_stream_deadline_covers_reading_tokens(service, fake):
+    fake.chunk_delay = 0.1
+
+    async def run():
+        started = time.monotonic()
+        events = [event async for event in service.stream_chat_response(ChatRequest(message="Привет"), timeout=0.5)]
+        return events, time.monotonic() - started
+
+    events, elapsed = asyncio.run(run())
+    kinds = [kind for kind, _ in events]
+    assert "token" in kinds
+    assert kinds[-1] == "error"
+    # Текст исключения клиенту не отдается
+    assert events[-1][1] == CHAT_ERROR_PREFIX
+    assert elapsed < 1.5
+    # Обрыв посреди потока - одна неудача вызова
+    assert service.breaker._failures == 1
+
+
+def test_stream_completes_within_deadline(service, fake):
+    async def run():
+        return [event async for event in service.stream_chat_response(ChatRequest(message="Привет"))]
+
+    events = asyncio.run(run())
+    kind, response = events[-1]
+    assert kind == "done"
+    assert response.response.strip() == fake_openai.CHAT_REPLY
+    assert service.breaker._failures == 0
+
+
+def test_deadline_exceeded_when_retries_do_not_fit():
+    async def slow(timeout: float):
+        await asyncio.sleep(1)
+
+    caller = _caller(timeout=0.1, deadline=0.15)
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(caller.call("chat", slow, hedge=False))
+    assert caller.breaker._failures == 1
@@ -0,0 +1,88 @@
+"""
+Тесты локального поиска BM25 для отбора вакансий в промпт
+"""
+import numpy as np
+
+from catalog import CatalogSnapshot
+from chat_service import ChatBotService
+from database import Database
+from retrieval import BM25Index, tokenize
+
+
+ITEMS = [
+    {"id": 10, "title": "Python Developer", "description": "Backend на Django", "experience_level": "middle",
+     "required_skills": ("Python", "Django"), "preferred_skills": ()},
+    {"id": 20, "title": "Frontend Developer", "description": "Интерфейсы на React", "experience_level": "junior",
+     "required_skills": ("JavaScript", "React"), "preferred_skills": ("TypeScript",)},
+    {"id": 30, "title": "Data Engineer", "description": "Пайплайны данных, немного Python", "experience_level": "senior",
+     "required_skills": ("SQL", "Spark"), "preferred_skills": ("Python",)},
+    {"id": 40, "title": "C++ Developer", "description": "Высоконагруженные системы", "experience_level": "middle",
+     "required_skills": ("C++",), "preferred_skills": ("C#",)},
+]
+
+
+def test_tokenize_keeps_language_names():
+    assert tokenize("Ищу работу: C++, C# и Node.js!") == ["ищу", "работу", "c++", "c#", "и", "node", "js"]
+
+
+def test_title_and_required_skills_outweigh_description():
+    index = BM25Index(ITEMS)
+    scores = index.score("python")
+    assert scores[0] > scores[2] > 0
+    assert scores[1] == scores[3] == 0
+
+
+def test_top_k_order_and_limit():
+    index = BM25Index(ITEMS)
+    scores = index.score("python developer")
+    assert index.top_k("python developer", 4) == sorted(range(4), key=lambda p: -scores[p])
+    assert index.top_k("python", 1) == [0]
+    assert index.top_k("c++", 5) == [3]
+    assert index.top_k("python", 0) == []
+
+
+def test_top_k_skips_documents_without_matches():
+    index = BM25Index(ITEMS)
+    assert index.top_k("kotlin", 3) == []
+    assert sorted(index.top_k("react python", 10)) == [0, 1, 2]
+
+
+def test_equal_scores_keep_catalog_order():
+    items = [dict(ITEMS[0], id=i) for i in range(5)]
+    assert BM25Index(items).top_k("django", 3) == [0, 1, 2]
+
+
+def test_experience_level_boost():
+    index = BM25Index(ITEMS)
+    assert index.top_k("python", 2)[0] == 0
+    assert index.top_k("python", 2, experience_level="senior", level_boost=100)[0] == 2
+
+
+def test_score_is_vectorized_sum_of_query_terms():
+    index = BM25Index(ITEMS)
+    combined = index.score("react python")
+    np.testing.assert_allclose(combined, index.score("react") + index.score("python"), rtol=1e-6)
+    # Повтор слова в запросе не меняет оценку
+    np.testing.assert_allclose(index.score("python python"), index.score("python"))
+
+
+def test_empty_index():
+    index = BM25Index([])
+    assert index.score("python").shape == (0,)
+    assert index.top_k("python", 3) == []
+
+
+def test_snapshot_search_falls_back_to_catalog_head():
+    snapshot = CatalogSnapshot(1, tuple(ITEMS))
+    assert [item["id"] for item in snapshot.search("react", 2)] == [20]
+    assert [item["id"] for item in snapshot.search("kotlin", 2)] == [10, 20]
+
+
+def test_select_vacancies_uses_search_for_snapshots():
+    service = ChatBotService(api_key="test")
+    snapshot = Database().get_catalog_snapshot()
+    selected = service._select_vacancies(snapshot, "Вакансии Data Scientist", 1)
+    assert [item["title"] for item in selected] == ["Data Scientist"]
+    # Пустой запрос и обычный список - первые k вакансий
+    assert service._select_vacancies(snapshot, " ", 2) == snapshot[:2]
+    assert service._select_vacancies(list(ITEMS), "python", 2) == ITEMS[:2]
@@ -0,0 +1,46 @@
+"""
+Тесты кэша JSON-фрагментов моделей
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from models import Company
+from serialization import FragmentCache
+
+
+def _company(company_id: int, name: str = "Acme") -> Company:
+    return Company(id=company_id, name=name, description="", industry="IT", location="Москва")
+
+
+def test_fragments_are_encoded_once():
+    cache = FragmentCache()
+    companies = [_company(1), _company(2)]
+    body = cache.encode_list(companies)
+    assert json.loads(body) == [c.model_dump() for c in companies]
+    assert cache.encode_list(companies) == body
+    assert cache.stats() == {"size": 2, "hits": 2, "misses": 2}
+
+
+def test_invalidate_sync_and_unstored_fragments():
+    cache = FragmentCache()
+    cache.sync(1)
+    cache.fragment(_company(1))
+    cache.invalidate(1)
+    assert b"Globex" in cache.fragment(_company(1, "Globex"))
+    cache.sync(1)
+    assert len(cache) == 1
+    cache.sync(2)
+    assert len(cache) == 0
+    cache.fragment(_company(1), store=False)
+    assert len(cache) == 0
+
+
+def test_concurrent_fragments_keep_counters_consistent():
+    cache = FragmentCache()
+    companies = [_company(i % 10) for i in range(2000)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        fragments = list(pool.map(cache.fragment, companies))
+    assert len(cache) == 10
+    assert cache.hits + cache.misses == len(companies)
+    # Все потоки получили один и тот же сохраненный фрагмент
+    assert len({id(f) for f in fragments}) == 10
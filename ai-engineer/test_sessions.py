@@ -0,0 +1,92 @@
+"""
+Тесты серверных сессий чата
+"""
+import pytest
+
+from models import ChatRequest
+from sessions import SessionStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def test_unknown_session_id_gets_new_id():
+    store = SessionStore()
+    session = store.get_or_create("chosen-by-client")
+    assert session.id != "chosen-by-client"
+    assert len(session.id) == 32
+
+
+def test_history_and_context_are_kept():
+    store = SessionStore()
+    session = store.get_or_create()
+    session.apply(ChatRequest(message="Привет", user_skills=["Python", " python "], user_experience="middle"))
+    store.add_turn(session, "Привет", "Здравствуйте")
+
+    loaded = store.get_or_create(session.id)
+    assert loaded.id == session.id
+    assert [m.content for m in loaded.history] == ["Привет", "Здравствуйте"]
+    assert loaded.user_skills == ["Python", "python"]
+    assert loaded.user_experience == "middle"
+
+
+def test_history_is_trimmed_to_max_messages():
+    store = SessionStore(max_messages=4)
+    session = store.get_or_create()
+    for i in range(3):
+        store.add_turn(session, f"q{i}", f"a{i}")
+    assert [m.content for m in store.get(session.id).history] == ["q1", "a1", "q2", "a2"]
+
+
+def test_expired_session_is_not_resumed(path):
+    store = SessionStore(path=path, ttl=-1)
+    session = store.get_or_create()
+    store.add_turn(session, "q", "a")
+    assert store.get(session.id) is None
+    assert store.get_or_create(session.id).id != session.id
+
+
+def test_concurrent_turns_are_not_lost():
+    store = SessionStore()
+    session = store.get_or_create()
+    store.add_turn(session, "q0", "a0")
+
+    first = store.get_or_create(session.id)
+    second = store.get_or_create(session.id)
+    store.add_turn(first, "q1", "a1")
+    store.add_turn(second, "q2", "a2")
+
+    history = [m.content for m in store.get(session.id).history]
+    assert history == ["q0", "a0", "q1", "a1", "q2", "a2"]
+
+
+def test_turns_saved_by_another_worker_are_visible(path):
+    worker_a = SessionStore(path=path)
+    worker_b = SessionStore(path=path)
+    session = worker_a.get_or_create()
+    worker_a.add_turn(session, "q0", "a0")
+
+    # Второй воркер кэширует версию сессии, затем первый ее дописывает
+    stale = worker_b.get_or_create(session.id)
+    worker_a.add_turn(worker_a.get_or_create(session.id), "q1", "a1")
+    assert [m.content for m in worker_b.get(session.id).history] == ["q0", "a0", "q1", "a1"]
+
+    # Реплика второго воркера добавляется к истории первого, а не затирает ее
+    worker_b.add_turn(stale, "q2", "a2")
+    history = [m.content for m in worker_a.get(session.id).history]
+    assert history == ["q0", "a0", "q1", "a1", "q2", "a2"]
+    worker_a.close()
+    worker_b.close()
+
+
+def test_replaced_history_wins_over_stored_one():
+    store = SessionStore()
+    session = store.get_or_create()
+    store.add_turn(session, "q0", "a0")
+
+    session = store.get_or_create(session.id)
+    session.apply(ChatRequest(message="q1", conversation_history=[{"role": "user", "content": "старое"}]))
+    store.add_turn(session, "q1", "a1")
+    assert [m.content for m in store.get(session.id).history] == ["старое", "q1", "a1"]
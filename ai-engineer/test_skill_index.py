@@ -0,0 +1,109 @@
+"""
+Тесты фильтра вакансий по навыкам: нормализация навыков, инвертированный индекс
+SkillIndex и поиск по навыкам во всех хранилищах (get_vacancies_by_skills и facet_search)
+"""
+import pytest
+
+from skill_index import SkillIndex, normalize_skill
+
+
+def _ids(db, skills, **filters):
+    ids, total, _ = db.facet_search(skills=skills, facets=False, **filters)
+    assert total == len(ids)
+    return ids
+
+
+def test_normalize_skill():
+    assert normalize_skill("  REST   API ") == "rest api"
+    assert normalize_skill("Node.JS") == "node.js"
+    assert normalize_skill("   ") == ""
+
+
+def test_any_skill_is_case_and_space_insensitive(db):
+    assert sorted(_ids(db, ["python"])) == [1, 3, 4, 5]
+    assert sorted(_ids(db, [" PYTHON ", "react"])) == [1, 2, 3, 4, 5]
+    assert sorted(_ids(db, ["rest  api"])) == [1, 5]
+
+
+def test_vacancies_with_more_matches_come_first(db):
+    # Python+React совпадают у full stack (5), остальные - по одному навыку
+    ids = _ids(db, ["Python", "React"])
+    assert ids[0] == 5
+    # При равном числе совпадений выше вакансии, где навык обязательный, затем по ID
+    assert _ids(db, ["Django"]) == [1, 4]
+
+
+def test_all_skills(db):
+    assert _ids(db, ["Python", "PostgreSQL"], skills_match="all") == [1, 5]
+    assert _ids(db, ["Python", "Kotlin"], skills_match="all") == []
+
+
+def test_skill_scope(db):
+    assert _ids(db, ["Django"], skills_scope="required") == [1]
+    assert _ids(db, ["Django"], skills_scope="preferred") == [4]
+    assert sorted(_ids(db, ["Docker"], skills_scope="required")) == []
+
+
+def test_unknown_and_blank_skills_match_nothing(db):
+    assert _ids(db, ["Kotlin"]) == []
+    assert _ids(db, [" "]) == []
+    assert sorted(_ids(db, ["Kotlin", "React"])) == [2, 5]
+
+
+def test_index_follows_catalog_changes(db):
+    vacancy = db.get_vacancy_by_id(4).model_copy(update={"required_skills": ["Go"], "preferred_skills": []})
+    db.add_vacancy(vacancy)
+    assert 4 not in _ids(db, ["Python"])
+    assert _ids(db, ["go"]) == [4]
+    db.remove_vacancy(4)
+    assert _ids(db, ["go"]) == []
+
+
+def test_skill_index_any_all_and_scope():
+    index = SkillIndex()
+    index.add(1, ["Python", "Django"], ["Docker"])
+    index.add(2, ["Go"], ["python", " PYTHON "])
+    index.add(3, ["Docker", "Python"], [])
+    assert len(index) == 3
+    assert index.search(["python", "docker"]) == [3, 1, 2]
+    assert index.search(["Python", "Docker"], match="all") == [3, 1]
+    assert index.search(["Python"], scope="preferred") == [2]
+    assert index.search(["Docker"], scope="required") == [3]
+    assert index.search(["Rust"]) == []
+    assert index.search(["Python", "Rust"], match="all") == []
+    assert index.search(["", " "]) == []
+
+
+def test_skill_index_updates_in_place():
+    index = SkillIndex()
+    index.add(1, ["Python"], [])
+    index.add(1, ["Go"], [])
+    assert index.search(["Python"]) == []
+    assert index.search(["Go"]) == [1]
+    index.remove(1)
+    index.remove(1)
+    assert index.search(["Go"]) == []
+    assert len(index) == 0
+
+
+@pytest.mark.parametrize("skills,match,scope", [
+    (["python", "React"], "any", "all"),
+    (["Python", "PostgreSQL"], "all", "all"),
+    (["Django"], "any", "preferred"),
+    (["Docker", "Redis"], "any", "required"),
+    (["Kotlin"], "any", "all"),
+])
+def test_get_vacancies_by_skills_matches_facet_search(db, skills, match, scope):
+    vacancies = db.get_vacancies_by_skills(skills, match=match, scope=scope)
+    ids, _, _ = db.facet_search(skills=skills, skills_match=match, skills_scope=scope, facets=False)
+    assert [v.id for v in vacancies] == ids
+
+
+def test_get_vacancies_by_skills_does_not_rebuild_snapshot(db, monkeypatch):
+    db.get_catalog_snapshot()
+    monkeypatch.setattr(db, "get_catalog_snapshot", lambda: pytest.fail("индекс навыков не должен перестраиваться"))
+    vacancy = db.get_vacancy_by_id(2).model_copy(update={"required_skills": ["Rust"]})
+    db.add_vacancy(vacancy)
+    assert [v.id for v in db.get_vacancies_by_skills(["rust"])] == [2]
+    db.remove_vacancy(2)
+    assert db.get_vacancies_by_skills(["rust"]) == []
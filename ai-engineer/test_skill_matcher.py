@@ -0,0 +1,79 @@
+"""
+Тесты поиска навыков и названий вакансий каталога в ответе модели
+"""
+from chat_service import MAX_SKILL_RECOMMENDATIONS, ChatBotService
+from database import Database
+from skill_matcher import AhoCorasick, SkillMatcher
+
+
+ITEMS = [
+    {"id": 1, "title": "Python  Developer", "required_skills": ("Python", "REST API"), "preferred_skills": ("Go",)},
+    {"id": 2, "title": "Go Developer", "required_skills": ("go", "C++"), "preferred_skills": ("API",)},
+    {"id": 3, "title": "Python Developer", "required_skills": ("Python",), "preferred_skills": ()},
+]
+
+
+def test_matches_whole_words_case_insensitively():
+    automaton = AhoCorasick([("go", "go"), ("c++", "c++")])
+    assert automaton.find("Go и C++, но не Google и не Cargo") == [(0, 2, "go"), (5, 8, "c++")]
+    assert automaton.find("go_lang, go1, ago") == []
+
+
+def test_overlapping_patterns_are_all_found():
+    automaton = AhoCorasick([("he", 1), ("she", 2), ("hers", 3), ("his", 4)])
+    assert automaton.find("she hers his") == [(0, 3, 2), (4, 8, 3), (9, 12, 4)]
+
+
+def test_nested_shorter_match_is_dropped():
+    automaton = AhoCorasick([("api", "api"), ("rest api", "rest"), ("rest", "r")])
+    assert automaton.find("Знаю REST API и API") == [(5, 13, "rest"), (16, 19, "api")]
+
+
+def test_same_span_keeps_every_value():
+    automaton = AhoCorasick([("go developer", "title"), ("Go Developer", "skill")])
+    assert [value for _, _, value in automaton.find("go developer")] == ["title", "skill"]
+
+
+def test_empty_patterns_and_text():
+    automaton = AhoCorasick([("", "пусто"), ("sql", "sql")])
+    assert automaton.find("") == []
+    assert automaton.find("no match") == []
+
+
+def test_extract_titles_and_skills_in_mention_order():
+    matcher = SkillMatcher(ITEMS)
+    ids, skills = matcher.extract("Подойдет Python\n Developer, нужен C++ и REST API, а также Go")
+    assert ids == [1, 3]
+    # Python внутри названия вакансии навыком не считается
+    assert skills == ["C++", "REST API", "Go"]
+
+
+def test_first_seen_spelling_is_kept():
+    matcher = SkillMatcher(ITEMS)
+    assert matcher.skills["go"] == "Go"
+    assert matcher.extract("GO")[1] == ["Go"]
+
+
+def test_skill_with_extra_spaces_in_catalog_is_found():
+    matcher = SkillMatcher([{"id": 1, "title": "ML Engineer", "required_skills": (" Machine  Learning ",)}])
+    assert matcher.extract("Изучите machine\nlearning")[1] == ["Machine  Learning"]
+
+
+def test_extract_mentions_skips_user_skills_and_caps_recommendations():
+    service = ChatBotService(api_key="test")
+    snapshot = Database().get_catalog_snapshot()
+    text = (
+        "Рекомендую вакансию №2 и Data Scientist. Изучите Python, Django, PostgreSQL, "
+        "REST API, React, JavaScript, TypeScript, Docker и Machine Learning"
+    )
+    ids, skills = service._extract_mentions(text, snapshot, user_skills=[" python "])
+    assert ids == [2, 3]
+    assert "Python" not in skills
+    assert skills == ["Django", "PostgreSQL", "REST API", "React", "JavaScript"]
+    assert len(skills) == MAX_SKILL_RECOMMENDATIONS
+
+
+def test_extract_mentions_without_matches():
+    service = ChatBotService(api_key="test")
+    assert service._extract_mentions("Ничего не найдено", list(ITEMS)) == (None, None)
+    assert service._extract_mentions("вакансия 7", None) == ([7], None)
@@ -0,0 +1,62 @@
+"""
+Тесты фонового прогрева и готовности приложения
+"""
+import asyncio
+
+from database import Database
+from sqlite_database import SQLiteDatabase
+from startup import Warmup, catalog_warmup_steps
+
+
+def _names(steps):
+    return [name for name, _ in steps]
+
+
+def test_memory_backend_warms_facets_and_fragments():
+    db = Database()
+    names = _names(catalog_warmup_steps(db))
+    assert names == [
+        "catalog_snapshot", "search_index", "recommender", "skill_matcher",
+        "facet_index", "vacancy_fragments", "company_fragments",
+    ]
+    asyncio.run(Warmup(catalog_warmup_steps(db)).run())
+    assert len(db.vacancy_fragments) == len(db.get_all_vacancies())
+
+
+def test_sql_backend_skips_in_memory_facets_and_fragments(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / "vacancies.db"))
+    steps = catalog_warmup_steps(db)
+    assert "facet_index" not in _names(steps)
+    assert "vacancy_fragments" not in _names(steps)
+    asyncio.run(Warmup(steps).run())
+    assert db.get_catalog_snapshot()._facet_index is None
+    assert len(db.vacancy_fragments) == 0
+    db.close()
+
+
+def test_failed_step_is_retried():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 2:
+            raise RuntimeError("сбой")
+
+    warmup = Warmup([("flaky", flaky)], retries=2, retry_delay=0)
+    asyncio.run(warmup.run())
+    assert calls == [1, 1]
+    assert warmup.ready
+    assert warmup.report()["steps"]["flaky"] == {"status": "done", "seconds": warmup.seconds["flaky"], "error": None}
+
+
+def test_step_failing_after_retries_keeps_app_not_ready():
+    def broken():
+        raise RuntimeError("нет индекса")
+
+    warmup = Warmup([("broken", broken), ("ok", lambda: None)], retries=1, retry_delay=0)
+    asyncio.run(warmup.run())
+    assert not warmup.ready
+    report = warmup.report()
+    assert report["status"] == "failed"
+    assert report["steps"]["broken"]["error"] == "нет индекса"
+    assert report["steps"]["ok"]["status"] == "done"
@@ -0,0 +1,73 @@
+"""
+Async SQLAlchemy engine and sessions for the read endpoints.
+
+The async engine points at the same database as ``database.engine``, switched
+to an async driver (aiosqlite / asyncpg) unless ASYNC_DATABASE_URL is set.
+Pool size and SQLite tuning are configured through environment variables.
+"""
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from database import engine
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def _async_url():
+    url = os.getenv("ASYNC_DATABASE_URL")
+    if url:
+        return make_url(url)
+    backend = engine.url.get_backend_name()
+    return engine.url.set(drivername=ASYNC_DRIVERS.get(backend, engine.url.drivername))
+
+
+def _pool_options(url) -> dict:
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": True,
+    }
+
+
+def apply_sqlite_profile(target: Engine) -> None:
+    """Production SQLite settings applied to every new connection of ``target``."""
+    if target.url.get_backend_name() != "sqlite":
+        return
+
+    pragmas = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))}",
+        f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))}",
+        "PRAGMA temp_store=MEMORY",
+    )
+
+    @event.listens_for(target, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+_url = _async_url()
+async_engine = create_async_engine(_url, **_pool_options(_url))
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+apply_sqlite_profile(engine)
+apply_sqlite_profile(async_engine.sync_engine)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as session:
+        yield session
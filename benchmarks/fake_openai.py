@@ -0,0 +1,140 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Serves ``POST /v1/chat/completions`` with a configurable response latency,
+optional token streaming and failure injection, so the chat service can be
+load-tested without network access or API costs. Point the AI service at it
+with ``OPENAI_BASE_URL=http://127.0.0.1:<port>/v1``.
+
+    python benchmarks/fake_openai.py --port 9911 --latency 0.3 --jitter 0.1
+
+A share of requests can be made slow (``--slow-rate``/``--slow-latency``) to
+exercise timeouts and hedging. Settings can be changed while the server runs,
+e.g. to simulate a brownout and the recovery after it:
+
+    curl -X POST http://127.0.0.1:9911/fake/settings -d '{"failure_rate": 1.0}'
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+CHAT_REPLY = (
+    "Вам подойдет вакансия №1 Python Backend Developer: она совпадает с вашим стеком. "
+    "Также посмотрите вакансию №2. Чтобы повысить шансы, стоит изучить Docker, Kubernetes и Redis, "
+    "а для продвинутых позиций пригодятся PostgreSQL и REST API."
+)
+
+
+class Settings:
+    latency = 0.3
+    jitter = 0.0
+    chunk_delay = 0.01
+    failure_rate = 0.0
+    failure_status = 500
+    slow_rate = 0.0
+    slow_latency = 10.0
+    max_vacancy_id = 5
+
+
+settings = Settings()
+app = FastAPI(title="Fake OpenAI")
+
+
+def _reply(body: dict) -> str:
+    if body.get("response_format", {}).get("type") == "json_object":
+        ids = random.sample(range(1, settings.max_vacancy_id + 1), k=min(5, settings.max_vacancy_id))
+        return json.dumps({"recommended_vacancy_ids": ids, "skill_recommendations": ["Docker", "Kubernetes"]})
+    return CHAT_REPLY
+
+
+def _usage(body: dict, text: str) -> dict:
+    prompt_tokens = sum(len(m.get("content") or "") for m in body.get("messages", [])) // 4
+    completion_tokens = len(text) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+@app.post("/fake/settings")
+async def update_settings(request: Request):
+    """Change latency, failure and slow-request injection at runtime"""
+    for name, value in (await request.json()).items():
+        if not hasattr(Settings, name):
+            return JSONResponse(status_code=400, content={"detail": f"Unknown setting: {name}"})
+        setattr(settings, name, type(getattr(Settings, name))(value))
+    return {name: getattr(settings, name) for name in vars(Settings) if not name.startswith("_")}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    latency = settings.slow_latency if random.random() < settings.slow_rate else settings.latency
+    await asyncio.sleep(max(0.0, random.gauss(latency, settings.jitter)))
+    if random.random() < settings.failure_rate:
+        return JSONResponse(
+            status_code=settings.failure_status,
+            content={"error": {"message": "Injected failure", "type": "server_error"}},
+        )
+
+    text = _reply(body)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    model = body.get("model", "fake")
+
+    if body.get("stream"):
+        async def chunks():
+            for word in text.split(" "):
+                chunk = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                await asyncio.sleep(settings.chunk_delay)
+            final = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    return {
+        "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": _usage(body, text),
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9911)
+    parser.add_argument("--latency", type=float, default=settings.latency, help="Mean response latency, seconds")
+    parser.add_argument("--jitter", type=float, default=settings.jitter, help="Latency standard deviation, seconds")
+    parser.add_argument("--chunk-delay", type=float, default=settings.chunk_delay, help="Delay between streamed chunks")
+    parser.add_argument("--failure-rate", type=float, default=settings.failure_rate, help="Share of requests answered with an error")
+    parser.add_argument("--failure-status", type=int, default=settings.failure_status, help="Status code of injected failures")
+    parser.add_argument("--slow-rate", type=float, default=settings.slow_rate, help="Share of requests delayed by --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=settings.slow_latency, help="Latency of slow requests, seconds")
+    parser.add_argument("--max-vacancy-id", type=int, default=settings.max_vacancy_id, help="Upper bound of recommended ids")
+    args = parser.parse_args()
+
+    settings.latency = args.latency
+    settings.jitter = args.jitter
+    settings.chunk_delay = args.chunk_delay
+    settings.failure_rate = args.failure_rate
+    settings.failure_status = args.failure_status
+    settings.slow_rate = args.slow_rate
+    settings.slow_latency = args.slow_latency
+    settings.max_vacancy_id = args.max_vacancy_id
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
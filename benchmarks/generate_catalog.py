@@ -0,0 +1,129 @@
+"""
+Synthetic catalog generator for benchmarks.
+
+Writes three NDJSON files into the output directory:
+
+- ``companies.ndjson`` and ``vacancies.ndjson`` for the AI service
+  (loaded with ``python ai-engineer/sqlite_database.py``);
+- ``jobs.ndjson`` for the main API (``POST /api/v1/jobs/bulk``).
+
+Rows are generated lazily with a fixed seed, so 1M-row catalogs use constant
+memory and the same size always produces the same data.
+
+    python benchmarks/generate_catalog.py --size 100000 --out benchmarks/.data/100000
+"""
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator
+
+SKILLS = [
+    "Python", "Django", "FastAPI", "Flask", "PostgreSQL", "MySQL", "Redis", "Kafka", "RabbitMQ",
+    "Docker", "Kubernetes", "Terraform", "AWS", "GCP", "Linux", "Git", "REST API", "GraphQL",
+    "JavaScript", "TypeScript", "React", "Vue.js", "Angular", "Node.js", "HTML", "CSS",
+    "Java", "Spring", "Kotlin", "Go", "Rust", "C++", "C#", ".NET", "Scala",
+    "SQL", "Pandas", "NumPy", "PyTorch", "TensorFlow", "Machine Learning", "Spark", "Airflow",
+    "Swift", "Flutter", "Android", "iOS", "Selenium", "Playwright", "CI/CD",
+]
+ROLES = [
+    "Backend Developer", "Frontend Developer", "Fullstack Developer", "Data Scientist",
+    "Data Engineer", "DevOps Engineer", "QA Engineer", "Mobile Developer", "ML Engineer",
+    "Site Reliability Engineer", "Android Developer", "iOS Developer",
+]
+CITIES = ["Москва", "Санкт-Петербург", "Казань", "Новосибирск", "Алматы", "Астана", "Екатеринбург", "Удаленно"]
+LEVELS = ["junior", "middle", "senior", "lead"]
+JOB_TYPES = ["full_time", "part_time", "contract", "internship"]
+FORMATS = ["office", "remote", "hybrid"]
+INDUSTRIES = ["IT", "FinTech", "E-commerce", "Медиа", "Телеком", "Логистика"]
+SALARY_BY_LEVEL = {"junior": 80000, "middle": 180000, "senior": 300000, "lead": 400000}
+
+EPOCH = datetime(2024, 1, 1)
+
+
+def company_count(size: int) -> int:
+    return max(1, min(5000, size // 20))
+
+
+def companies(size: int, seed: int = 42) -> Iterator[Dict]:
+    rng = random.Random(seed)
+    for company_id in range(1, company_count(size) + 1):
+        yield {
+            "id": company_id,
+            "name": f"Company {company_id}",
+            "description": f"Компания {company_id}",
+            "industry": rng.choice(INDUSTRIES),
+            "website": f"https://company{company_id}.example.com",
+            "location": rng.choice(CITIES),
+        }
+
+
+def vacancies(size: int, seed: int = 42) -> Iterator[Dict]:
+    rng = random.Random(seed + 1)
+    companies_total = company_count(size)
+    for vacancy_id in range(1, size + 1):
+        level = rng.choice(LEVELS)
+        skills = rng.sample(SKILLS, k=rng.randint(3, 8))
+        split = rng.randint(2, len(skills))
+        base = SALARY_BY_LEVEL[level]
+        role = rng.choice(ROLES)
+        yield {
+            "id": vacancy_id,
+            "title": f"{skills[0]} {role}",
+            "description": f"{level.capitalize()} {role}: {', '.join(skills)}",
+            "company_id": rng.randint(1, companies_total),
+            "location": rng.choice(CITIES),
+            "salary_min": base,
+            "salary_max": base + rng.choice([0, 50000, 100000]),
+            "job_type": rng.choice(JOB_TYPES),
+            "experience_level": level,
+            "required_skills": skills[:split],
+            "preferred_skills": skills[split:],
+            "posted_date": (EPOCH + timedelta(minutes=vacancy_id)).isoformat(),
+        }
+
+
+def jobs(size: int, seed: int = 42) -> Iterator[Dict]:
+    rng = random.Random(seed + 2)
+    for job_id in range(1, size + 1):
+        role = rng.choice(ROLES)
+        yield {
+            "external_id": f"bench-{job_id}",
+            "title": role,
+            "description": f"{role}: {', '.join(rng.sample(SKILLS, k=4))}",
+            "city": rng.choice(CITIES),
+            "grade": rng.choice(LEVELS),
+            "format": rng.choice(FORMATS),
+            "posted_date": (EPOCH + timedelta(minutes=job_id)).isoformat(),
+        }
+
+
+def write_ndjson(path: str, rows: Iterator[Dict]) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def generate(size: int, out: str, seed: int = 42) -> Dict[str, str]:
+    """Write the catalog for ``size`` vacancies/jobs into ``out`` and return the file paths."""
+    os.makedirs(out, exist_ok=True)
+    paths = {name: os.path.join(out, f"{name}.ndjson") for name in ("companies", "vacancies", "jobs")}
+    write_ndjson(paths["companies"], companies(size, seed))
+    write_ndjson(paths["vacancies"], vacancies(size, seed))
+    write_ndjson(paths["jobs"], jobs(size, seed))
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic vacancy catalog")
+    parser.add_argument("--size", type=int, required=True, help="Number of vacancies and jobs")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    for name, path in generate(args.size, args.out, args.seed).items():
+        print(f"{name}: {path}")
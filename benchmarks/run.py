@@ -0,0 +1,363 @@
+"""
+Load and latency benchmarks for the AI service and the main API.
+
+For every catalog size the script generates a synthetic catalog, starts the
+fake OpenAI server, the AI service (``ai-engineer``) and the main API as
+separate uvicorn processes, then drives each endpoint at every concurrency
+level and records p50/p95/p99 latency and throughput. Results are written as
+JSON (one record per app/endpoint/size/concurrency) together with the git
+commit, so runs can be compared across commits with ``--baseline``.
+
+    python benchmarks/run.py --sizes 10,10000 --concurrency 1,16 --output bench.json
+    python benchmarks/run.py --sizes 10,10000 --concurrency 1,16 --baseline bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+
+from generate_catalog import CITIES, FORMATS, LEVELS, SKILLS, generate
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+AI_DIR = os.path.join(REPO_DIR, "ai-engineer")
+
+# (method, path, request kwargs) for one request of a scenario
+Call = Tuple[str, str, Dict]
+
+CHAT_MESSAGES = [
+    "Подбери вакансии Python разработчика",
+    "Какие навыки нужны для DevOps инженера?",
+    "Есть ли удаленные вакансии для junior frontend?",
+    "Что изучить, чтобы перейти в Data Engineering?",
+]
+
+
+def chat_call(rng: random.Random) -> Call:
+    return "POST", "/api/chat", {"json": {"message": rng.choice(CHAT_MESSAGES)}}
+
+
+def recommendations_call(rng: random.Random) -> Call:
+    params = {"user_experience": rng.choice(LEVELS), "engine": "llm"}
+    return "POST", "/api/recommendations", {"params": params, "json": rng.sample(SKILLS, k=3)}
+
+
+def vacancies_call(rng: random.Random) -> Call:
+    return "GET", "/api/vacancies", {"params": {"skills": ",".join(rng.sample(SKILLS, k=2))}}
+
+
+def jobs_call(rng: random.Random) -> Call:
+    params = {"city": rng.choice(CITIES), "format": rng.choice(FORMATS), "limit": 50}
+    return "GET", "/api/v1/jobs", {"params": params}
+
+
+def jobs_keyset_call(rng: random.Random) -> Call:
+    params = {"city": rng.choice(CITIES), "limit": 50, "paginate": "keyset"}
+    return "GET", "/api/v1/jobs", {"params": params}
+
+
+SCENARIOS: Dict[str, Dict[str, Callable[[random.Random], Call]]] = {
+    "ai": {
+        "/api/chat": chat_call,
+        "/api/recommendations": recommendations_call,
+        "/api/vacancies": vacancies_call,
+    },
+    "main": {
+        "/api/v1/jobs": jobs_call,
+        "/api/v1/jobs?paginate=keyset": jobs_keyset_call,
+    },
+}
+
+
+# Processes
+
+def _wait_ready(url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server for {url} exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"{url} did not become ready in {timeout:.0f}s")
+
+
+@contextmanager
+def serve(args: Sequence[str], ready_url: str, cwd: str, env: Dict[str, str], timeout: float = 120) -> Iterator[None]:
+    """Run a server process until the block exits."""
+    process = subprocess.Popen(list(args), cwd=cwd, env={**os.environ, **env})
+    try:
+        _wait_ready(ready_url, process, timeout)
+        yield
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def uvicorn_args(app: str, app_dir: str, port: int, workers: int) -> List[str]:
+    return [
+        sys.executable, "-m", "uvicorn", app, "--app-dir", app_dir,
+        "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+    ]
+
+
+def prepare_catalog(size: int, workdir: str) -> Dict[str, str]:
+    """Generate the NDJSON files and the AI service SQLite database once per size."""
+    out = os.path.join(workdir, str(size))
+    paths = {name: os.path.join(out, f"{name}.ndjson") for name in ("companies", "vacancies", "jobs")}
+    if not all(os.path.exists(p) for p in paths.values()):
+        print(f"[bench] generating catalog of {size}", file=sys.stderr)
+        paths = generate(size, out)
+    paths["ai_db"] = os.path.join(out, "ai.db")
+    if not os.path.exists(paths["ai_db"]):
+        subprocess.run(
+            [sys.executable, "sqlite_database.py", "--db", paths["ai_db"],
+             "--companies", paths["companies"], "--vacancies", paths["vacancies"]],
+            cwd=AI_DIR, check=True, stdout=subprocess.DEVNULL,
+        )
+    paths["dir"] = out
+    return paths
+
+
+def load_jobs(base_url: str, path: str) -> None:
+    """Upload jobs through the bulk endpoint; rows are upserted by external_id, so reloading is idempotent."""
+    def body() -> Iterator[bytes]:
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                yield chunk
+
+    response = httpx.post(f"{base_url}/api/v1/jobs/bulk", content=body(), timeout=None)
+    response.raise_for_status()
+    report = response.json()
+    if report.get("failed"):
+        print(f"[bench] jobs import: {report['failed']} rows failed, e.g. {report['errors'][:1]}", file=sys.stderr)
+
+
+# Load generation
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending sequence."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, int(round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def measure(
+    base_url: str,
+    make_call: Callable[[random.Random], Call],
+    concurrency: int,
+    requests: int,
+    warmup: int,
+    timeout: float,
+    seed: int,
+) -> Dict:
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        for _ in range(warmup):
+            method, path, kwargs = make_call(rng)
+            await client.request(method, path, **kwargs)
+
+        async def worker() -> None:
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                method, path, kwargs = make_call(rng)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                    await response.aread()
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - started)
+                errors += not ok
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else None,
+    }
+
+
+def run_app(app: str, base_url: str, size: int, args) -> List[Dict]:
+    results = []
+    for endpoint, make_call in SCENARIOS[app].items():
+        if args.endpoints and endpoint not in args.endpoints:
+            continue
+        for concurrency in args.concurrency:
+            requests = max(args.requests, concurrency * 2)
+            stats = asyncio.run(measure(
+                base_url, make_call, concurrency, requests, args.warmup, args.timeout, args.seed
+            ))
+            record = {"app": app, "endpoint": endpoint, "catalog_size": size, "concurrency": concurrency, **stats}
+            results.append(record)
+            print(
+                f"[bench] {app:4} {endpoint:32} size={size:<8} c={concurrency:<4} "
+                f"p50={stats['p50_ms']:9.2f}ms p95={stats['p95_ms']:9.2f}ms p99={stats['p99_ms']:9.2f}ms "
+                f"rps={stats['throughput_rps']:9.1f} errors={stats['errors']}",
+                file=sys.stderr,
+            )
+    return results
+
+
+# Reporting
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict], baseline_path: str) -> None:
+    """Print p95 and throughput changes against a previous results file."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    key = lambda r: (r["app"], r["endpoint"], r["catalog_size"], r["concurrency"])
+    previous = {key(r): r for r in baseline["results"]}
+    print(f"[bench] compared with {baseline['meta'].get('commit') or baseline_path}", file=sys.stderr)
+    for record in results:
+        old = previous.get(key(record))
+        if not old:
+            continue
+        p95 = (record["p95_ms"] / old["p95_ms"] - 1) * 100 if old["p95_ms"] else float("nan")
+        rps = (record["throughput_rps"] / old["throughput_rps"] - 1) * 100 if old["throughput_rps"] else float("nan")
+        print(
+            f"[bench] {record['app']:4} {record['endpoint']:32} size={record['catalog_size']:<8} "
+            f"c={record['concurrency']:<4} p95 {p95:+7.1f}%  rps {rps:+7.1f}%",
+            file=sys.stderr,
+        )
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latency and throughput benchmarks")
+    parser.add_argument("--sizes", type=_int_list, default=[10, 1000, 100000], help="Catalog sizes, comma separated")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32], help="Concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and level")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests before each level")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Client timeout per request, seconds")
+    parser.add_argument("--apps", default="ai,main", help="Apps to benchmark: ai, main or both")
+    parser.add_argument("--endpoints", type=lambda v: v.split(","), default=None, help="Only these endpoints")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers per app")
+    parser.add_argument("--ai-port", type=int, default=8101)
+    parser.add_argument("--main-port", type=int, default=8100)
+    parser.add_argument("--openai-port", type=int, default=9911)
+    parser.add_argument("--openai-latency", type=float, default=0.3, help="Fake OpenAI latency, seconds")
+    parser.add_argument("--openai-jitter", type=float, default=0.05)
+    parser.add_argument("--openai-failure-rate", type=float, default=0.0)
+    parser.add_argument("--openai-slow-rate", type=float, default=0.0, help="Share of slow fake OpenAI responses")
+    parser.add_argument("--openai-slow-latency", type=float, default=10.0, help="Latency of slow responses, seconds")
+    parser.add_argument("--openai-base-url", default=os.getenv("OPENAI_BASE_URL"),
+                        help="Use this OpenAI-compatible API instead of starting the fake server "
+                             "(default: $OPENAI_BASE_URL)")
+    parser.add_argument("--workdir", default=os.path.join(BENCH_DIR, ".data"), help="Generated catalogs and databases")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="Previous JSON results to compare with")
+    args = parser.parse_args()
+    apps = [a for a in args.apps.split(",") if a in SCENARIOS]
+
+    results: List[Dict] = []
+
+    @contextmanager
+    def openai_server() -> Iterator[str]:
+        if args.openai_base_url:
+            yield args.openai_base_url
+            return
+        with serve(
+            [sys.executable, os.path.join(BENCH_DIR, "fake_openai.py"), "--port", str(args.openai_port),
+             "--latency", str(args.openai_latency), "--jitter", str(args.openai_jitter),
+             "--failure-rate", str(args.openai_failure_rate), "--slow-rate", str(args.openai_slow_rate),
+             "--slow-latency", str(args.openai_slow_latency), "--max-vacancy-id", str(max(args.sizes))],
+            ready_url=f"http://127.0.0.1:{args.openai_port}/docs", cwd=BENCH_DIR, env={},
+        ):
+            yield f"http://127.0.0.1:{args.openai_port}/v1"
+
+    with openai_server() as openai_base_url:
+        for size in args.sizes:
+            catalog = prepare_catalog(size, os.path.abspath(args.workdir))
+
+            if "ai" in apps:
+                ai_url = f"http://127.0.0.1:{args.ai_port}"
+                env = {
+                    "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "benchmark"),
+                    "OPENAI_BASE_URL": openai_base_url,
+                    "AI_DB_BACKEND": os.getenv("AI_DB_BACKEND", "sqlite"),
+                    "AI_DB_PATH": catalog["ai_db"],
+                }
+                with serve(uvicorn_args("main:app", AI_DIR, args.ai_port, args.workers),
+                           ready_url=f"{ai_url}/api/ready", cwd=catalog["dir"], env=env):
+                    results.extend(run_app("ai", ai_url, size, args))
+
+            if "main" in apps:
+                main_url = f"http://127.0.0.1:{args.main_port}"
+                # The main API keeps its database relative to the working directory, one per catalog size
+                main_dir = os.path.join(catalog["dir"], "main")
+                os.makedirs(main_dir, exist_ok=True)
+                with serve(uvicorn_args("main:app", REPO_DIR, args.main_port, args.workers),
+                           ready_url=f"{main_url}/api/v1/ready", cwd=main_dir, env={}):
+                    load_jobs(main_url, catalog["jobs"])
+                    results.extend(run_app("main", main_url, size, args))
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        },
+        "results": results,
+    }
+    if args.baseline:
+        compare(results, args.baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
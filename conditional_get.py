@@ -0,0 +1,50 @@
+"""
+Conditional GET helpers (ETag / Last-Modified) for the jobs API. The AI
+service keeps its own copy in ai-engineer/http_cache.py so that it deploys
+without the repository root.
+
+Validators are computed by the caller; this module only formats them and
+decides whether the client's copy is still current.
+"""
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+
+def validator_headers(etag: str, last_modified: datetime) -> Dict[str, str]:
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified.replace(microsecond=0), usegmt=True),
+        # Clients may store the response but must revalidate it on every use
+        "Cache-Control": "no-cache",
+    }
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+def not_modified(request: Request, etag: str, last_modified: datetime) -> Optional[Response]:
+    """
+    Return a 304 response when the client's copy is current, otherwise ``None``.
+
+    ``If-None-Match`` takes precedence over ``If-Modified-Since`` (RFC 9110).
+    ``last_modified`` must be timezone-aware.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        try:
+            since = parsedate_to_datetime(request.headers.get("if-modified-since", ""))
+        except (TypeError, ValueError):
+            since = None
+        fresh = since is not None and since.tzinfo is not None and last_modified.replace(microsecond=0) <= since
+
+    if fresh:
+        return Response(status_code=304, headers=validator_headers(etag, last_modified))
+    return None
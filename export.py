@@ -0,0 +1,53 @@
+"""
+Streaming export of query results as NDJSON or CSV.
+
+Rows are read from a server-side cursor in partitions and encoded one
+partition at a time, so the first bytes go out immediately and memory use
+does not depend on the size of the result.
+"""
+import csv
+import io
+import os
+from typing import AsyncIterator, Type
+
+from pydantic import BaseModel
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+EXPORT_PARTITION_SIZE = int(os.getenv("EXPORT_PARTITION_SIZE", "500"))
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def _partitions(engine: AsyncEngine, stmt: Select, schema: Type[BaseModel]) -> AsyncIterator[list]:
+    async with engine.connect() as conn:
+        result = await conn.stream(stmt.execution_options(yield_per=EXPORT_PARTITION_SIZE))
+        async for partition in result.mappings().partitions(EXPORT_PARTITION_SIZE):
+            yield [schema.model_validate(dict(row)) for row in partition]
+
+
+async def export_ndjson(engine: AsyncEngine, stmt: Select, schema: Type[BaseModel]) -> AsyncIterator[bytes]:
+    async for records in _partitions(engine, stmt, schema):
+        yield "".join(record.model_dump_json() + "\n" for record in records).encode()
+
+
+async def export_csv(engine: AsyncEngine, stmt: Select, schema: Type[BaseModel]) -> AsyncIterator[bytes]:
+    fields = list(schema.model_fields)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    yield buffer.getvalue().encode()
+    async for records in _partitions(engine, stmt, schema):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(record.model_dump(mode="json") for record in records)
+        yield buffer.getvalue().encode()
+
+
+EXPORTERS = {
+    "ndjson": export_ndjson,
+    "csv": export_csv,
+}
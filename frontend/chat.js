@@ -2,7 +2,8 @@
 const AI_API_BASE_URL = 'http://localhost:8001/api';
 
 // Chat State
-let chatHistory = [];
+// The conversation history lives on the server; the client only keeps the session id
+let sessionId = null;
 let isProcessing = false;
 
 // DOM Elements
@@ -65,12 +66,6 @@ async function sendMessage() {
     addMessage(message, 'user');
     chatInput.value = '';
 
-    // Update chat history
-    chatHistory.push({
-        role: 'user',
-        content: message
-    });
-
     // Show typing indicator
     const typingId = showTypingIndicator();
     isProcessing = true;
@@ -85,9 +80,9 @@ async function sendMessage() {
             },
             body: JSON.stringify({
                 message: message,
-                conversation_history: chatHistory,
-                user_skills: [], // Can be populated from user profile
-                user_experience: null // Can be populated from user profile
+                session_id: sessionId,
+                user_skills: [], // Can be populated from user profile (stored in the session)
+                user_experience: null // Can be populated from user profile (stored in the session)
             })
         });
 
@@ -103,11 +98,7 @@ async function sendMessage() {
         // Add AI response to chat
         addMessage(data.response, 'bot');
 
-        // Update chat history
-        chatHistory.push({
-            role: 'assistant',
-            content: data.response
-        });
+        sessionId = data.session_id || sessionId;
 
         // If there are suggested vacancies, show them
         if (data.suggested_vacancies && data.suggested_vacancies.length > 0) {
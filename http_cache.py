@@ -0,0 +1,90 @@
+"""
+Conditional GET support (ETag / Last-Modified) for the list endpoints.
+
+Each resource has a row in ``catalog_versions`` that is bumped in the same
+transaction as every write to it. Validators are derived from that version
+and the query parameters only, so a revalidation costs one primary-key
+lookup and never touches the jobs or companies tables. The 304 logic itself
+lives in conditional_get.py.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Tuple
+
+from fastapi import Request
+from sqlalchemy import Column, DateTime, Integer, String, Table, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import Session
+
+import models
+
+RESOURCES = ("jobs", "companies")
+
+catalog_versions = Table(
+    "catalog_versions",
+    models.Base.metadata,
+    Column("resource", String(32), primary_key=True),
+    Column("version", Integer, nullable=False, default=0),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def ensure_catalog_versions(engine: Engine) -> None:
+    """Create the version rows that do not exist yet."""
+    catalog_versions.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        existing = set(conn.execute(select(catalog_versions.c.resource)).scalars())
+        missing = [{"resource": r, "version": 0, "updated_at": _utcnow()} for r in RESOURCES if r not in existing]
+        if missing:
+            conn.execute(catalog_versions.insert(), missing)
+
+
+def _bump_statement(resource: str):
+    return (
+        update(catalog_versions)
+        .where(catalog_versions.c.resource == resource)
+        .values(version=catalog_versions.c.version + 1, updated_at=_utcnow())
+    )
+
+
+def bump_version(db: Session, resource: str) -> None:
+    """
+    Bump ``resource``'s version inside the session's current transaction.
+
+    Call it before the write: the write's commit makes both visible at once,
+    and a failed write rolls the bump back with it.
+    """
+    db.execute(_bump_statement(resource))
+
+
+async def bump_version_async(conn: AsyncConnection, resource: str) -> None:
+    """Bump ``resource``'s version inside the caller's transaction."""
+    await conn.execute(_bump_statement(resource))
+
+
+async def get_catalog_state(db: AsyncSession, resource: str) -> Tuple[int, datetime]:
+    row = (await db.execute(
+        select(catalog_versions.c.version, catalog_versions.c.updated_at)
+        .where(catalog_versions.c.resource == resource)
+    )).one()
+    updated_at = row.updated_at.replace(microsecond=0)
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return row.version, updated_at
+
+
+@lru_cache(maxsize=4096)
+def _etag(resource: str, version: int, params: Tuple[Tuple[str, str], ...]) -> str:
+    digest = hashlib.sha1(repr((resource, version, params)).encode()).hexdigest()
+    return f'"{digest[:24]}"'
+
+
+def make_etag(resource: str, version: int, request: Request) -> str:
+    """ETag for one filter/page combination of ``resource`` at ``version``."""
+    return _etag(resource, version, tuple(sorted(request.query_params.multi_items())))
@@ -0,0 +1,47 @@
+"""
+Composite indexes for the filter combinations exposed by the list endpoints.
+
+Every index ends with the keyset sort key ``(posted_date, id)``, so a filtered
+page is an index range scan regardless of how deep the cursor is.
+"""
+from itertools import combinations
+
+from sqlalchemy import Index
+from sqlalchemy.engine import Engine
+
+import models
+
+JOB_FILTER_COLUMNS = ("city", "grade", "format")
+
+
+def _job_indexes():
+    indexes = [Index("ix_jobs_posted_date_id", models.Job.posted_date, models.Job.id)]
+    for size in range(1, len(JOB_FILTER_COLUMNS) + 1):
+        for combo in combinations(JOB_FILTER_COLUMNS, size):
+            indexes.append(Index(
+                f"ix_jobs_{'_'.join(combo)}_posted_date_id",
+                *(getattr(models.Job, column) for column in combo),
+                models.Job.posted_date,
+                models.Job.id,
+            ))
+    return indexes
+
+
+def _external_id_indexes():
+    """Unique external_id indexes used as the conflict target of bulk upserts."""
+    indexes = []
+    for model in (models.Job, models.Company):
+        column = model.__table__.columns.get("external_id")
+        if column is not None and not (column.unique or column.primary_key):
+            indexes.append(Index(f"uq_{model.__tablename__}_external_id", column, unique=True))
+    return indexes
+
+
+JOB_INDEXES = _job_indexes()
+EXTERNAL_ID_INDEXES = _external_id_indexes()
+
+
+def ensure_indexes(engine: Engine) -> None:
+    """Create missing indexes on tables that already exist (create_all skips them)."""
+    for index in JOB_INDEXES + EXTERNAL_ID_INDEXES:
+        index.create(bind=engine, checkfirst=True)
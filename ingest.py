@@ -0,0 +1,179 @@
+"""
+Streaming NDJSON bulk import for jobs and companies.
+
+The request body is read chunk by chunk, each line is validated on its own
+and valid rows are written in batched transactions. Rows carrying an
+``external_id`` are upserted on it. Invalid lines are reported with their
+line number and never abort the rest of the upload. Only one batch is
+held in memory at a time.
+"""
+import os
+from collections import defaultdict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+MAX_LINE_BYTES = int(os.getenv("BULK_MAX_LINE_BYTES", str(1024 * 1024)))
+MAX_REPORTED_ERRORS = int(os.getenv("BULK_MAX_REPORTED_ERRORS", "1000"))
+
+UPSERT_DIALECTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Split a byte stream into (line_number, line) pairs, skipping blank lines.
+
+    A line longer than MAX_LINE_BYTES is yielded once as ``b""`` and its bytes
+    are dropped up to the next newline, so it is never held in memory whole.
+    """
+    buffer = b""
+    line_number = 0
+    skipping = False  # inside an oversized line that was already reported
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if skipping:
+                # Tail of the oversized line; what follows it is split as usual
+                skipping = False
+            elif len(line) > MAX_LINE_BYTES:
+                yield line_number, b""
+            elif line.strip():
+                yield line_number, line
+        if skipping or len(buffer) > MAX_LINE_BYTES:
+            if not skipping:
+                yield line_number + 1, b""
+                skipping = True
+            buffer = b""
+    if buffer.strip() and not skipping:
+        yield line_number + 1, buffer
+
+
+class BulkImport:
+    """Accumulates validated rows and writes them in batches."""
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        model,
+        schema: Type[BaseModel],
+        batch_size: int = BATCH_SIZE,
+        on_batch: Optional[Callable[[AsyncConnection], Awaitable[None]]] = None,
+    ):
+        self.engine = engine
+        self.on_batch = on_batch
+        self.table = model.__table__
+        self.schema = schema
+        self.batch_size = batch_size
+        self.columns = set(self.table.columns.keys())
+        self.upsert_insert = UPSERT_DIALECTS.get(engine.dialect.name)
+        self.can_upsert = self.upsert_insert is not None and "external_id" in self.columns
+        self.received = 0
+        self.written = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self._batch: List[Tuple[int, Dict[str, Any]]] = []
+
+    def _error(self, line_number: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_number, "error": message})
+
+    async def add(self, line_number: int, line: bytes) -> None:
+        self.received += 1
+        if not line:
+            self._error(line_number, f"Line exceeds {MAX_LINE_BYTES} bytes")
+            return
+        try:
+            record = self.schema.model_validate_json(line)
+        except ValidationError as e:
+            self._error(line_number, str(e.errors(include_url=False)))
+            return
+        row = {k: v for k, v in record.model_dump(exclude_none=True).items() if k in self.columns}
+        self._batch.append((line_number, row))
+        if len(self._batch) >= self.batch_size:
+            await self.flush()
+
+    def _statement(self, keys: frozenset):
+        if self.can_upsert and "external_id" in keys:
+            stmt = self.upsert_insert(self.table)
+            updates = {k: stmt.excluded[k] for k in keys if k not in ("id", "external_id")}
+            if updates:
+                return stmt.on_conflict_do_update(index_elements=["external_id"], set_=updates)
+            return stmt.on_conflict_do_nothing(index_elements=["external_id"])
+        return insert(self.table)
+
+    async def _write(self, conn: AsyncConnection, rows: List[Tuple[int, Dict[str, Any]]]) -> None:
+        # executemany needs the same set of columns in every row
+        groups: Dict[frozenset, List[Dict[str, Any]]] = defaultdict(list)
+        for _, row in rows:
+            groups[frozenset(row)].append(row)
+        for keys, group in groups.items():
+            await conn.execute(self._statement(keys), group)
+
+    async def flush(self) -> None:
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        try:
+            async with self.engine.begin() as conn:
+                await self._write(conn, batch)
+                await self._committing(conn)
+            self.written += len(batch)
+            return
+        except SQLAlchemyError:
+            pass
+
+        # The batch was rejected as a whole: retry row by row to pin down the bad lines
+        async with self.engine.begin() as conn:
+            for line_number, row in batch:
+                savepoint = await conn.begin_nested()
+                try:
+                    await self._write(conn, [(line_number, row)])
+                    await savepoint.commit()
+                    self.written += 1
+                except SQLAlchemyError as e:
+                    await savepoint.rollback()
+                    self._error(line_number, str(e.orig) if getattr(e, "orig", None) else str(e))
+            await self._committing(conn)
+
+    async def _committing(self, conn: AsyncConnection) -> None:
+        if self.on_batch is not None:
+            await self.on_batch(conn)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "written": self.written,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def import_ndjson(
+    chunks: AsyncIterator[bytes],
+    engine: AsyncEngine,
+    model,
+    schema: Type[BaseModel],
+    on_batch: Optional[Callable[[AsyncConnection], Awaitable[None]]] = None,
+) -> Dict[str, Any]:
+    """
+    Import an NDJSON byte stream into ``model``'s table and return a per-line report.
+
+    ``on_batch`` runs inside each batch's transaction, right before it commits.
+    """
+    bulk = BulkImport(engine, model, schema, on_batch=on_batch)
+    async for line_number, line in iter_lines(chunks):
+        await bulk.add(line_number, line)
+    await bulk.flush()
+    return bulk.summary()
@@ -1,20 +1,60 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from contextlib import asynccontextmanager
+from functools import partial
+import asyncio
+from typing import List, Optional, Union
 
 from database import engine, SessionLocal
+from async_database import AsyncSessionLocal, async_engine, get_async_db
 import models
 import schemas
 import crud
+from indexes import ensure_indexes
+from pagination import Page, keyset_select, keyset_page
+from ingest import import_ndjson
+from export import EXPORTERS, MEDIA_TYPES
+from conditional_get import not_modified, validator_headers
+from http_cache import (
+    bump_version, bump_version_async, ensure_catalog_versions, get_catalog_state, make_etag,
+)
+
+def create_schema() -> None:
+    """Create tables, indexes and catalog version rows (idempotent)."""
+    models.Base.metadata.create_all(bind=engine)
+    ensure_indexes(engine)
+    ensure_catalog_versions(engine)
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+async def warm_up() -> None:
+    """Open a pooled connection and read the catalog versions before reporting ready."""
+    async with AsyncSessionLocal() as db:
+        for resource in ("jobs", "companies"):
+            await get_catalog_state(db, resource)
+    app.state.ready = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema work runs on startup instead of at import time, so importing the
+    # module (tests, tooling, worker spawn) stays cheap. The pool warms up in
+    # the background; /api/v1/ready reports when it is done.
+    app.state.ready = False
+    await asyncio.to_thread(create_schema)
+    warm_up_task = asyncio.create_task(warm_up())
+    try:
+        yield
+    finally:
+        warm_up_task.cancel()
+        await async_engine.dispose()
 
 app = FastAPI(
     title="Job Search Platform API",
     description="A comprehensive job search platform backend",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -34,49 +74,164 @@ def get_db():
     finally:
         db.close()
 
+def _jobs_select(city: Optional[str], grade: Optional[str], format: Optional[str]):
+    stmt = select(models.Job)
+    if city:
+        stmt = stmt.where(models.Job.city == city)
+    if grade:
+        stmt = stmt.where(models.Job.grade == grade)
+    if format:
+        stmt = stmt.where(models.Job.format == format)
+    return stmt
+
+async def _conditional(resource: str, request: Request, response: Response, db: AsyncSession) -> Optional[Response]:
+    """Return a 304 for a current client copy, otherwise set the validators on ``response``."""
+    version, last_modified = await get_catalog_state(db, resource)
+    etag = make_etag(resource, version, request)
+    cached = not_modified(request, etag, last_modified)
+    if cached is None:
+        response.headers.update(validator_headers(etag, last_modified))
+    return cached
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Job Search Platform API"}
 
+@app.get("/api/v1/ready")
+def readiness(request: Request):
+    """Readiness probe: 200 once the schema exists and the connection pool is warm, 503 before."""
+    ready = getattr(request.app.state, "ready", False)
+    return JSONResponse({"status": "ready" if ready else "starting"}, status_code=200 if ready else 503)
+
 # Jobs endpoints
-@app.get("/api/v1/jobs", response_model=List[schemas.Job])
-def get_jobs(
+@app.get("/api/v1/jobs", response_model=Union[List[schemas.Job], Page[schemas.Job]])
+async def get_jobs(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     city: str = None,
     grade: str = None,
     format: str = None,
-    db: Session = Depends(get_db)
+    paginate: str = Query("offset", pattern="^(offset|keyset)$"),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    jobs = crud.get_jobs(db, skip=skip, limit=limit, city=city, grade=grade, format=format)
+    """
+    List jobs.
+
+    With ``paginate=keyset`` the response is ``{"items": [...], "next_cursor": ...}``
+    ordered by newest first; pass ``next_cursor`` back as ``cursor`` to get the next page.
+    Supports conditional requests via ``If-None-Match`` / ``If-Modified-Since``.
+    """
+    cached = await _conditional("jobs", request, response, db)
+    if cached is not None:
+        return cached
+
+    stmt = _jobs_select(city, grade, format)
+    if paginate == "keyset":
+        stmt = keyset_select(stmt, (models.Job.posted_date, models.Job.id), cursor, limit)
+        rows = (await db.execute(stmt)).scalars().all()
+        return keyset_page(rows, ("posted_date", "id"), limit)
+
+    jobs = (await db.execute(stmt.offset(skip).limit(limit))).scalars().all()
     return jobs
 
+@app.get("/api/v1/jobs/export")
+async def export_jobs(
+    city: str = None,
+    grade: str = None,
+    format: str = None,
+    output: str = Query("ndjson", pattern="^(ndjson|csv)$")
+):
+    """
+    Stream all jobs matching the ``city``/``grade``/``format`` filters as NDJSON or CSV.
+
+    Rows are read from a server-side cursor and encoded incrementally,
+    so the response starts immediately regardless of the result size.
+    """
+    stmt = _jobs_select(city, grade, format).order_by(models.Job.id)
+    return StreamingResponse(
+        EXPORTERS[output](async_engine, stmt, schemas.Job),
+        media_type=MEDIA_TYPES[output],
+        headers={"Content-Disposition": f'attachment; filename="jobs.{output}"'}
+    )
+
+@app.post("/api/v1/jobs/bulk")
+async def bulk_import_jobs(request: Request):
+    """
+    Bulk import jobs from an NDJSON body (one ``JobCreate`` object per line).
+
+    Rows are written in batched transactions and upserted by ``external_id``.
+    Invalid lines are reported in ``errors`` without aborting the import.
+    """
+    return await import_ndjson(request.stream(), async_engine, models.Job, schemas.JobCreate, partial(bump_version_async, resource="jobs"))
+
 @app.get("/api/v1/jobs/{job_id}", response_model=schemas.Job)
-def get_job(job_id: int, db: Session = Depends(get_db)):
-    job = crud.get_job(db, job_id=job_id)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    job = await db.get(models.Job, job_id)
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
 @app.post("/api/v1/jobs", response_model=schemas.Job)
 def create_job(job: schemas.JobCreate, db: Session = Depends(get_db)):
+    # The bump joins the transaction that crud.create_job commits
+    bump_version(db, "jobs")
     return crud.create_job(db=db, job=job)
 
 # Companies endpoints
-@app.get("/api/v1/companies", response_model=List[schemas.Company])
-def get_companies(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    companies = crud.get_companies(db, skip=skip, limit=limit)
+@app.get("/api/v1/companies", response_model=Union[List[schemas.Company], Page[schemas.Company]])
+async def get_companies(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    paginate: str = Query("offset", pattern="^(offset|keyset)$"),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    List companies.
+
+    With ``paginate=keyset`` the response is ``{"items": [...], "next_cursor": ...}``
+    ordered by id; pass ``next_cursor`` back as ``cursor`` to get the next page.
+    Supports conditional requests via ``If-None-Match`` / ``If-Modified-Since``.
+    """
+    cached = await _conditional("companies", request, response, db)
+    if cached is not None:
+        return cached
+
+    if paginate == "keyset":
+        stmt = keyset_select(select(models.Company), (models.Company.id,), cursor, limit, descending=False)
+        rows = (await db.execute(stmt)).scalars().all()
+        return keyset_page(rows, ("id",), limit)
+
+    stmt = select(models.Company).order_by(models.Company.id).offset(skip).limit(limit)
+    companies = (await db.execute(stmt)).scalars().all()
     return companies
 
+@app.post("/api/v1/companies/bulk")
+async def bulk_import_companies(request: Request):
+    """
+    Bulk import companies from an NDJSON body (one ``CompanyCreate`` object per line).
+
+    Rows are written in batched transactions and upserted by ``external_id``.
+    Invalid lines are reported in ``errors`` without aborting the import.
+    """
+    return await import_ndjson(request.stream(), async_engine, models.Company, schemas.CompanyCreate, partial(bump_version_async, resource="companies"))
+
 @app.get("/api/v1/companies/{company_id}", response_model=schemas.Company)
-def get_company(company_id: int, db: Session = Depends(get_db)):
-    company = crud.get_company(db, company_id=company_id)
+async def get_company(company_id: int, db: AsyncSession = Depends(get_async_db)):
+    company = await db.get(models.Company, company_id)
     if company is None:
         raise HTTPException(status_code=404, detail="Company not found")
     return company
 
 @app.post("/api/v1/companies", response_model=schemas.Company)
 def create_company(company: schemas.CompanyCreate, db: Session = Depends(get_db)):
+    # The bump joins the transaction that crud.create_company commits
+    bump_version(db, "companies")
     return crud.create_company(db=db, company=company)
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Instead of OFFSET, each page continues strictly after the sort key of the
+last row of the previous page, so deep pages cost the same as the first one.
+The position is returned to the client as an opaque ``next_cursor``.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Generic, List, Optional, Sequence, TypeVar
+from uuid import UUID
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import Select, and_, false, or_, tuple_
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+# Sort key types that JSON cannot carry: tag -> (type, to JSON, from JSON).
+# datetime is listed before date because it is a subclass of date.
+_TAGGED_TYPES = {
+    "dt": (datetime, datetime.isoformat, datetime.fromisoformat),
+    "d": (date, date.isoformat, date.fromisoformat),
+    "t": (time, time.isoformat, time.fromisoformat),
+    "dec": (Decimal, str, Decimal),
+    "uuid": (UUID, str, UUID),
+    "b": (bytes, lambda v: base64.b64encode(v).decode(), base64.b64decode),
+}
+
+
+def _encode_value(value: Any) -> Any:
+    for tag, (type_, dump, _) in _TAGGED_TYPES.items():
+        if isinstance(value, type_):
+            return {tag: dump(value)}
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    raise TypeError(f"Unsupported cursor value type: {type(value).__name__}")
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if len(value) != 1:
+            raise ValueError("Invalid cursor value")
+        (tag, raw), = value.items()
+        if tag not in _TAGGED_TYPES or not isinstance(raw, str):
+            raise ValueError("Invalid cursor value")
+        return _TAGGED_TYPES[tag][2](raw)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        return [_decode_value(v) for v in values]
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _nullable(column: Any) -> bool:
+    return getattr(getattr(column, "expression", column), "nullable", True)
+
+
+def _after(columns: Sequence[Any], values: Sequence[Any], descending: bool):
+    """
+    Rows strictly after ``values`` in the keyset order, with NULL sorting below
+    every value (last when descending, first when ascending).
+    """
+    column, value, rest = columns[0], values[0], columns[1:]
+    if value is None:
+        beyond = false() if descending else column.isnot(None)
+        same = column.is_(None)
+    else:
+        beyond = column < value if descending else column > value
+        if descending and _nullable(column):
+            beyond = or_(beyond, column.is_(None))
+        same = column == value
+    if not rest:
+        return beyond
+    return or_(beyond, and_(same, _after(rest, values[1:], descending)))
+
+
+def keyset_select(stmt: Select, columns: Sequence[Any], cursor: Optional[str], limit: int, descending: bool = True) -> Select:
+    """
+    Apply keyset ordering to ``stmt``.
+
+    ``columns`` is the sort key and must end with a unique column (the primary key).
+    NULLs in nullable columns sort below every value, so rows with a NULL key
+    come last on descending pages and are never skipped.
+    One extra row is fetched so ``keyset_page`` can tell whether a next page exists.
+    """
+    nullable = [_nullable(c) for c in columns]
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        if any(nullable) or None in values:
+            stmt = stmt.where(_after(columns, values, descending))
+        else:
+            # Row-value comparison can use a composite index directly
+            key = tuple_(*columns)
+            stmt = stmt.where(key < tuple_(*values) if descending else key > tuple_(*values))
+    order = [
+        (c.desc().nulls_last() if n else c.desc()) if descending else (c.asc().nulls_first() if n else c.asc())
+        for c, n in zip(columns, nullable)
+    ]
+    return stmt.order_by(*order).limit(limit + 1)
+
+
+def keyset_page(rows: Sequence[Any], key_attrs: Sequence[str], limit: int) -> Page:
+    """Build a page from rows fetched with ``keyset_select``."""
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit and items:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, attr) for attr in key_attrs])
+    return Page(items=items, next_cursor=next_cursor)
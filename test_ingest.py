@@ -0,0 +1,57 @@
+"""Unit tests for splitting the NDJSON bulk upload stream."""
+import asyncio
+from typing import List, Tuple
+
+import ingest
+from ingest import iter_lines
+
+
+async def _stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+def _lines(*chunks: bytes) -> List[Tuple[int, bytes]]:
+    async def collect():
+        return [item async for item in iter_lines(_stream(*chunks))]
+    return asyncio.run(collect())
+
+
+def test_splits_lines_across_chunks_and_skips_blank_ones():
+    assert _lines(b'{"a":', b'1}\n\n{"b":2}\n', b'{"c":3}') == [
+        (1, b'{"a":1}'),
+        (3, b'{"b":2}'),
+        (4, b'{"c":3}'),
+    ]
+
+
+def test_oversized_line_within_one_chunk_is_reported(monkeypatch):
+    monkeypatch.setattr(ingest, "MAX_LINE_BYTES", 10)
+    assert _lines(b'{"a":1}\n' + b"x" * 60 + b'\n{"b":2}\n') == [
+        (1, b'{"a":1}'),
+        (2, b""),
+        (3, b'{"b":2}'),
+    ]
+
+
+def test_oversized_line_spanning_chunks_is_reported_once(monkeypatch):
+    monkeypatch.setattr(ingest, "MAX_LINE_BYTES", 10)
+    assert _lines(b'{"a":1}\n' + b"x" * 30, b"x" * 30, b'xx\n{"b":2}\n') == [
+        (1, b'{"a":1}'),
+        (2, b""),
+        (3, b'{"b":2}'),
+    ]
+
+
+def test_leftover_after_oversized_line_is_split(monkeypatch):
+    monkeypatch.setattr(ingest, "MAX_LINE_BYTES", 10)
+    assert _lines(b"x" * 20, b'xx\n{"c":1}\n{"d":2}') == [
+        (1, b""),
+        (2, b'{"c":1}'),
+        (3, b'{"d":2}'),
+    ]
+
+
+def test_oversized_last_line_without_newline(monkeypatch):
+    monkeypatch.setattr(ingest, "MAX_LINE_BYTES", 10)
+    assert _lines(b'{"a":1}\n', b"x" * 12, b"x" * 12) == [(1, b'{"a":1}'), (2, b"")]
@@ -0,0 +1,98 @@
+"""Unit tests for keyset (cursor) pagination."""
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, Date, DateTime, Integer, MetaData, Numeric, Table, create_engine, insert, select
+
+from pagination import decode_cursor, encode_cursor, keyset_page, keyset_select
+
+metadata = MetaData()
+jobs = Table(
+    "jobs",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("posted_date", DateTime, nullable=True),
+    Column("deadline", Date, nullable=False),
+    Column("salary", Numeric(10, 2), nullable=False),
+)
+
+ROWS = [
+    {"id": 1, "posted_date": datetime(2024, 1, 3), "deadline": date(2024, 3, 1), "salary": Decimal("100.50")},
+    {"id": 2, "posted_date": None, "deadline": date(2024, 3, 2), "salary": Decimal("100.50")},
+    {"id": 3, "posted_date": datetime(2024, 1, 3), "deadline": date(2024, 3, 1), "salary": Decimal("90.00")},
+    {"id": 4, "posted_date": datetime(2024, 1, 1), "deadline": date(2024, 3, 3), "salary": Decimal("120.00")},
+    {"id": 5, "posted_date": None, "deadline": date(2024, 3, 2), "salary": Decimal("80.25")},
+    {"id": 6, "posted_date": datetime(2024, 1, 2), "deadline": date(2024, 3, 1), "salary": Decimal("100.50")},
+]
+
+
+@pytest.fixture(scope="module")
+def conn():
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with engine.connect() as connection:
+        connection.execute(insert(jobs), ROWS)
+        yield connection
+
+
+def _walk(conn, columns, attrs, descending, limit=2):
+    ids, cursor = [], None
+    while True:
+        rows = conn.execute(keyset_select(select(jobs), columns, cursor, limit, descending)).all()
+        page = keyset_page(rows, attrs, limit)
+        ids.extend(row.id for row in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            return ids
+
+
+def test_cursor_round_trips_tagged_values():
+    values = [
+        datetime(2024, 1, 2, 3, 4, 5),
+        date(2024, 1, 2),
+        time(12, 30),
+        Decimal("12.30"),
+        uuid4(),
+        b"\x00\xff",
+        None,
+        "text",
+        7,
+        1.5,
+    ]
+    decoded = decode_cursor(encode_cursor(values), len(values))
+    assert decoded == values
+    assert [type(v) for v in decoded] == [type(v) for v in values]
+
+
+def test_unsupported_cursor_value_is_rejected():
+    with pytest.raises(TypeError):
+        encode_cursor([object()])
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor([1]), "eyJ4IjoiMSJ9", "W3sienoiOiIxIn0sMV0", "W3siZCI6ImJhZCJ9LDFd"])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, 2)
+    assert error.value.status_code == 400
+
+
+def test_null_sort_keys_are_not_skipped(conn):
+    ids = _walk(conn, (jobs.c.posted_date, jobs.c.id), ("posted_date", "id"), descending=True)
+    # NULL dates come last on descending pages
+    assert ids == [3, 1, 6, 4, 5, 2]
+
+
+def test_null_sort_keys_ascending(conn):
+    ids = _walk(conn, (jobs.c.posted_date, jobs.c.id), ("posted_date", "id"), descending=False)
+    assert ids == [2, 5, 4, 6, 1, 3]
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_date_and_decimal_sort_keys(conn, descending):
+    for column in ("deadline", "salary"):
+        expected = [row["id"] for row in sorted(ROWS, key=lambda r: (r[column], r["id"]), reverse=descending)]
+        ids = _walk(conn, (jobs.c[column], jobs.c.id), (column, "id"), descending)
+        assert ids == expected
@@ -72,6 +72,36 @@ test.describe('AI Chat Bot API End-to-End Tests', () => {
     }
   });
 
+  test('should require all skills when skills_match=all', async ({ request }) => {
+    const response = await request.get(`${baseUrl}/api/vacancies?skills=Python,Docker&skills_match=all`);
+    expect(response.status()).toBe(200);
+    
+    const data = await response.json();
+    expect(Array.isArray(data)).toBeTruthy();
+    
+    for (const vacancy of data) {
+      const allSkills = [...vacancy.required_skills, ...vacancy.preferred_skills]
+        .map((skill: string) => skill.toLowerCase());
+      expect(allSkills).toContain('python');
+      expect(allSkills).toContain('docker');
+    }
+  });
+
+  test('should return facet counts and a page of vacancies', async ({ request }) => {
+    const response = await request.get(`${baseUrl}/api/vacancies/search?skills=Python&limit=2`);
+    expect(response.status()).toBe(200);
+    
+    const data = await response.json();
+    expect(data.limit).toBe(2);
+    expect(data.items.length).toBeLessThanOrEqual(2);
+    expect(data.total).toBeGreaterThanOrEqual(data.items.length);
+    expect(Array.isArray(data.facets.experience_level)).toBeTruthy();
+    expect(Array.isArray(data.facets.location)).toBeTruthy();
+    
+    const python = data.facets.skills.find((facet: { value: string }) => facet.value === 'Python');
+    expect(python.count).toBe(data.total);
+  });
+
   test('should return all companies', async ({ request }) => {
     const response = await request.get(`${baseUrl}/api/companies`);
     expect(response.status()).toBe(200);
@@ -129,6 +159,16 @@ test.describe('AI Chat Bot API End-to-End Tests', () => {
     expect(data).toHaveProperty('chat_service_available');
   });
 
+  test('should become ready after warm-up', async ({ request }) => {
+    await expect.poll(async () => (await request.get(`${baseUrl}/api/ready`)).status(), {
+      timeout: 30000,
+    }).toBe(200);
+    
+    const data = await (await request.get(`${baseUrl}/api/ready`)).json();
+    expect(data.status).toBe('ready');
+    expect(data.steps).toHaveProperty('search_index');
+  });
+
   test('should handle recommendations endpoint', async ({ request }) => {
     const response = await request.post(`${baseUrl}/api/recommendations`, {
       data: {
@@ -149,6 +189,41 @@ test.describe('AI Chat Bot API End-to-End Tests', () => {
     expect(typeof data.analysis).toBe('object');
   });
 
+  test('should rank vacancies locally with engine=local', async ({ request }) => {
+    const response = await request.post(`${baseUrl}/api/recommendations?engine=local&user_experience=middle`, {
+      data: ['Python', 'Django']
+    });
+    
+    expect(response.status()).toBe(200);
+    const data = await response.json();
+    
+    expect(data.analysis.engine).toBe('local');
+    expect(data.recommended_vacancies.length).toBeGreaterThan(0);
+    expect(data.recommended_vacancies.map((v: any) => v.id))
+      .toEqual(data.analysis.recommended_vacancy_ids);
+  });
+
+  test('should stream batch recommendations once per unique profile', async ({ request }) => {
+    const response = await request.post(`${baseUrl}/api/recommendations/batch`, {
+      data: {
+        engine: 'local',
+        profiles: [
+          { user_skills: ['Python', 'Django'], profile_id: 'a' },
+          { user_skills: ['django', 'python'], profile_id: 'b' },
+          { user_skills: ['React'], user_experience: 'junior' }
+        ]
+      }
+    });
+    
+    expect(response.status()).toBe(200);
+    const lines = (await response.text()).trim().split('\n').map(line => JSON.parse(line));
+    
+    expect(lines.map((line: any) => line.index).sort()).toEqual([0, 1, 2]);
+    const [a, b] = [0, 1].map(i => lines.find((line: any) => line.index === i));
+    expect(a.profile_id).toBe('a');
+    expect(b.analysis).toEqual(a.analysis);
+  });
+
   test('should handle invalid request gracefully', async ({ request }) => {
     const response = await request.post(`${baseUrl}/api/chat`, {
       data: {